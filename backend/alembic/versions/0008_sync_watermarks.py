@@ -0,0 +1,26 @@
+from alembic import op
+import sqlalchemy as sa
+
+# Identificadores de revisión, utilizados por Alembic.
+revision = '0008_sync_watermarks'
+down_revision = '0007_seed_empresas_custom'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Tabla de marcas de agua para sincronizaciones incrementales.
+    Guarda la última (fecha, consecutivo) ingerida por cada fuente externa.
+    """
+    op.create_table(
+        'sync_watermarks',
+        sa.Column('fuente', sa.String(length=100), primary_key=True),
+        sa.Column('ultima_fecha', sa.DateTime(), nullable=True),
+        sa.Column('ultimo_consecutivo', sa.BigInteger(), nullable=True),
+        sa.Column('fecha_actualizacion', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table('sync_watermarks')
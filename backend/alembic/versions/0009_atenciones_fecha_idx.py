@@ -0,0 +1,19 @@
+from alembic import op
+
+# Identificadores de revisión, utilizados por Alembic.
+revision = '0009_atenciones_fecha_idx'
+down_revision = '0008_sync_watermarks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Índice compuesto (fecha_ingreso, id) para el listado de atenciones.
+    Permite ordenar y paginar por cursor sin ordenar en memoria ni recorrer filas descartadas.
+    """
+    op.create_index('ix_atenciones_fecha_ingreso_id', 'atenciones', ['fecha_ingreso', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_atenciones_fecha_ingreso_id', table_name='atenciones')
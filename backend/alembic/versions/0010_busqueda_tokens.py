@@ -0,0 +1,67 @@
+from alembic import op
+import sqlalchemy as sa
+import re
+import unicodedata
+
+# Identificadores de revisión, utilizados por Alembic.
+revision = '0010_busqueda_tokens'
+down_revision = '0009_atenciones_fecha_idx'
+branch_labels = None
+depends_on = None
+
+LOTE = 1000
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+
+def _normalizar(texto):
+    # Misma normalización que app.persistence.repository.busqueda_repository
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def _tokens(fila):
+    tokens = set()
+    for texto in (fila.primer_nombre, fila.segundo_nombre, fila.primer_apellido, fila.segundo_apellido):
+        tokens.update(t[:100] for t in _NO_ALFANUMERICO.split(_normalizar(texto)) if t)
+    documento = _NO_ALFANUMERICO.sub("", _normalizar(fila.id))[:100]
+    if documento:
+        tokens.add(documento)
+    return tokens
+
+
+def upgrade():
+    """
+    Índice de búsqueda de pacientes por tokens normalizados (nombres y documento) y carga
+    inicial a partir de los pacientes existentes.
+    """
+    tokens_table = op.create_table(
+        'pacientes_busqueda_tokens',
+        sa.Column('token', sa.String(length=100), primary_key=True),
+        sa.Column(
+            'id_paciente',
+            sa.String(length=50),
+            sa.ForeignKey('pacientes.id', ondelete='CASCADE', onupdate='CASCADE'),
+            primary_key=True
+        ),
+    )
+
+    conn = op.get_bind()
+    ultimo_id = None
+    while True:
+        # Recorrido por PK en lotes para no cargar todos los pacientes en memoria
+        consulta = "SELECT id, primer_nombre, segundo_nombre, primer_apellido, segundo_apellido FROM pacientes"
+        params = {"lote": LOTE}
+        if ultimo_id is not None:
+            consulta += " WHERE id > :ultimo_id"
+            params["ultimo_id"] = ultimo_id
+        filas = conn.execute(sa.text(consulta + " ORDER BY id LIMIT :lote"), params).fetchall()
+        if not filas:
+            break
+        registros = [{"token": t, "id_paciente": fila.id} for fila in filas for t in _tokens(fila)]
+        if registros:
+            op.bulk_insert(tokens_table, registros)
+        ultimo_id = filas[-1].id
+
+
+def downgrade():
+    op.drop_table('pacientes_busqueda_tokens')
@@ -0,0 +1,26 @@
+from alembic import op
+
+# Identificadores de revisión, utilizados por Alembic.
+revision = '0011_atenciones_indices'
+down_revision = '0010_busqueda_tokens'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Índices compuestos para los filtros del listado de atenciones por empresa y por estado.
+    Ambos terminan en fecha_ingreso para resolver también el orden por fecha sin filesort.
+    El índice (fecha_ingreso, id) de la 0009 cubre los filtros sólo por fecha.
+    """
+    op.create_index('ix_atenciones_empresa_fecha', 'atenciones', ['id_empresa', 'fecha_ingreso'])
+    op.create_index('ix_atenciones_estado_fecha', 'atenciones', ['id_estado_atencion', 'fecha_ingreso'])
+
+
+def downgrade():
+    # InnoDB exige un índice sobre cada FK: las FK reutilizan estos índices compuestos, así que
+    # se recrean los índices simples antes de eliminarlos
+    op.create_index('ix_atenciones_id_empresa', 'atenciones', ['id_empresa'])
+    op.create_index('ix_atenciones_id_estado_atencion', 'atenciones', ['id_estado_atencion'])
+    op.drop_index('ix_atenciones_estado_fecha', table_name='atenciones')
+    op.drop_index('ix_atenciones_empresa_fecha', table_name='atenciones')
@@ -0,0 +1,31 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# Identificadores de revisión, utilizados por Alembic.
+revision = '0012_edit_locks'
+down_revision = '0011_atenciones_indices'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Tabla de bloqueos de edición compartida entre workers (LOCK_BACKEND=mysql).
+    El índice por expires_at permite purgar los vencidos sin recorrer la tabla.
+    """
+    op.create_table(
+        'edit_locks',
+        sa.Column('recurso', sa.String(length=150), primary_key=True),
+        sa.Column('token', sa.String(length=32), nullable=False),
+        sa.Column('owner_id', sa.String(length=100), nullable=False),
+        sa.Column('owner', sa.JSON(), nullable=True),
+        sa.Column('locked_at', mysql.DATETIME(fsp=6), nullable=False),
+        sa.Column('expires_at', mysql.DATETIME(fsp=6), nullable=False),
+    )
+    op.create_index('ix_edit_locks_expires_at', 'edit_locks', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('ix_edit_locks_expires_at', table_name='edit_locks')
+    op.drop_table('edit_locks')
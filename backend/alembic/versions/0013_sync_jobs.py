@@ -0,0 +1,34 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# Identificadores de revisión, utilizados por Alembic.
+revision = '0013_sync_jobs'
+down_revision = '0012_edit_locks'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Estado de los jobs de sincronización en segundo plano, compartido entre workers.
+    """
+    op.create_table(
+        'sync_jobs',
+        sa.Column('id', sa.String(length=32), primary_key=True),
+        sa.Column('tipo', sa.String(length=50), nullable=False),
+        sa.Column('estado', sa.String(length=20), nullable=False),
+        sa.Column('parametros', sa.JSON(), nullable=True),
+        sa.Column('progreso', sa.JSON(), nullable=False),
+        sa.Column('resultado', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('creado_en', mysql.DATETIME(fsp=6), nullable=False),
+        sa.Column('iniciado_en', mysql.DATETIME(fsp=6), nullable=True),
+        sa.Column('finalizado_en', mysql.DATETIME(fsp=6), nullable=True),
+    )
+    op.create_index('ix_sync_jobs_creado_en', 'sync_jobs', ['creado_en'])
+
+
+def downgrade():
+    op.drop_index('ix_sync_jobs_creado_en', table_name='sync_jobs')
+    op.drop_table('sync_jobs')
@@ -0,0 +1,62 @@
+from alembic import op
+import sqlalchemy as sa
+import re
+import unicodedata
+
+# Identificadores de revisión, utilizados por Alembic.
+revision = '0014_atenciones_busqueda_tokens'
+down_revision = '0013_sync_jobs'
+branch_labels = None
+depends_on = None
+
+LOTE = 1000
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+_DIGITOS = re.compile(r"[0-9]+")
+
+
+def _tokens(atencion_id):
+    # Misma tokenización que app.persistence.repository.busqueda_repository.tokens_atencion
+    descompuesto = unicodedata.normalize("NFKD", atencion_id or "")
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+    normalizado = _NO_ALFANUMERICO.sub("", sin_tildes)[:100]
+    if not normalizado:
+        return set()
+    return {normalizado} | set(_DIGITOS.findall(normalizado))
+
+
+def upgrade():
+    """
+    Índice de búsqueda de atenciones por ID completo y por sus grupos de dígitos (el
+    consecutivo sin el prefijo 'ADM'), con carga inicial a partir de las atenciones existentes.
+    """
+    tokens_table = op.create_table(
+        'atenciones_busqueda_tokens',
+        sa.Column('token', sa.String(length=100), primary_key=True),
+        sa.Column(
+            'id_atencion',
+            sa.String(length=50),
+            sa.ForeignKey('atenciones.id', ondelete='CASCADE', onupdate='CASCADE'),
+            primary_key=True
+        ),
+    )
+
+    conn = op.get_bind()
+    ultimo_id = None
+    while True:
+        # Recorrido por PK en lotes para no cargar todas las atenciones en memoria
+        consulta = "SELECT id FROM atenciones"
+        params = {"lote": LOTE}
+        if ultimo_id is not None:
+            consulta += " WHERE id > :ultimo_id"
+            params["ultimo_id"] = ultimo_id
+        filas = conn.execute(sa.text(consulta + " ORDER BY id LIMIT :lote"), params).fetchall()
+        if not filas:
+            break
+        registros = [{"token": t, "id_atencion": fila.id} for fila in filas for t in _tokens(fila.id)]
+        if registros:
+            op.bulk_insert(tokens_table, registros)
+        ultimo_id = filas[-1].id
+
+
+def downgrade():
+    op.drop_table('atenciones_busqueda_tokens')
@@ -0,0 +1,23 @@
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# Identificadores de revisión, utilizados por Alembic.
+revision = '0015_sync_jobs_latido'
+down_revision = '0014_atenciones_busqueda_tokens'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """
+    Latido de los jobs de sincronización: el worker que ejecuta el job lo renueva periódicamente,
+    así los jobs que quedaron abiertos por un reinicio se pueden dar por interrumpidos.
+    """
+    op.add_column('sync_jobs', sa.Column('actualizado_en', mysql.DATETIME(fsp=6), nullable=True))
+    op.create_index('ix_sync_jobs_estado', 'sync_jobs', ['estado'])
+
+
+def downgrade():
+    op.drop_index('ix_sync_jobs_estado', table_name='sync_jobs')
+    op.drop_column('sync_jobs', 'actualizado_en')
@@ -1,6 +1,7 @@
 __all__ = [
     "config",
     "database",
+    "external_database",
     "router_config",
     "cors_config",
     "startup",
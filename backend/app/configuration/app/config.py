@@ -45,6 +45,58 @@ class Settings(BaseSettings):
     EXTERNAL_DB_NAME: Optional[str] = Field(None, env="EXTERNAL_DB_NAME")
     EXTERNAL_DB_USER: Optional[str] = Field(None, env="EXTERNAL_DB_USER")
     EXTERNAL_DB_PASSWORD: Optional[str] = Field(None, env="EXTERNAL_DB_PASSWORD")
+    # Pool de conexiones a la BD externa (compartido entre sincronizaciones)
+    EXTERNAL_DB_POOL_SIZE: int = Field(5, env="EXTERNAL_DB_POOL_SIZE")
+    EXTERNAL_DB_MAX_OVERFLOW: int = Field(2, env="EXTERNAL_DB_MAX_OVERFLOW")
+    EXTERNAL_DB_POOL_RECYCLE: int = Field(1800, env="EXTERNAL_DB_POOL_RECYCLE")  # segundos
+    EXTERNAL_DB_POOL_TIMEOUT: int = Field(30, env="EXTERNAL_DB_POOL_TIMEOUT")  # segundos
+    EXTERNAL_DB_POOL_PRE_PING: bool = Field(True, env="EXTERNAL_DB_POOL_PRE_PING")
+
+    # Sincronización: filas leídas y confirmadas por lote
+    SYNC_CHUNK_SIZE: int = Field(1000, env="SYNC_CHUNK_SIZE")
+    # Backfills por rango: partición ('dia', 'semana' o 'ninguna') y workers concurrentes
+    SYNC_PARTICION: str = Field("dia", env="SYNC_PARTICION")
+    SYNC_MAX_WORKERS: int = Field(4, env="SYNC_MAX_WORKERS")
+    # Periodicidad de la sincronización incremental programada
+    SYNC_INTERVAL_MINUTES: int = Field(15, env="SYNC_INTERVAL_MINUTES")
+    # La incremental relee este margen antes de la marca de agua (admisiones registradas tarde)
+    SYNC_INCREMENTAL_LOOKBACK_MINUTES: int = Field(60, env="SYNC_INCREMENTAL_LOOKBACK_MINUTES")
+    # Hilos del executor dedicado a jobs programados bloqueantes
+    SCHEDULER_SYNC_MAX_WORKERS: int = Field(2, env="SCHEDULER_SYNC_MAX_WORKERS")
+    # Jobs de sincronización lanzados desde la API: concurrencia e historial retenido
+    SYNC_JOBS_MAX_CONCURRENT: int = Field(1, env="SYNC_JOBS_MAX_CONCURRENT")
+    SYNC_JOBS_HISTORY: int = Field(50, env="SYNC_JOBS_HISTORY")
+    # Latido de los jobs en curso; sin latido durante SYNC_JOBS_STALE_SECONDS se dan por interrumpidos
+    SYNC_JOBS_HEARTBEAT_SECONDS: float = Field(30, env="SYNC_JOBS_HEARTBEAT_SECONDS")
+    SYNC_JOBS_STALE_SECONDS: int = Field(180, env="SYNC_JOBS_STALE_SECONDS")
+
+    # Caché de catálogos: segundos antes de recargar desde la BD (0 = sin expiración)
+    CATALOG_CACHE_TTL_SECONDS: int = Field(300, env="CATALOG_CACHE_TTL_SECONDS")
+    # Intervalo mínimo entre recargas de un catálogo por IDs que no están en la caché
+    CATALOG_CACHE_MISS_RELOAD_SECONDS: float = Field(5, env="CATALOG_CACHE_MISS_RELOAD_SECONDS")
+
+    # Bloqueos de edición: 'mysql' (compartidos entre workers/réplicas) o 'memory' (un solo proceso)
+    LOCK_BACKEND: str = Field("mysql", env="LOCK_BACKEND")
+    LOCK_TTL_SECONDS: int = Field(300, env="LOCK_TTL_SECONDS")
+    # Periodicidad de la purga de bloqueos vencidos
+    LOCK_REAPER_INTERVAL_SECONDS: int = Field(60, env="LOCK_REAPER_INTERVAL_SECONDS")
+
+    # WebSocket: segundos máximos de envío a un cliente antes de desconectarlo por lento
+    WS_SEND_TIMEOUT_SECONDS: float = Field(5.0, env="WS_SEND_TIMEOUT_SECONDS")
+    # Cola de salida por conexión y qué hacer al llenarse: drop_oldest, coalesce o disconnect
+    WS_QUEUE_MAX_SIZE: int = Field(256, env="WS_QUEUE_MAX_SIZE")
+    WS_OVERFLOW_POLICY: str = Field("drop_oldest", env="WS_OVERFLOW_POLICY")
+    # Bus de eventos entre workers: 'memory' (un solo worker) o 'redis' (requiere el paquete redis)
+    WS_BACKPLANE: str = Field("memory", env="WS_BACKPLANE")
+    WS_REDIS_URL: str = Field("redis://redis:6379/0", env="WS_REDIS_URL")
+    WS_REDIS_CHANNEL: str = Field("postcare:ws_events", env="WS_REDIS_CHANNEL")
+    # Eventos recientes que se reenvían a un cliente que se reconecta (since=<último seq>)
+    WS_REPLAY_BUFFER_SIZE: int = Field(1000, env="WS_REPLAY_BUFFER_SIZE")
+    # Ventana en la que se agrupan los eventos de cada cliente en un mensaje 'batch' (0 = sin lotes)
+    WS_BATCH_WINDOW_MS: int = Field(100, env="WS_BATCH_WINDOW_MS")
+    # Ping del servidor a cada cliente y desalojo de los que no envían nada en el timeout (0 = sin heartbeat)
+    WS_HEARTBEAT_INTERVAL_SECONDS: float = Field(30.0, env="WS_HEARTBEAT_INTERVAL_SECONDS")
+    WS_HEARTBEAT_TIMEOUT_SECONDS: float = Field(90.0, env="WS_HEARTBEAT_TIMEOUT_SECONDS")
 
     model_config = {"env_file": ".env", "extra": "ignore"}
     
@@ -0,0 +1,84 @@
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from app.configuration.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Engine externo (SQL Server) de la URL configurada, creado bajo demanda y compartido por el
+# scheduler, los endpoints /sync y cualquier otro consumidor de sincronización.
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def _crear_engine(external_db_url: str) -> Engine:
+    return create_engine(
+        external_db_url,
+        pool_size=settings.EXTERNAL_DB_POOL_SIZE,
+        max_overflow=settings.EXTERNAL_DB_MAX_OVERFLOW,
+        pool_recycle=settings.EXTERNAL_DB_POOL_RECYCLE,
+        pool_timeout=settings.EXTERNAL_DB_POOL_TIMEOUT,
+        pool_pre_ping=settings.EXTERNAL_DB_POOL_PRE_PING,
+    )
+
+
+def _url_configurada() -> str:
+    external_db_url = settings.get_external_db_url()
+    if not external_db_url:
+        raise Exception("No se ha configurado la conexión a la BD externa. Configure EXTERNAL_DB_USER y EXTERNAL_DB_PASSWORD en .env")
+    return external_db_url
+
+
+def get_external_engine() -> Engine:
+    """
+    Retorna el engine con pool de la URL configurada.
+    El engine se crea una sola vez y se reutiliza, evitando pagar la conexión y el login
+    TDS en cada sincronización.
+    """
+    global _engine
+    if _engine is not None:
+        return _engine
+
+    with _engine_lock:
+        if _engine is None:
+            external_db_url = _url_configurada()
+            _engine = _crear_engine(external_db_url)
+            logger.info(f"Engine externo creado para {external_db_url.split('@')[-1]}")
+        return _engine
+
+
+@contextmanager
+def open_external_engine(external_db_url: Optional[str] = None) -> Iterator[Engine]:
+    """
+    Engine para una sincronización. Sin URL, o con la configurada, es el engine compartido.
+    Una URL distinta (enviada en la petición) recibe un engine propio que se cierra al salir,
+    así las URLs de una sola vez no dejan pools abiertos.
+    """
+    if not external_db_url or external_db_url == settings.get_external_db_url():
+        yield get_external_engine()
+        return
+
+    engine = _crear_engine(external_db_url)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        logger.info(f"Engine externo temporal cerrado para {external_db_url.split('@')[-1]}")
+
+
+def get_external_pool_capacity() -> int:
+    """Número máximo de conexiones simultáneas que admite cada engine externo."""
+    return settings.EXTERNAL_DB_POOL_SIZE + settings.EXTERNAL_DB_MAX_OVERFLOW
+
+
+def dispose_external_engines() -> None:
+    """Cierra las conexiones del engine compartido (se invoca al apagar la aplicación)."""
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            logger.info("Engine externo cerrado")
+            _engine = None
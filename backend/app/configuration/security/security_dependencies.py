@@ -29,6 +29,20 @@ def get_current_admin(current_user: dict = Depends(get_current_user)):
     return current_user
 
 
+def es_token_admin(token: str) -> bool:
+    """
+    Indica si el token es válido y de rol ADMINISTRADOR, sin lanzar excepción.
+    Para WebSockets, donde el navegador no puede enviar el header Authorization.
+    """
+    if not token:
+        return False
+    try:
+        payload = jwt.decode(token, SECRET, algorithms=[ALGORITHM])
+    except jwt.PyJWTError:
+        return False
+    return payload.get("rol") == "ADMINISTRADOR"
+
+
 def get_current_user_with_roles(current_user: dict = Depends(get_current_user)):
     """
     Permite acceso a usuarios con roles: ADMINISTRADOR, ASESOR, FACTURADOR
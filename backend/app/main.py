@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+import asyncio
 import os
 from contextlib import asynccontextmanager
 from app.configuration.app.rate_limiter import limiter
@@ -7,16 +8,27 @@ from app.configuration.app.router_config import configure_routers
 from app.configuration.app.startup import run_startup_tables
 from app.configuration.app.exception_handlers import register_exception_handlers
 from app.configuration.app.config import settings
+from app.configuration.app.external_database import dispose_external_engines
 from app.service.implementation.scheduler_service import SchedulerService
+from app.service.implementation.sync_job_service import SyncJobService
+from app.service.implementation.websocket_manager import get_websocket_manager
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("[APP] Iniciando aplicación...")
+    ws_manager = get_websocket_manager()
+    ws_manager.bind_loop(asyncio.get_running_loop())
+    await ws_manager.start()
+    # Jobs que quedaron abiertos por un reinicio anterior (sin latido reciente)
+    await asyncio.to_thread(SyncJobService.expirar_interrumpidos)
     SchedulerService.start()
     yield
     print("[APP] Cerrando aplicación...")
-    SchedulerService.shutdown()
+    await SchedulerService.shutdown()
+    await ws_manager.stop()
+    SyncJobService.shutdown()
+    dispose_external_engines()
 
 
 def create_app():
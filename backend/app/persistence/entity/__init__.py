@@ -11,4 +11,9 @@ __all__ = [
     "seguimientos_atenciones_entity",
     "atenciones_entity",
     "atenciones_servicios_entity",
+    "sync_watermark_entity",
+    "pacientes_busqueda_tokens_entity",
+    "atenciones_busqueda_tokens_entity",
+    "edit_lock_entity",
+    "sync_job_entity",
 ]
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, ForeignKey
+from app.configuration.app.database import Base
+
+
+class AtencionBusquedaToken(Base):
+    """
+    Índice de búsqueda de atenciones por ID: el ID normalizado (minúsculas, sin separadores) y
+    cada grupo de dígitos que contiene ('ADM12345' -> 'adm12345', '12345'), así el consecutivo
+    sin prefijo también encuentra la atención con token LIKE '123%'.
+    """
+    __tablename__ = "atenciones_busqueda_tokens"
+
+    token = Column(String(100), primary_key=True)
+    id_atencion = Column(
+        String(50),
+        ForeignKey("atenciones.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from app.configuration.app.database import Base
 from datetime import datetime
@@ -6,13 +6,20 @@ from datetime import datetime
 
 class Atencion(Base):
     __tablename__ = "atenciones"
+    __table_args__ = (
+        # Soporta el orden y la paginación por cursor (fecha_ingreso, id)
+        Index("ix_atenciones_fecha_ingreso_id", "fecha_ingreso", "id"),
+        # Filtros por empresa / estado ordenados por fecha
+        Index("ix_atenciones_empresa_fecha", "id_empresa", "fecha_ingreso"),
+        Index("ix_atenciones_estado_fecha", "id_estado_atencion", "fecha_ingreso"),
+    )
 
     id = Column(String(50), primary_key=True)
     id_paciente = Column(String(50), ForeignKey("pacientes.id"), nullable=False)
     id_empresa = Column(Integer, ForeignKey("empresas.id"), nullable=False)
     id_estado_atencion = Column(Integer, ForeignKey("estados_atenciones.id"), nullable=False)
     id_seguimiento_atencion = Column(Integer, ForeignKey("seguimientos_atenciones.id"), nullable=True)
-    fecha_ingreso = Column(DateTime, default=datetime.utcnow)
+    fecha_ingreso = Column(DateTime, nullable=False, default=datetime.utcnow)
     id_usuario = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
     fecha_modificacion = Column(DateTime, nullable=True)
     observacion = Column(Text)
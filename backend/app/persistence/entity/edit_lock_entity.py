@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, JSON, Index
+from sqlalchemy.dialects.mysql import DATETIME
+from app.configuration.app.database import Base
+
+
+class EditLock(Base):
+    """
+    Bloqueos de edición compartidos entre workers/réplicas. Un bloqueo está vigente mientras
+    expires_at > NOW(6); los vencidos se pueden sobrescribir o eliminar en cualquier momento.
+    """
+    __tablename__ = "edit_locks"
+
+    # Recurso bloqueado (p. ej. el ID de la atención)
+    recurso = Column(String(150), primary_key=True)
+    # Identificador único de cada adquisición: permite saber si un upsert concurrente ganó
+    token = Column(String(32), nullable=False)
+    owner_id = Column(String(100), nullable=False)
+    # Datos del usuario que bloquea ({id, username, ...}) tal como los recibe el endpoint
+    owner = Column(JSON, nullable=True)
+    locked_at = Column(DATETIME(fsp=6), nullable=False)
+    expires_at = Column(DATETIME(fsp=6), nullable=False)
+
+    __table_args__ = (
+        Index("ix_edit_locks_expires_at", "expires_at"),
+    )
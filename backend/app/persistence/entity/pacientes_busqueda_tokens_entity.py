@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, ForeignKey
+from app.configuration.app.database import Base
+
+
+class PacienteBusquedaToken(Base):
+    """
+    Índice de búsqueda de pacientes: un token normalizado (minúsculas, sin tildes) por cada
+    palabra de los nombres y por el documento. La clave (token, id_paciente) permite resolver
+    búsquedas por prefijo (token LIKE 'abc%') recorriendo el índice.
+    """
+    __tablename__ = "pacientes_busqueda_tokens"
+
+    token = Column(String(100), primary_key=True)
+    id_paciente = Column(
+        String(50),
+        ForeignKey("pacientes.id", ondelete="CASCADE", onupdate="CASCADE"),
+        primary_key=True
+    )
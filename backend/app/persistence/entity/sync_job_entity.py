@@ -0,0 +1,31 @@
+from sqlalchemy import Column, String, Text, JSON, Index
+from sqlalchemy.dialects.mysql import DATETIME
+from app.configuration.app.database import Base
+
+
+class SyncJob(Base):
+    """
+    Jobs de sincronización en segundo plano. El worker que ejecuta el job guarda aquí su estado
+    y progreso, así cualquier worker puede responder GET /sync/jobs/{id}.
+    """
+    __tablename__ = "sync_jobs"
+
+    id = Column(String(32), primary_key=True)
+    tipo = Column(String(50), nullable=False)
+    # pendiente | en_progreso | completado | parcial | fallido
+    estado = Column(String(20), nullable=False)
+    parametros = Column(JSON, nullable=True)
+    # Contadores acumulados (filas leídas/procesadas, lotes, pacientes/atenciones creados u omitidos)
+    progreso = Column(JSON, nullable=False)
+    resultado = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    creado_en = Column(DATETIME(fsp=6), nullable=False)
+    iniciado_en = Column(DATETIME(fsp=6), nullable=True)
+    finalizado_en = Column(DATETIME(fsp=6), nullable=True)
+    # Última escritura del worker que lo ejecuta; si deja de avanzar, el job quedó interrumpido
+    actualizado_en = Column(DATETIME(fsp=6), nullable=True)
+
+    __table_args__ = (
+        Index("ix_sync_jobs_creado_en", "creado_en"),
+        Index("ix_sync_jobs_estado", "estado"),
+    )
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String, DateTime, BigInteger
+from app.configuration.app.database import Base
+
+
+class SyncWatermark(Base):
+    __tablename__ = "sync_watermarks"
+
+    # Identificador de la fuente sincronizada (e.g. 'clinica_florida_admisiones')
+    fuente = Column(String(100), primary_key=True)
+    ultima_fecha = Column(DateTime, nullable=True)
+    ultimo_consecutivo = Column(BigInteger, nullable=True)
+    fecha_actualizacion = Column(DateTime, nullable=True)
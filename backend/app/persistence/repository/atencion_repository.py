@@ -1,9 +1,15 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_
+from sqlalchemy import or_, and_, select, func, cast, String, union
+from sqlalchemy.engine import RowMapping
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
 from app.persistence.entity.atenciones_entity import Atencion
 from app.persistence.entity.atenciones_servicios_entity import AtencionServicio
+from app.persistence.entity.pacientes_entity import Paciente
+from app.persistence.entity.user_entity import User
+from app.persistence.repository.bulk_helpers import BULK_CHUNK_SIZE, chunked, insert_ignore_duplicates
+from app.persistence.repository import busqueda_repository
+
 
 
 def get_atencion_by_id(db: Session, atencion_id: str) -> Atencion | None:
@@ -25,50 +31,150 @@ def get_atencion_with_relations(db: Session, atencion_id: str) -> Atencion | Non
         .first()
 
 
-def get_all_atenciones(
-    db: Session, 
-    skip: int = 0, 
-    limit: int = 100, 
+def _select_listado():
+    """
+    SELECT de Core con exactamente las columnas de AtencionListResponseDto.
+
+    Los servicios llegan como GROUP_CONCAT de IDs ("3,7"); sus nombres, al igual que los de
+    empresa, estado y seguimiento, se resuelven desde la caché de catálogos.
+    """
+    servicios = select(func.group_concat(cast(AtencionServicio.id_servicio, String)))\
+        .where(AtencionServicio.id_atencion == Atencion.id)\
+        .correlate(Atencion)\
+        .scalar_subquery()
+    return select(
+        Atencion.id,
+        Atencion.fecha_ingreso,
+        Atencion.observacion,
+        Atencion.id_paciente,
+        Atencion.id_empresa,
+        Atencion.id_estado_atencion,
+        Atencion.id_seguimiento_atencion,
+        Atencion.fecha_modificacion,
+        Paciente.primer_nombre,
+        Paciente.segundo_nombre,
+        Paciente.primer_apellido,
+        Paciente.segundo_apellido,
+        Paciente.telefono_uno,
+        Paciente.telefono_dos,
+        Paciente.email,
+        User.username.label("nombre_usuario_modificacion"),
+        servicios.label("servicios")
+    )\
+        .join(Paciente, Paciente.id == Atencion.id_paciente)\
+        .outerjoin(User, User.id == Atencion.id_usuario)
+
+
+def get_listado_por_ids(db: Session, atencion_ids: List[str]) -> List[RowMapping]:
+    """
+    Segunda fase del listado sin ORM: proyecta las columnas del listado (_select_listado)
+    para una página ya resuelta, preservando el orden de `atencion_ids`.
+    """
+    if not atencion_ids:
+        return []
+    columnas = _select_listado()
+    por_id = {}
+    for chunk in chunked(atencion_ids):
+        for fila in db.execute(columnas.where(Atencion.id.in_(chunk))).mappings():
+            por_id[fila["id"]] = fila
+    return [por_id[atencion_id] for atencion_id in atencion_ids if atencion_id in por_id]
+
+
+def _filtrar_por_fecha(
+    query,
     fecha: datetime | None = None,
     fecha_inicio: datetime | None = None,
     fecha_fin: datetime | None = None
-) -> List[Atencion]:
-    """Obtiene todas las atenciones con paginación. Si `fecha` se provee, filtra por ese día. Si fecha_inicio y fecha_fin se proveen, filtra por rango."""
-    query = db.query(Atencion)\
-        .options(
-            joinedload(Atencion.paciente),
-            joinedload(Atencion.empresa),
-            joinedload(Atencion.estado_atencion),
-            joinedload(Atencion.seguimiento_atencion),
-            joinedload(Atencion.usuario),
-            joinedload(Atencion.servicios_rel).joinedload(AtencionServicio.servicio)
-        )\
-    
+):
+    """Aplica el filtro por día (`fecha`) o por rango de días (`fecha_inicio`/`fecha_fin`)."""
     # Aplicar filtro por fecha específica si fue proporcionada
     if fecha is not None:
-        if isinstance(fecha, datetime):
-            start = datetime(fecha.year, fecha.month, fecha.day)
-        else:
-            start = datetime(fecha.year, fecha.month, fecha.day)
+        start = datetime(fecha.year, fecha.month, fecha.day)
         end = start + timedelta(days=1)
         query = query.filter(Atencion.fecha_ingreso >= start, Atencion.fecha_ingreso < end)
     
     # Aplicar filtro por rango de fechas si fue proporcionado
     elif fecha_inicio is not None and fecha_fin is not None:
-        if isinstance(fecha_inicio, datetime):
-            start = datetime(fecha_inicio.year, fecha_inicio.month, fecha_inicio.day)
-        else:
-            start = datetime(fecha_inicio.year, fecha_inicio.month, fecha_inicio.day)
-        
-        if isinstance(fecha_fin, datetime):
-            end = datetime(fecha_fin.year, fecha_fin.month, fecha_fin.day, 23, 59, 59)
-        else:
-            end = datetime(fecha_fin.year, fecha_fin.month, fecha_fin.day, 23, 59, 59)
-        
+        start = datetime(fecha_inicio.year, fecha_inicio.month, fecha_inicio.day)
+        end = datetime(fecha_fin.year, fecha_fin.month, fecha_fin.day, 23, 59, 59)
         query = query.filter(Atencion.fecha_ingreso >= start, Atencion.fecha_ingreso <= end)
 
+    return query
+
+
+def get_atencion_ids(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    fecha: datetime | None = None,
+    fecha_inicio: datetime | None = None,
+    fecha_fin: datetime | None = None
+) -> List[str]:
+    """
+    Primera fase del listado: sólo los IDs de la página, ordenados por fecha_ingreso DESC.
+    Se resuelve recorriendo el índice de fecha_ingreso sin leer el resto de las columnas.
+    """
+    query = _filtrar_por_fecha(db.query(Atencion.id), fecha, fecha_inicio, fecha_fin)
     query = query.order_by(Atencion.fecha_ingreso.desc())
-    return query.offset(skip).limit(limit).all()
+    return [row.id for row in query.offset(skip).limit(limit)]
+
+
+def get_atencion_ids_keyset(
+    db: Session,
+    limit: int = 100,
+    despues_de: Tuple[datetime, str] | None = None,
+    fecha: datetime | None = None,
+    fecha_inicio: datetime | None = None,
+    fecha_fin: datetime | None = None
+) -> List[Tuple[datetime, str]]:
+    """
+    Claves (fecha_ingreso, id) de una página ordenada por (fecha_ingreso DESC, id DESC)
+    usando keyset pagination.
+
+    `despues_de` es la clave de la última fila de la página anterior; la consulta continúa
+    justo después de ella recorriendo el índice (fecha_ingreso, id), así que cualquier página
+    cuesta lo mismo sin importar su profundidad.
+    """
+    query = _filtrar_por_fecha(db.query(Atencion.fecha_ingreso, Atencion.id), fecha, fecha_inicio, fecha_fin)
+
+    if despues_de is not None:
+        ultima_fecha, ultimo_id = despues_de
+        query = query.filter(
+            or_(
+                Atencion.fecha_ingreso < ultima_fecha,
+                and_(Atencion.fecha_ingreso == ultima_fecha, Atencion.id < ultimo_id)
+            )
+        )
+
+    query = query.order_by(Atencion.fecha_ingreso.desc(), Atencion.id.desc())
+    return [(row.fecha_ingreso, row.id) for row in query.limit(limit)]
+
+
+def stream_listado(
+    db: Session,
+    fecha: datetime | None = None,
+    fecha_inicio: datetime | None = None,
+    fecha_fin: datetime | None = None,
+    empresa_id: Optional[int] = None,
+    estado_id: Optional[int] = None,
+    tamano_lote: int = BULK_CHUNK_SIZE
+) -> Iterator[List[RowMapping]]:
+    """
+    Recorre el listado filtrado (fecha_ingreso DESC, id DESC) con un cursor del lado del
+    servidor, entregando lotes de `tamano_lote` filas proyectadas. La memoria usada es la de
+    un lote, sin importar cuántas filas tenga el resultado.
+
+    Mientras se consume, el cursor mantiene ocupada la conexión de `db`: no se deben ejecutar
+    otras consultas con la misma sesión hasta terminar.
+    """
+    stmt = _filtrar_por_fecha(_select_listado(), fecha, fecha_inicio, fecha_fin)
+    if empresa_id:
+        stmt = stmt.where(Atencion.id_empresa == empresa_id)
+    if estado_id:
+        stmt = stmt.where(Atencion.id_estado_atencion == estado_id)
+    stmt = stmt.order_by(Atencion.fecha_ingreso.desc(), Atencion.id.desc())\
+        .execution_options(stream_results=True, yield_per=tamano_lote)
+    yield from db.execute(stmt).mappings().partitions()
 
 
 def get_atenciones_by_paciente(db: Session, paciente_id: str) -> List[Atencion]:
@@ -84,67 +190,59 @@ def get_atenciones_by_paciente(db: Session, paciente_id: str) -> List[Atencion]:
         .all()
 
 
-def get_atenciones_by_empresa(db: Session, empresa_id: int) -> List[Atencion]:
-    """Obtiene todas las atenciones de una empresa"""
-    return db.query(Atencion)\
-        .options(
-            joinedload(Atencion.paciente),
-            joinedload(Atencion.estado_atencion),
-            joinedload(Atencion.seguimiento_atencion),
-            joinedload(Atencion.servicios_rel).joinedload(AtencionServicio.servicio)
-        )\
-        .filter(Atencion.id_empresa == empresa_id)\
-        .all()
+def get_atencion_ids_by_empresa(db: Session, empresa_id: int) -> List[str]:
+    """IDs de todas las atenciones de una empresa"""
+    return [row.id for row in db.query(Atencion.id).filter(Atencion.id_empresa == empresa_id)]
 
 
-def get_atenciones_by_estado(db: Session, estado_id: int) -> List[Atencion]:
-    """Obtiene todas las atenciones por estado"""
-    return db.query(Atencion)\
-        .options(
-            joinedload(Atencion.paciente),
-            joinedload(Atencion.empresa),
-            joinedload(Atencion.seguimiento_atencion),
-            joinedload(Atencion.servicios_rel).joinedload(AtencionServicio.servicio)
-        )\
-        .filter(Atencion.id_estado_atencion == estado_id)\
-        .all()
+def get_atencion_ids_by_estado(db: Session, estado_id: int) -> List[str]:
+    """IDs de todas las atenciones por estado"""
+    return [row.id for row in db.query(Atencion.id).filter(Atencion.id_estado_atencion == estado_id)]
 
 
-def search_atenciones(
+def search_atencion_ids(
     db: Session,
     search_term: Optional[str] = None,
     empresa_id: Optional[int] = None,
     estado_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100
-) -> List[Atencion]:
-    """Busca atenciones con filtros opcionales"""
-    query = db.query(Atencion)\
-        .options(
-            joinedload(Atencion.paciente),
-            joinedload(Atencion.empresa),
-            joinedload(Atencion.estado_atencion),
-            joinedload(Atencion.seguimiento_atencion),
-            joinedload(Atencion.servicios_rel).joinedload(AtencionServicio.servicio)
-        )
+) -> List[str]:
+    """IDs de las atenciones que cumplen los filtros de búsqueda"""
+    query = db.query(Atencion.id)
     
     # Aplicar filtros
     filters = []
     
+    search_term = (search_term or "").strip()
     if search_term:
-        # Buscar en ID de atención, ID de paciente y nombre del paciente
-        filters.append(
-            or_(
-                Atencion.id.ilike(f"%{search_term}%"),
-                Atencion.id_paciente.ilike(f"%{search_term}%"),
-                Atencion.paciente.has(
-                    or_(
-                        Atencion.paciente.property.mapper.class_.primer_nombre.ilike(f"%{search_term}%"),
-                        Atencion.paciente.property.mapper.class_.primer_apellido.ilike(f"%{search_term}%")
-                    )
-                )
+        # Atenciones cuyo ID (completo o su consecutivo numérico) empieza por el término, o de
+        # pacientes encontrados en el índice de tokens (documento y nombres). Las coincidencias
+        # se unen a la consulta, así filtros, orden y paginación cubren todos los candidatos:
+        # primero por ID de atención, luego por relevancia del paciente y por fecha
+        coincidencias_atencion = busqueda_repository.coincidencias_atencion(search_term)
+        coincidencias_paciente = busqueda_repository.coincidencias_paciente(search_term)
+        if coincidencias_atencion is None and coincidencias_paciente is None:
+            return []
+        candidatos = []
+        orden = []
+        if coincidencias_atencion is not None:
+            por_atencion = coincidencias_atencion.cte("coincidencias_atencion")
+            candidatos.append(select(por_atencion.c.id_atencion.label("id")))
+            query = query.outerjoin(por_atencion, por_atencion.c.id_atencion == Atencion.id)
+            orden.append(func.coalesce(por_atencion.c.puntaje, 0).desc())
+        if coincidencias_paciente is not None:
+            por_paciente = coincidencias_paciente.cte("coincidencias_paciente")
+            candidatos.append(
+                select(Atencion.id).join(por_paciente, por_paciente.c.id_paciente == Atencion.id_paciente)
             )
-        )
+            query = query.outerjoin(por_paciente, por_paciente.c.id_paciente == Atencion.id_paciente)
+            orden.append(func.coalesce(por_paciente.c.puntaje, 0).desc())
+        # Los candidatos salen del índice de tokens; atenciones sólo se lee por clave primaria
+        candidatos = union(*candidatos).subquery("candidatos") if len(candidatos) > 1 \
+            else candidatos[0].subquery("candidatos")
+        query = query.join(candidatos, candidatos.c.id == Atencion.id)\
+            .order_by(*orden, Atencion.fecha_ingreso.desc(), Atencion.id)
     
     if empresa_id:
         filters.append(Atencion.id_empresa == empresa_id)
@@ -155,13 +253,32 @@ def search_atenciones(
     if filters:
         query = query.filter(and_(*filters))
     
-    return query.offset(skip).limit(limit).all()
+    return [row.id for row in query.offset(skip).limit(limit)]
+
+
+def get_existing_atencion_ids(db: Session, atencion_ids: Iterable[str]) -> Set[str]:
+    """Obtiene, con consultas IN por lotes, cuáles de los IDs dados ya existen"""
+    existentes = set()
+    for chunk in chunked(set(atencion_ids)):
+        rows = db.query(Atencion.id).filter(Atencion.id.in_(chunk)).all()
+        existentes.update(row.id for row in rows)
+    return existentes
+
+
+def bulk_insert_atenciones(db: Session, atenciones: List[dict]) -> None:
+    """
+    Inserta atenciones en lote; las que ya existen no se modifican.
+    Se espera que `atenciones` sean nuevas (sus tokens de búsqueda se agregan aquí).
+    """
+    insert_ignore_duplicates(db, Atencion.__table__, atenciones)
+    busqueda_repository.indexar_atenciones(db, [atencion["id"] for atencion in atenciones])
 
 
 def create_atencion(db: Session, atencion: Atencion) -> Atencion:
     """Crea una nueva atención"""
     db.add(atencion)
     db.flush()
+    busqueda_repository.indexar_atenciones(db, [atencion.id])
     return atencion
 
 
@@ -0,0 +1,31 @@
+from sqlalchemy import Table
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from typing import Iterable, Iterator, List
+
+# Tamaño máximo de cada lote para cláusulas IN (...) e INSERT multi-fila
+BULK_CHUNK_SIZE = 1000
+
+
+def chunked(items: Iterable, size: int = BULK_CHUNK_SIZE) -> Iterator[list]:
+    """Divide un iterable en listas de como máximo `size` elementos"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def insert_ignore_duplicates(db: Session, table: Table, rows: List[dict], clave: str = "id") -> None:
+    """
+    Inserta filas en lote con INSERT ... VALUES (...), (...) ON DUPLICATE KEY UPDATE.
+    Las filas cuya clave primaria ya existe no se modifican (la actualización es un no-op
+    sobre la columna `clave`).
+    """
+    for chunk in chunked(rows):
+        stmt = mysql_insert(table).values(chunk)
+        stmt = stmt.on_duplicate_key_update({clave: stmt.inserted[clave]})
+        db.execute(stmt)
@@ -0,0 +1,177 @@
+"""
+Índices de búsqueda de pacientes (tabla pacientes_busqueda_tokens) y de atenciones por ID
+(tabla atenciones_busqueda_tokens).
+
+Cada paciente se indexa con un token por palabra de sus nombres y uno por su documento, todos
+normalizados (minúsculas, sin tildes). Las búsquedas son por prefijo de token y se ordenan por
+cuántos términos coinciden, priorizando las coincidencias exactas.
+
+Cada atención se indexa con su ID normalizado y con cada grupo de dígitos del ID, para que el
+consecutivo sin prefijo ('12345') encuentre 'ADM12345'.
+"""
+from functools import reduce
+from sqlalchemy import Select, case, desc, func, or_, select
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional, Set
+import operator
+import re
+import unicodedata
+
+from app.persistence.entity.atenciones_busqueda_tokens_entity import AtencionBusquedaToken
+from app.persistence.entity.pacientes_busqueda_tokens_entity import PacienteBusquedaToken
+from app.persistence.repository.bulk_helpers import insert_ignore_duplicates
+
+# Longitud máxima de un token (columna token) y de términos considerados por búsqueda
+MAX_LONGITUD_TOKEN = 100
+MAX_TERMINOS = 5
+
+_NO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+_DIGITOS = re.compile(r"[0-9]+")
+
+_CAMPOS_NOMBRE = ("primer_nombre", "segundo_nombre", "primer_apellido", "segundo_apellido")
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes/diacríticos ('Peña' -> 'pena')"""
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).lower()
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Palabras normalizadas del texto, sin repetir y en orden de aparición"""
+    tokens = []
+    for token in _NO_ALFANUMERICO.split(normalizar(texto)):
+        token = token[:MAX_LONGITUD_TOKEN]
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def normalizar_documento(documento: str) -> str:
+    """Documento sin separadores ni tildes ('1.234.567' -> '1234567')"""
+    return _NO_ALFANUMERICO.sub("", normalizar(documento))[:MAX_LONGITUD_TOKEN]
+
+
+def _valor(paciente, campo: str):
+    return paciente.get(campo) if isinstance(paciente, dict) else getattr(paciente, campo, None)
+
+
+def tokens_paciente(paciente) -> Set[str]:
+    """Tokens de un paciente (entidad Paciente o dict con sus columnas)"""
+    tokens = set()
+    for campo in _CAMPOS_NOMBRE:
+        tokens.update(tokenizar(_valor(paciente, campo)))
+    documento = normalizar_documento(_valor(paciente, "id"))
+    if documento:
+        tokens.add(documento)
+    return tokens
+
+
+def indexar_pacientes(db: Session, pacientes: Iterable) -> None:
+    """
+    Agrega los tokens de pacientes recién insertados. No hace commit.
+    Para pacientes existentes cuyos datos cambiaron usar reindexar_paciente().
+    """
+    filas = [
+        {"token": token, "id_paciente": _valor(paciente, "id")}
+        for paciente in pacientes
+        for token in tokens_paciente(paciente)
+    ]
+    if filas:
+        insert_ignore_duplicates(db, PacienteBusquedaToken.__table__, filas, clave="id_paciente")
+
+
+def reindexar_paciente(db: Session, paciente) -> None:
+    """Reemplaza los tokens de un paciente ya persistido (flush previo). No hace commit."""
+    db.query(PacienteBusquedaToken)\
+        .filter(PacienteBusquedaToken.id_paciente == paciente.id)\
+        .delete(synchronize_session=False)
+    indexar_pacientes(db, [paciente])
+
+
+def coincidencias_paciente(termino: str) -> Optional[Select]:
+    """
+    SELECT (id_paciente, puntaje) de los pacientes cuyos tokens empiezan por alguno de los
+    términos de búsqueda: cada término suma 2 si coincide con un token completo y 1 si sólo es
+    prefijo. None si el término no tiene nada que buscar.
+    """
+    terminos = tokenizar(termino)[:MAX_TERMINOS]
+    # Un documento con separadores ('1.234.567') se busca también como un solo token
+    if len(terminos) > 1 and not any(c.isspace() for c in termino.strip()):
+        terminos.append(normalizar_documento(termino))
+    if not terminos:
+        return None
+    token = PacienteBusquedaToken.token
+    # Los términos sólo contienen [a-z0-9], así que no hay comodines de LIKE que escapar
+    puntaje = reduce(operator.add, [
+        func.max(case((token == t, 2), (token.like(f"{t}%"), 1), else_=0))
+        for t in terminos
+    ]).label("puntaje")
+    return select(PacienteBusquedaToken.id_paciente, puntaje)\
+        .where(or_(*[token.like(f"{t}%") for t in terminos]))\
+        .group_by(PacienteBusquedaToken.id_paciente)
+
+
+def buscar_paciente_ids(db: Session, termino: str, skip: int = 0, limit: int = 100) -> List[str]:
+    """IDs de pacientes que coinciden con el término, ordenados por relevancia"""
+    coincidencias = coincidencias_paciente(termino)
+    if coincidencias is None:
+        return []
+    rows = db.execute(
+        coincidencias
+        .order_by(desc("puntaje"), PacienteBusquedaToken.id_paciente)
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    return [row.id_paciente for row in rows]
+
+
+def tokens_atencion(atencion_id: str) -> Set[str]:
+    """Tokens de un ID de atención: el ID normalizado y sus grupos de dígitos"""
+    normalizado = normalizar_documento(atencion_id)
+    if not normalizado:
+        return set()
+    return {normalizado} | set(_DIGITOS.findall(normalizado))
+
+
+def indexar_atenciones(db: Session, atencion_ids: Iterable[str]) -> None:
+    """Agrega los tokens de atenciones recién insertadas (ya en la BD). No hace commit."""
+    filas = [
+        {"token": token, "id_atencion": atencion_id}
+        for atencion_id in atencion_ids
+        for token in tokens_atencion(atencion_id)
+    ]
+    if filas:
+        insert_ignore_duplicates(db, AtencionBusquedaToken.__table__, filas, clave="id_atencion")
+
+
+def coincidencias_atencion(termino: str) -> Optional[Select]:
+    """
+    SELECT (id_atencion, puntaje) de las atenciones con algún token que empieza por el término
+    normalizado ('ADM-123', 'adm123' y '123' son equivalentes): puntaje 2 si coincide con un
+    token completo y 1 si sólo es prefijo. None si el término no tiene nada que buscar.
+    """
+    normalizado = normalizar_documento(termino)
+    if not normalizado:
+        return None
+    token = AtencionBusquedaToken.token
+    puntaje = func.max(case((token == normalizado, 2), else_=1)).label("puntaje")
+    return select(AtencionBusquedaToken.id_atencion, puntaje)\
+        .where(token.like(f"{normalizado}%"))\
+        .group_by(AtencionBusquedaToken.id_atencion)
+
+
+def buscar_atencion_ids(db: Session, termino: str, limit: int = 100) -> List[str]:
+    """IDs de atenciones cuyo ID coincide con el término; primero las coincidencias exactas"""
+    coincidencias = coincidencias_atencion(termino)
+    if coincidencias is None:
+        return []
+    rows = db.execute(
+        coincidencias.order_by(desc("puntaje"), AtencionBusquedaToken.id_atencion).limit(limit)
+    ).all()
+    return [row.id_atencion for row in rows]
+
+
+def escapar_like(texto: str) -> str:
+    """Escapa los comodines de LIKE para buscar `texto` literalmente (con '\\' como escape)"""
+    return texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
@@ -0,0 +1,136 @@
+"""
+Operaciones atómicas sobre la tabla edit_locks (bloqueos de edición compartidos).
+
+Todas las comparaciones de vigencia usan el reloj de MySQL (NOW(6)), así los workers y
+réplicas coinciden aunque sus relojes difieran. Ninguna función hace commit.
+"""
+from sqlalchemy import case, delete, func, literal_column, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
+import uuid
+
+from app.persistence.entity.edit_lock_entity import EditLock
+from app.persistence.repository.bulk_helpers import BULK_CHUNK_SIZE
+from app.persistence.repository.busqueda_repository import escapar_like
+
+_tabla = EditLock.__table__
+_AHORA = literal_column("NOW(6)")
+
+
+def _vencimiento(ttl_segundos: int):
+    return literal_column(f"NOW(6) + INTERVAL {int(ttl_segundos)} SECOND")
+
+
+def _columnas():
+    return (
+        _tabla.c.recurso,
+        _tabla.c.token,
+        _tabla.c.owner_id,
+        _tabla.c.owner,
+        func.unix_timestamp(_tabla.c.locked_at).label("locked_at"),
+        func.unix_timestamp(_tabla.c.expires_at).label("expires_at"),
+    )
+
+
+def _select_vigente(recurso: str):
+    return select(*_columnas()).where(_tabla.c.recurso == recurso, _tabla.c.expires_at > _AHORA)
+
+
+def try_acquire(
+    db: Session,
+    recurso: str,
+    owner_id: str,
+    owner: Dict[str, Any],
+    ttl_segundos: int
+) -> Tuple[bool, Optional[RowMapping]]:
+    """
+    Intenta tomar el bloqueo en una sola sentencia INSERT ... ON DUPLICATE KEY UPDATE:
+    si la fila existe y sigue vigente no se modifica; si está vencida se sobrescribe.
+    Retorna (adquirido, fila vigente).
+    """
+    token = uuid.uuid4().hex
+    stmt = mysql_insert(_tabla).values(
+        recurso=recurso,
+        token=token,
+        owner_id=owner_id,
+        owner=owner,
+        locked_at=_AHORA,
+        expires_at=_vencimiento(ttl_segundos),
+    )
+    vencido = _tabla.c.expires_at <= _AHORA
+
+    def _si_vencido(columna: str):
+        return case((vencido, stmt.inserted[columna]), else_=_tabla.c[columna])
+
+    # MySQL evalúa las asignaciones en orden y cada una ve los valores ya actualizados:
+    # expires_at, que decide la condición, debe ir al final
+    stmt = stmt.on_duplicate_key_update([
+        ("token", _si_vencido("token")),
+        ("owner_id", _si_vencido("owner_id")),
+        ("owner", _si_vencido("owner")),
+        ("locked_at", _si_vencido("locked_at")),
+        ("expires_at", _si_vencido("expires_at")),
+    ])
+    db.execute(stmt)
+    fila = db.execute(_select_vigente(recurso)).mappings().first()
+    return (fila is not None and fila["token"] == token), fila
+
+
+def get_vigente(db: Session, recurso: str) -> Optional[RowMapping]:
+    """Bloqueo vigente del recurso, o None"""
+    return db.execute(_select_vigente(recurso)).mappings().first()
+
+
+def get_vigentes_por_prefijo(db: Session, prefijo: str) -> List[RowMapping]:
+    """Bloqueos vigentes cuya clave empieza por `prefijo` (recorrido por rango de la PK)"""
+    return db.execute(
+        select(*_columnas())
+        .where(
+            _tabla.c.recurso.like(f"{escapar_like(prefijo)}%", escape="\\"),
+            _tabla.c.expires_at > _AHORA,
+        )
+        .order_by(_tabla.c.recurso)
+    ).mappings().all()
+
+
+def refresh(db: Session, recurso: str, owner_id: str, ttl_segundos: int) -> bool:
+    """Extiende el vencimiento de un bloqueo vigente del mismo dueño"""
+    result = db.execute(
+        update(_tabla)
+        .where(
+            _tabla.c.recurso == recurso,
+            _tabla.c.owner_id == owner_id,
+            _tabla.c.expires_at > _AHORA,
+        )
+        .values(expires_at=_vencimiento(ttl_segundos))
+    )
+    return result.rowcount > 0
+
+
+def delete_lock(db: Session, recurso: str, owner_id: Optional[str] = None) -> int:
+    """
+    Elimina el bloqueo del recurso. Con owner_id sólo se elimina si pertenece a ese dueño
+    o si ya venció.
+    """
+    stmt = delete(_tabla).where(_tabla.c.recurso == recurso)
+    if owner_id is not None:
+        stmt = stmt.where(or_(_tabla.c.owner_id == owner_id, _tabla.c.expires_at <= _AHORA))
+    return db.execute(stmt).rowcount
+
+
+def delete_vencidos(db: Session, limite: int = BULK_CHUNK_SIZE) -> List[str]:
+    """
+    Elimina hasta `limite` bloqueos vencidos y retorna sus claves. Las filas se bloquean con
+    FOR UPDATE para que un acquire concurrente no las reutilice entre la lectura y el borrado.
+    """
+    recursos = list(db.execute(
+        select(_tabla.c.recurso)
+        .where(_tabla.c.expires_at <= _AHORA)
+        .limit(limite)
+        .with_for_update(skip_locked=True)
+    ).scalars())
+    if recursos:
+        db.execute(delete(_tabla).where(_tabla.c.recurso.in_(recursos)))
+    return recursos
@@ -1,6 +1,8 @@
 from sqlalchemy.orm import Session, joinedload
+from typing import Iterable, List, Set
 from app.persistence.entity.empresas_entity import Empresa
 from app.persistence.entity.tipos_empresas_entity import TipoEmpresa
+from app.persistence.repository.bulk_helpers import chunked, insert_ignore_duplicates
 
 
 class EmpresaRepository:
@@ -17,6 +19,17 @@ class EmpresaRepository:
     def get_by_id(self, db: Session, empresa_id: int):
         return db.query(Empresa).filter(Empresa.id == empresa_id).first()
 
+    def get_existing_ids(self, db: Session, empresa_ids: Iterable[int]) -> Set[int]:
+        existentes = set()
+        for chunk in chunked(set(empresa_ids)):
+            rows = db.query(Empresa.id).filter(Empresa.id.in_(chunk)).all()
+            existentes.update(row.id for row in rows)
+        return existentes
+
+    def bulk_insert(self, db: Session, empresas: List[dict]):
+        # No hace commit: el llamador controla la transacción
+        insert_ignore_duplicates(db, Empresa.__table__, empresas)
+
     def update(self, db: Session, empresa: Empresa, new_data: dict):
         for key, value in new_data.items():
             setattr(empresa, key, value)
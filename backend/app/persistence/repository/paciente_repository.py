@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
-from typing import List
+from typing import Iterable, List, Set
 from app.persistence.entity.pacientes_entity import Paciente
+from app.persistence.repository.bulk_helpers import chunked, insert_ignore_duplicates
+from app.persistence.repository import busqueda_repository
 
 
 def get_all_pacientes(db: Session, skip: int = 0, limit: int = 100) -> List[Paciente]:
@@ -14,22 +15,19 @@ def get_all_pacientes(db: Session, skip: int = 0, limit: int = 100) -> List[Paci
 
 
 def search_pacientes(db: Session, search_term: str, skip: int = 0, limit: int = 100) -> List[Paciente]:
-    """Busca pacientes por ID, nombre o apellido"""
-    search_pattern = f"%{search_term}%"
-    return db.query(Paciente)\
+    """
+    Busca pacientes por prefijo de documento, nombres o apellidos (sin distinguir tildes ni
+    mayúsculas) usando el índice de tokens, ordenados por relevancia.
+    """
+    ids = busqueda_repository.buscar_paciente_ids(db, search_term, skip, limit)
+    if not ids:
+        return []
+    pacientes = db.query(Paciente)\
         .options(joinedload(Paciente.tipo_documento))\
-        .filter(
-            or_(
-                Paciente.id.ilike(search_pattern),
-                Paciente.primer_nombre.ilike(search_pattern),
-                Paciente.segundo_nombre.ilike(search_pattern),
-                Paciente.primer_apellido.ilike(search_pattern),
-                Paciente.segundo_apellido.ilike(search_pattern)
-            )
-        )\
-        .offset(skip)\
-        .limit(limit)\
+        .filter(Paciente.id.in_(ids))\
         .all()
+    por_id = {p.id: p for p in pacientes}
+    return [por_id[paciente_id] for paciente_id in ids if paciente_id in por_id]
 
 
 def get_paciente_by_id(db: Session, paciente_id: str) -> Paciente | None:
@@ -40,10 +38,29 @@ def get_paciente_by_id(db: Session, paciente_id: str) -> Paciente | None:
         .first()
 
 
+def get_existing_paciente_ids(db: Session, paciente_ids: Iterable[str]) -> Set[str]:
+    """Obtiene, con consultas IN por lotes, cuáles de los IDs dados ya existen"""
+    existentes = set()
+    for chunk in chunked(set(paciente_ids)):
+        rows = db.query(Paciente.id).filter(Paciente.id.in_(chunk)).all()
+        existentes.update(row.id for row in rows)
+    return existentes
+
+
+def bulk_insert_pacientes(db: Session, pacientes: List[dict]) -> None:
+    """
+    Inserta pacientes en lote; los que ya existen no se modifican.
+    Se espera que `pacientes` sean nuevos (sus tokens de búsqueda se agregan aquí).
+    """
+    insert_ignore_duplicates(db, Paciente.__table__, pacientes)
+    busqueda_repository.indexar_pacientes(db, pacientes)
+
+
 def create_paciente(db: Session, paciente: Paciente) -> Paciente:
     """Crea un nuevo paciente"""
     db.add(paciente)
     db.flush()
+    busqueda_repository.indexar_pacientes(db, [paciente])
     db.refresh(paciente)
     return paciente
 
@@ -54,6 +71,7 @@ def update_paciente(db: Session, paciente_obj: Paciente, data: dict) -> Paciente
         if value is not None:  # Solo actualizar campos no nulos
             setattr(paciente_obj, key, value)
     db.flush()
+    busqueda_repository.reindexar_paciente(db, paciente_obj)
     db.refresh(paciente_obj)
     return paciente_obj
 
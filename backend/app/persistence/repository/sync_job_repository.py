@@ -0,0 +1,50 @@
+from datetime import datetime
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.orm import Session
+from typing import List, Optional, Sequence
+from app.persistence.entity.sync_job_entity import SyncJob
+
+_tabla = SyncJob.__table__
+
+
+def save_job(db: Session, job: dict) -> None:
+    """Crea o reemplaza el estado de un job (no hace commit)"""
+    stmt = mysql_insert(_tabla).values(**job)
+    stmt = stmt.on_duplicate_key_update({
+        columna.name: stmt.inserted[columna.name] for columna in _tabla.columns if not columna.primary_key
+    })
+    db.execute(stmt)
+
+
+def get_job(db: Session, job_id: str) -> Optional[SyncJob]:
+    """Obtiene un job por ID"""
+    return db.get(SyncJob, job_id)
+
+
+def list_jobs(db: Session, limit: int) -> List[SyncJob]:
+    """Jobs más recientes primero"""
+    return db.query(SyncJob).order_by(SyncJob.creado_en.desc()).limit(limit).all()
+
+
+def delete_antiguos(db: Session, conservar: int) -> int:
+    """Elimina los jobs fuera de los `conservar` más recientes (no hace commit)"""
+    limite = db.execute(
+        select(_tabla.c.creado_en).order_by(_tabla.c.creado_en.desc()).offset(conservar).limit(1)
+    ).scalar()
+    if limite is None:
+        return 0
+    return db.execute(delete(_tabla).where(_tabla.c.creado_en <= limite)).rowcount
+
+
+def marcar_interrumpidos(db: Session, estados_abiertos: Sequence[str], limite: datetime, estado: str, error: str) -> int:
+    """
+    Cierra los jobs abiertos cuyo latido es anterior a `limite` (su worker se detuvo sin terminarlos).
+    No hace commit.
+    """
+    ultima_escritura = func.coalesce(_tabla.c.actualizado_en, _tabla.c.creado_en)
+    return db.execute(
+        update(_tabla)
+        .where(_tabla.c.estado.in_(estados_abiertos), ultima_escritura < limite)
+        .values(estado=estado, error=error, finalizado_en=datetime.now())
+    ).rowcount
@@ -0,0 +1,40 @@
+from sqlalchemy import func, insert, or_, tuple_, update
+from sqlalchemy.orm import Session
+from datetime import datetime
+from app.persistence.entity.sync_watermark_entity import SyncWatermark
+
+_tabla = SyncWatermark.__table__
+
+
+def get_watermark(db: Session, fuente: str) -> SyncWatermark | None:
+    """Obtiene la marca de agua de una fuente de sincronización"""
+    return db.query(SyncWatermark).filter(SyncWatermark.fuente == fuente).first()
+
+
+def save_watermark(db: Session, fuente: str, ultima_fecha: datetime, ultimo_consecutivo: int) -> bool:
+    """
+    Avanza la marca de agua sólo si (ultima_fecha, ultimo_consecutivo) es posterior a la guardada.
+    La comparación va en el mismo UPDATE (que bloquea la fila), así una ejecución más lenta nunca
+    la hace retroceder. No hace commit: se confirma junto con el lote.
+    
+    Returns:
+        bool: True si la marca avanzó
+    """
+    db.execute(insert(_tabla).prefix_with("IGNORE").values(fuente=fuente))
+    result = db.execute(
+        update(_tabla)
+        .where(
+            _tabla.c.fuente == fuente,
+            or_(
+                _tabla.c.ultima_fecha.is_(None),
+                tuple_(_tabla.c.ultima_fecha, func.coalesce(_tabla.c.ultimo_consecutivo, -1))
+                < tuple_(ultima_fecha, ultimo_consecutivo),
+            ),
+        )
+        .values(
+            ultima_fecha=ultima_fecha,
+            ultimo_consecutivo=ultimo_consecutivo,
+            fecha_actualizacion=datetime.now(),
+        )
+    )
+    return result.rowcount > 0
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
 from datetime import date
 
 from app.configuration.app.database import get_db
@@ -10,30 +10,38 @@ from app.presentation.dto.atencion_paciente_dto import (
     AtencionUpdateDto,
     AtencionDetalleResponseDto,
     AtencionListResponseDto,
+    AtencionPaginaResponseDto,
     AtencionConPacienteCreateDto,
 )
 from app.service.implementation.atencion_service import AtencionService
-from app.service.implementation.lock_service import get_lock_service
+from app.service.implementation.lock_service import get_lock_service, NS_ATENCIONES
+from app.presentation.controller.lock_routes import crear_rutas_bloqueo
 from app.service.implementation.websocket_manager import get_websocket_manager
 
 
 router = APIRouter(prefix="/atenciones", dependencies=[Depends(get_current_user)])
-lock_service = get_lock_service()
+lock_service = get_lock_service().namespace(NS_ATENCIONES)
 ws_manager = get_websocket_manager()
 
 
 # ==================== NUEVOS ENDPOINTS ====================
 
-@router.get("", response_model=List[AtencionListResponseDto], tags=["Atenciones"])
+@router.get("", response_model=List[AtencionListResponseDto], tags=["Atenciones"], deprecated=True)
 def get_all_atenciones(
     skip: int = Query(0, ge=0),
+    # Límite histórico: se conserva mientras el endpoint siga disponible para no romper clientes
     limit: int = Query(100, ge=1, le=100000),
     fecha: Optional[date] = Query(None, description="Filtrar por fecha (YYYY-MM-DD)"),
     fecha_inicio: Optional[date] = Query(None, description="Fecha inicio del rango (YYYY-MM-DD)"),
     fecha_fin: Optional[date] = Query(None, description="Fecha fin del rango (YYYY-MM-DD)"),
     db: Session = Depends(get_db)
 ):
-    """Obtiene todas las atenciones con información resumida"""
+    """
+    Obtiene atenciones con información resumida (paginación skip/limit).
+    
+    Obsoleto: el costo de cada página crece con `skip`. Usar `GET /atenciones/pagina` (cursor)
+    para recorrer el listado y `GET /atenciones/export` para descargarlo completo.
+    """
     try:
         return AtencionService.get_all_atenciones(
             db, 
@@ -47,6 +55,65 @@ def get_all_atenciones(
         raise HTTPException(status_code=500, detail=f"Error obteniendo atenciones: {str(e)}")
 
 
+@router.get("/pagina", response_model=AtencionPaginaResponseDto, tags=["Atenciones"])
+def get_atenciones_paginadas(
+    cursor: Optional[str] = Query(None, description="Cursor `next_cursor` de la página anterior"),
+    limit: int = Query(100, ge=1, le=1000),
+    fecha: Optional[date] = Query(None, description="Filtrar por fecha (YYYY-MM-DD)"),
+    fecha_inicio: Optional[date] = Query(None, description="Fecha inicio del rango (YYYY-MM-DD)"),
+    fecha_fin: Optional[date] = Query(None, description="Fecha fin del rango (YYYY-MM-DD)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Obtiene atenciones paginadas por cursor (más recientes primero).
+    
+    A diferencia de skip/limit, el costo de cada página no crece con su profundidad.
+    """
+    try:
+        return AtencionService.get_atenciones_paginadas(
+            db,
+            limit=limit,
+            cursor=cursor,
+            fecha=fecha,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error obteniendo atenciones: {str(e)}")
+
+
+@router.get("/export", tags=["Atenciones"])
+def export_atenciones(
+    formato: Literal["ndjson", "csv"] = Query("ndjson", description="Formato de salida"),
+    fecha: Optional[date] = Query(None, description="Filtrar por fecha (YYYY-MM-DD)"),
+    fecha_inicio: Optional[date] = Query(None, description="Fecha inicio del rango (YYYY-MM-DD)"),
+    fecha_fin: Optional[date] = Query(None, description="Fecha fin del rango (YYYY-MM-DD)"),
+    empresa_id: Optional[int] = Query(None, description="Filtrar por empresa"),
+    estado_id: Optional[int] = Query(None, description="Filtrar por estado"),
+):
+    """
+    Exporta las atenciones filtradas como NDJSON (un AtencionListResponseDto por línea) o CSV.
+    
+    Las filas se envían a medida que se leen de la BD, así que la memoria no crece con el
+    tamaño del rango y el primer byte llega sin esperar a la consulta completa.
+    """
+    contenido = AtencionService.exportar_atenciones(
+        formato=formato,
+        fecha=fecha,
+        fecha_inicio=fecha_inicio,
+        fecha_fin=fecha_fin,
+        empresa_id=empresa_id,
+        estado_id=estado_id
+    )
+    return StreamingResponse(
+        contenido,
+        media_type=AtencionService.FORMATOS_EXPORTACION[formato],
+        headers={"Content-Disposition": f'attachment; filename="atenciones.{formato}"'}
+    )
+
+
 @router.get("/buscar", response_model=List[AtencionListResponseDto], tags=["Atenciones"])
 def search_atenciones(
     search: Optional[str] = Query(None, description="Término de búsqueda (ID, nombre paciente)"),
@@ -84,7 +151,7 @@ async def create_atencion_con_paciente(
     try:
         result = AtencionService.create_atencion_con_paciente(db, data)
         # Emitir evento WebSocket
-        await ws_manager.send_event("create", "atenciones", result.model_dump(mode='json') if hasattr(result, 'model_dump') else dict(result))
+        await ws_manager.send_event("create", "atenciones", result)
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -103,11 +170,13 @@ async def update_atencion(
     
     Se pueden actualizar todos los campos incluyendo los servicios.
     """
+    # Valores antes del cambio: el evento llega también a quien filtraba por ellos
+    previous = AtencionService.get_valores_filtro(db, atencion_id)
     atencion = AtencionService.update_atencion(db, atencion_id, atencion_data)
     if not atencion:
         raise HTTPException(status_code=404, detail="Atención no encontrada")
     # Emitir evento WebSocket
-    await ws_manager.send_event("update", "atenciones", atencion.model_dump(mode='json') if hasattr(atencion, 'model_dump') else dict(atencion))
+    await ws_manager.send_event("update", "atenciones", atencion, previous=previous)
     return atencion
 
 
@@ -126,37 +195,4 @@ async def delete_atencion(
 
 
 # --- Lock endpoints para control de concurrencia de edición ---
-@router.post("/{atencion_id}/lock", tags=["Atenciones"])
-def acquire_lock(atencion_id: str, current_user: dict = Depends(get_current_user)):
-    try:
-        locker = {'id': current_user.get('id'), 'username': current_user.get('sub') or current_user.get('username')}
-        res = lock_service.acquire(str(atencion_id), locker)
-        if res.get('ok'):
-            return {'locked': True, 'lockedBy': res.get('lockedBy')}
-        else:
-            return JSONResponse(status_code=409, content={'locked': True, 'lockedBy': res.get('lockedBy')})
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/{atencion_id}/lock", tags=["Atenciones"])
-def status_lock(atencion_id: str):
-    try:
-        st = lock_service.status(str(atencion_id))
-        return st
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.delete("/{atencion_id}/lock", tags=["Atenciones"])
-def release_lock(atencion_id: str, current_user: dict = Depends(get_current_user)):
-    try:
-        locker_id = current_user.get('id')
-        ok = lock_service.release(str(atencion_id), locker_id)
-        if not ok:
-            raise HTTPException(status_code=403, detail="Solo el dueño del lock puede liberarlo")
-        return {'released': True}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+router.include_router(crear_rutas_bloqueo(lock_service, get_current_user))
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.configuration.security.security_dependencies import get_current_user
+from app.service.implementation.lock_service import get_lock_service, NAMESPACES
+
+router = APIRouter(prefix="/locks", tags=["Locks"], dependencies=[Depends(get_current_user)])
+lock_service = get_lock_service()
+
+
+@router.get("")
+def list_locks(resource: str = Query(..., description=f"Tipo de recurso: {', '.join(NAMESPACES)}")):
+    """
+    Bloqueos de edición vigentes de un tipo de recurso, en una sola llamada.
+    Los cambios posteriores llegan por WebSocket (recurso 'locks').
+    """
+    if resource not in NAMESPACES:
+        raise HTTPException(status_code=400, detail=f"Recurso desconocido: {resource}")
+    try:
+        return {'resource': resource, 'locks': lock_service.list_locks(resource)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,57 @@
+from typing import Callable
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
+
+from app.service.implementation.lock_service import LockNamespace
+
+
+def crear_rutas_bloqueo(lock_service: LockNamespace, usuario_actual: Callable, tipo_id: type = str) -> APIRouter:
+    """
+    Endpoints /{resource_id}/lock (adquirir, renovar, consultar y liberar) del bloqueo de edición
+    de un recurso. Cada controller los incluye en su router con el espacio de nombres del recurso,
+    la dependencia que autentica al usuario (get_current_user o get_current_admin) y el tipo de su ID.
+    """
+    router = APIRouter(dependencies=[Depends(usuario_actual)])
+
+    @router.post("/{resource_id}/lock")
+    def acquire_lock(resource_id: tipo_id, current_user: dict = Depends(usuario_actual)):
+        try:
+            locker = {'id': current_user.get('id'), 'username': current_user.get('sub') or current_user.get('username')}
+            res = lock_service.acquire(str(resource_id), locker)
+            if res.get('ok'):
+                return {'locked': True, 'lockedBy': res.get('lockedBy')}
+            return JSONResponse(status_code=409, content={'locked': True, 'lockedBy': res.get('lockedBy')})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @router.put("/{resource_id}/lock")
+    def renew_lock(resource_id: tipo_id, current_user: dict = Depends(usuario_actual)):
+        """Heartbeat: renueva por otro TTL el bloqueo que tiene el usuario actual."""
+        try:
+            if lock_service.refresh(str(resource_id), current_user.get('id')):
+                return {'locked': True, 'expiresIn': lock_service.ttl_seconds}
+            # El bloqueo venció o lo tomó otro usuario
+            st = lock_service.status(str(resource_id))
+            return JSONResponse(status_code=409, content={'locked': st.get('locked', False), 'lockedBy': st.get('lockedBy')})
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @router.get("/{resource_id}/lock")
+    def status_lock(resource_id: tipo_id):
+        try:
+            return lock_service.status(str(resource_id))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @router.delete("/{resource_id}/lock")
+    def release_lock(resource_id: tipo_id, current_user: dict = Depends(usuario_actual)):
+        try:
+            if not lock_service.release(str(resource_id), current_user.get('id')):
+                raise HTTPException(status_code=403, detail="Solo el dueño del lock puede liberarlo")
+            return {'released': True}
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return router
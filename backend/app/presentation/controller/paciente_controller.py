@@ -1,5 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
@@ -10,12 +9,13 @@ from app.presentation.dto.paciente_dto import (
     PacienteResponseDto
 )
 from app.service.implementation.paciente_service import PacienteService
-from app.service.implementation.lock_service import get_lock_service
+from app.service.implementation.lock_service import get_lock_service, NS_PACIENTES
+from app.presentation.controller.lock_routes import crear_rutas_bloqueo
 from app.service.implementation.websocket_manager import get_websocket_manager
 
 
 router = APIRouter(prefix="/pacientes", dependencies=[Depends(get_current_user)])
-lock_service = get_lock_service()
+lock_service = get_lock_service().namespace(NS_PACIENTES)
 ws_manager = get_websocket_manager()
 
 
@@ -80,7 +80,7 @@ async def update_paciente(
         db.refresh(paciente)
         result = _map_to_response_dto(paciente)
         # Emitir evento WebSocket
-        await ws_manager.send_event("update", "pacientes", result.model_dump(mode='json') if hasattr(result, 'model_dump') else dict(result))
+        await ws_manager.send_event("update", "pacientes", result)
         return result
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -140,37 +140,4 @@ def _map_to_response_dto(paciente) -> PacienteResponseDto:
 
 
 # --- Lock endpoints para control de concurrencia de edición ---
-@router.post("/{paciente_id}/lock", tags=["Pacientes"])
-def acquire_lock(paciente_id: str, current_user: dict = Depends(get_current_user)):
-    try:
-        locker = {'id': current_user.get('id'), 'username': current_user.get('sub') or current_user.get('username')}
-        res = lock_service.acquire(str(paciente_id), locker)
-        if res.get('ok'):
-            return {'locked': True, 'lockedBy': res.get('lockedBy')}
-        else:
-            return JSONResponse(status_code=409, content={'locked': True, 'lockedBy': res.get('lockedBy')})
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/{paciente_id}/lock", tags=["Pacientes"])
-def status_lock(paciente_id: str):
-    try:
-        st = lock_service.status(str(paciente_id))
-        return st
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.delete("/{paciente_id}/lock", tags=["Pacientes"])
-def release_lock(paciente_id: str, current_user: dict = Depends(get_current_user)):
-    try:
-        locker_id = current_user.get('id')
-        ok = lock_service.release(str(paciente_id), locker_id)
-        if not ok:
-            raise HTTPException(status_code=403, detail="Solo el dueño del lock puede liberarlo")
-        return {'released': True}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+router.include_router(crear_rutas_bloqueo(lock_service, get_current_user))
@@ -2,12 +2,12 @@ from fastapi import APIRouter, HTTPException, Depends
 from app.presentation.dto.role_dto import RoleCreateDto, RoleUpdateDto, RoleResponseDto
 from app.service.implementation.role_service_impl import RoleServiceImpl
 from app.configuration.security.security_dependencies import get_current_admin
-from app.service.implementation.lock_service import get_lock_service
-from fastapi.responses import JSONResponse
+from app.service.implementation.lock_service import get_lock_service, NS_ROLES
+from app.presentation.controller.lock_routes import crear_rutas_bloqueo
 
 router = APIRouter(prefix="/roles", tags=["Roles"])
 service = RoleServiceImpl()
-lock_service = get_lock_service()
+lock_service = get_lock_service().namespace(NS_ROLES)
 
 
 @router.post("", response_model=RoleResponseDto, dependencies=[Depends(get_current_admin)])
@@ -38,37 +38,4 @@ def delete_role(role_id: int):
 
 
 # --- Bloquear puntos finales para el control de concurrencia de edición (solo administrador) ---
-@router.post("/{role_id}/lock", dependencies=[Depends(get_current_admin)])
-def acquire_lock(role_id: int, current_user: dict = Depends(get_current_admin)):
-    try:
-        locker = {'id': current_user.get('id'), 'username': current_user.get('sub') or current_user.get('username')}
-        res = lock_service.acquire(str(role_id), locker)
-        if res.get('ok'):
-            return {'locked': True, 'lockedBy': res.get('lockedBy')}
-        else:
-            return JSONResponse(status_code=409, content={'locked': True, 'lockedBy': res.get('lockedBy')})
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/{role_id}/lock", dependencies=[Depends(get_current_admin)])
-def status_lock(role_id: int):
-    try:
-        st = lock_service.status(str(role_id))
-        return st
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.delete("/{role_id}/lock", dependencies=[Depends(get_current_admin)])
-def release_lock(role_id: int, current_user: dict = Depends(get_current_admin)):
-    try:
-        locker_id = current_user.get('id')
-        ok = lock_service.release(str(role_id), locker_id)
-        if not ok:
-            raise HTTPException(status_code=403, detail="Solo el dueño del lock puede liberarlo")
-        return {'released': True}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+router.include_router(crear_rutas_bloqueo(lock_service, get_current_admin, int))
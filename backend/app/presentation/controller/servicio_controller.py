@@ -1,13 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
 from app.presentation.dto.servicio_dto import ServicioCreateDto, ServicioUpdateDto, ServicioResponseDto
 from app.service.implementation.servicio_service_impl import ServicioServiceImpl
-from app.service.implementation.lock_service import get_lock_service
+from app.service.implementation.lock_service import get_lock_service, NS_SERVICIOS
+from app.presentation.controller.lock_routes import crear_rutas_bloqueo
 from app.configuration.security.security_dependencies import get_current_admin, get_current_user_with_roles, get_current_user
 
 router = APIRouter(prefix="/servicios", tags=["Servicios"])
 service = ServicioServiceImpl()
-lock_service = get_lock_service()
+lock_service = get_lock_service().namespace(NS_SERVICIOS)
 
 
 @router.post("", response_model=ServicioResponseDto, dependencies=[Depends(get_current_admin)])
@@ -46,36 +46,4 @@ def delete_servicio(servicio_id: int):
 
 
 # --- Lock endpoints para control de concurrencia de edición ---
-@router.post("/{servicio_id}/lock", tags=["Servicios"])
-def acquire_lock(servicio_id: int, current_user: dict = Depends(get_current_user)):
-    try:
-        locker = {'id': current_user.get('id'), 'username': current_user.get('sub') or current_user.get('username')}
-        res = lock_service.acquire(str(servicio_id), locker)
-        if res.get('ok'):
-            return {'locked': True, 'lockedBy': res.get('lockedBy')}
-        else:
-            return JSONResponse(status_code=409, content={'locked': True, 'lockedBy': res.get('lockedBy')})
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.get("/{servicio_id}/lock", tags=["Servicios"])
-def status_lock(servicio_id: int):
-    try:
-        return lock_service.status(str(servicio_id))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-
-@router.delete("/{servicio_id}/lock", tags=["Servicios"])
-def release_lock(servicio_id: int, current_user: dict = Depends(get_current_user)):
-    try:
-        locker_id = current_user.get('id')
-        ok = lock_service.release(str(servicio_id), locker_id)
-        if not ok:
-            raise HTTPException(status_code=403, detail="Solo el dueño del lock puede liberarlo")
-        return {'released': True}
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+router.include_router(crear_rutas_bloqueo(lock_service, get_current_user, int))
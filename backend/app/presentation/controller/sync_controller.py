@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.configuration.app.database import get_db
 from sqlalchemy.orm import Session
-from app.presentation.dto.sync_dto import SyncClinicaResponseDto, SyncRangoFechasDto
-from app.service.implementation.sync_clinica_service import SyncClinicaService
+from typing import List
+from app.presentation.dto.sync_dto import SyncClinicaResponseDto, SyncRangoFechasDto, SyncJobDto
+from app.service.implementation.sync_clinica_service import SyncClinicaService, SyncEnCurso
+from app.service.implementation.scheduler_service import SchedulerService
+from app.service.implementation.sync_job_service import SyncJobService
 from app.configuration.security.security_dependencies import get_current_admin
 
 router = APIRouter(prefix="/sync", dependencies=[Depends(get_current_admin)])
@@ -47,17 +50,51 @@ def sync_from_clinica_florida(
         )
 
 
-@router.post("/clinica-florida/rango-fechas", response_model=SyncClinicaResponseDto)
-def sync_from_clinica_florida_rango(
-    data: SyncRangoFechasDto,
-    db: Session = Depends(get_db)
+@router.post("/clinica-florida/incremental", response_model=SyncClinicaResponseDto)
+def sync_from_clinica_florida_incremental(
+    db: Session = Depends(get_db),
+    external_db_url: str = None
 ):
     """
-    Sincroniza admisiones de un rango de fechas desde bdClinicaFlorida_produccion_informes.
+    Sincroniza las admisiones posteriores a la última marca de agua (fecha, consecutivo).
+    
+    Requiere rol de ADMINISTRADOR.
+    
+    Es la misma sincronización que ejecuta periódicamente el scheduler; sólo lee las
+    admisiones que aún no se han ingerido, por lo que puede ejecutarse con frecuencia.
+    La respuesta incluye la marca de agua resultante. Responde 409 si la sincronización
+    programada (u otra manual) está en curso.
+    """
+    try:
+        result = SyncClinicaService.sync_admisiones_incremental(
+            db_local=db,
+            external_db_url=external_db_url
+        )
+        
+        return SyncClinicaResponseDto(**result)
+        
+    except SyncEnCurso as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Error sincronizando desde Clínica Florida: {str(e)}"
+        )
+
+
+@router.post("/clinica-florida/rango-fechas", response_model=SyncJobDto, status_code=202)
+def sync_from_clinica_florida_rango(data: SyncRangoFechasDto):
+    """
+    Encola la sincronización de admisiones de un rango de fechas desde bdClinicaFlorida_produccion_informes.
     
     Requiere rol de ADMINISTRADOR.
     
-    Proceso:
+    Retorna de inmediato (202) el job creado. El avance se consulta en `GET /sync/jobs/{id}`
+    y se publica por WebSocket (recurso `sync_jobs`, eventos started / progress / completed / partial / failed).
+    Al terminar, `resultado` contiene la respuesta de sincronización habitual. El estado `parcial`
+    indica que se interrumpió después de confirmar lotes: `resultado` trae lo guardado y `error` la causa.
+    
+    Proceso del job:
     1. Conecta a SQL Server: 192.0.0.13\\bdClinicaFlorida_produccion_informes:1433
     2. Obtiene admisiones del rango especificado (tipos empresa 4 y 5)
     3. Crea/actualiza pacientes (evita duplicados por ID)
@@ -67,6 +104,9 @@ def sync_from_clinica_florida_rango(
     - fecha_inicio: Fecha inicial del rango (YYYY-MM-DD)
     - fecha_fin: Fecha final del rango (YYYY-MM-DD)
     - external_db_url: URL de conexión externa (opcional, usa default si no se provee)
+    - particion: 'dia', 'semana' o 'ninguna' (opcional). Rangos con varias particiones
+      se sincronizan en paralelo y el resultado incluye el detalle por partición
+    - max_workers: número máximo de particiones concurrentes (opcional)
     
     Ejemplo:
     ```json
@@ -77,19 +117,40 @@ def sync_from_clinica_florida_rango(
     ```
     """
     try:
-        result = SyncClinicaService.sync_admisiones_rango_fechas(
-            db_local=db,
-            fecha_inicio=data.fecha_inicio,
-            fecha_fin=data.fecha_fin,
-            external_db_url=data.external_db_url
-        )
-        
-        return SyncClinicaResponseDto(**result)
-        
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+        return SyncJobService.enqueue_rango_fechas(data)
     except Exception as e:
         raise HTTPException(
             status_code=500, 
-            detail=f"Error sincronizando desde Clínica Florida: {str(e)}"
+            detail=f"Error encolando sincronización desde Clínica Florida: {str(e)}"
         )
+
+
+@router.get("/jobs", response_model=List[SyncJobDto])
+def list_sync_jobs():
+    """Jobs de sincronización recientes (del más nuevo al más antiguo)."""
+    return SyncJobService.list_jobs()
+
+
+@router.get("/jobs/{job_id}", response_model=SyncJobDto)
+def get_sync_job(job_id: str):
+    """
+    Estado y progreso de un job de sincronización: filas leídas y procesadas,
+    pacientes/atenciones creados u omitidos, throughput y resultado final.
+    """
+    job = SyncJobService.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job de sincronización no encontrado")
+    return job
+
+
+@router.get("/status")
+def get_sync_status():
+    """
+    Estado de las sincronizaciones programadas.
+    
+    Requiere rol de ADMINISTRADOR.
+    
+    Por cada job indica si está corriendo (y hace cuántos segundos), cómo terminó la
+    última ejecución (success / partial / error), su duración y la próxima ejecución.
+    """
+    return SchedulerService.get_jobs_status()
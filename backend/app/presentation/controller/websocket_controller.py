@@ -1,5 +1,8 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect
+from typing import Optional
+from app.configuration.security.security_dependencies import get_current_admin, es_token_admin
 from app.service.implementation.websocket_manager import get_websocket_manager
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,22 +10,70 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/ws", tags=["WebSocket"])
 
 
+@router.get("/metrics", dependencies=[Depends(get_current_admin)])
+def websocket_metrics():
+    """
+    Conexiones activas por canal y latencia de broadcast (p50/p95/máx) por tipo de evento,
+    con el número de clientes desconectados por lentos, caídos o inactivos (heartbeat).
+    """
+    return get_websocket_manager().get_metrics()
+
+
+async def _procesar_mensaje(manager, websocket: WebSocket, data: str):
+    """
+    Mensajes de control de /ws/updates:
+    {"type": "subscribe", "resource": "atenciones", "fecha": "2025-01-31", "id_empresa": 3, "id_estado_atencion": [1, 2]}
+    {"type": "unsubscribe", "resource": "atenciones"}
+    """
+    try:
+        mensaje = json.loads(data)
+    except ValueError:
+        return
+    if not isinstance(mensaje, dict):
+        return
+    tipo = mensaje.pop("type", None)
+    resource = mensaje.pop("resource", None)
+    try:
+        if tipo == "subscribe":
+            filtros = manager.subscribe(websocket, resource, mensaje)
+            respuesta = {"type": "subscribed", "resource": resource, "filters": filtros}
+        elif tipo == "unsubscribe":
+            manager.unsubscribe(websocket, resource)
+            respuesta = {"type": "unsubscribed", "resource": resource}
+        else:
+            return
+    except ValueError as e:
+        respuesta = {"type": "error", "detail": str(e)}
+    await manager.reply(websocket, json.dumps(respuesta))
+
+
 @router.websocket("/updates")
-async def websocket_endpoint(websocket: WebSocket):
+async def websocket_endpoint(
+    websocket: WebSocket,
+    since: Optional[int] = Query(None, description="Último seq recibido, para reenviar sólo lo perdido"),
+    stream: Optional[str] = Query(None, description="Stream del seq (mensaje hello)"),
+    token: Optional[str] = Query(None, description="JWT; con rol ADMINISTRADOR recibe también el progreso de sync_jobs")
+):
     """
     WebSocket endpoint para recibir actualizaciones en tiempo real.
-    Los clientes pueden conectarse sin autenticación para recibir eventos.
+    Los clientes pueden conectarse sin autenticación para recibir eventos; los de sync_jobs
+    sólo llegan a conexiones con un token de administrador.
+    Sin mensajes de suscripción se reciben todos los eventos; con ellos, sólo los de los
+    recursos suscritos que coinciden con sus filtros.
     """
     manager = get_websocket_manager()
-    await manager.connect(websocket, "all")
+    await manager.connect(websocket, "all", since=since, stream=stream, es_admin=es_token_admin(token))
     
     try:
         while True:
             # Mantener conexión abierta y recibir mensajes del cliente si es necesario
             data = await websocket.receive_text()
+            manager.registrar_actividad(websocket)
             # El cliente puede enviar pings para mantener la conexión viva
             if data == "ping":
-                await websocket.send_text("pong")
+                await manager.reply(websocket, "pong")
+            else:
+                await _procesar_mensaje(manager, websocket, data)
     except WebSocketDisconnect:
         manager.disconnect(websocket, "all")
         logger.info("Cliente WebSocket desconectado")
@@ -32,18 +83,23 @@ async def websocket_endpoint(websocket: WebSocket):
 
 
 @router.websocket("/updates/atenciones")
-async def websocket_atenciones(websocket: WebSocket):
+async def websocket_atenciones(
+    websocket: WebSocket,
+    since: Optional[int] = Query(None, description="Último seq recibido, para reenviar sólo lo perdido"),
+    stream: Optional[str] = Query(None, description="Stream del seq (mensaje hello)")
+):
     """
     WebSocket endpoint específico para actualizaciones de atenciones.
     """
     manager = get_websocket_manager()
-    await manager.connect(websocket, "atenciones")
+    await manager.connect(websocket, "atenciones", since=since, stream=stream)
     
     try:
         while True:
             data = await websocket.receive_text()
+            manager.registrar_actividad(websocket)
             if data == "ping":
-                await websocket.send_text("pong")
+                await manager.reply(websocket, "pong")
     except WebSocketDisconnect:
         manager.disconnect(websocket, "atenciones")
     except Exception as e:
@@ -52,20 +108,51 @@ async def websocket_atenciones(websocket: WebSocket):
 
 
 @router.websocket("/updates/pacientes")
-async def websocket_pacientes(websocket: WebSocket):
+async def websocket_pacientes(
+    websocket: WebSocket,
+    since: Optional[int] = Query(None, description="Último seq recibido, para reenviar sólo lo perdido"),
+    stream: Optional[str] = Query(None, description="Stream del seq (mensaje hello)")
+):
     """
     WebSocket endpoint específico para actualizaciones de pacientes.
     """
     manager = get_websocket_manager()
-    await manager.connect(websocket, "pacientes")
+    await manager.connect(websocket, "pacientes", since=since, stream=stream)
     
     try:
         while True:
             data = await websocket.receive_text()
+            manager.registrar_actividad(websocket)
             if data == "ping":
-                await websocket.send_text("pong")
+                await manager.reply(websocket, "pong")
     except WebSocketDisconnect:
         manager.disconnect(websocket, "pacientes")
     except Exception as e:
         logger.error(f"Error en WebSocket pacientes: {e}")
         manager.disconnect(websocket, "pacientes")
+
+
+@router.websocket("/updates/locks")
+async def websocket_locks(
+    websocket: WebSocket,
+    since: Optional[int] = Query(None, description="Último seq recibido, para reenviar sólo lo perdido"),
+    stream: Optional[str] = Query(None, description="Stream del seq (mensaje hello)")
+):
+    """
+    WebSocket endpoint específico para cambios de bloqueos de edición
+    (acquired, released, expired). El estado inicial se obtiene con GET /locks.
+    """
+    manager = get_websocket_manager()
+    await manager.connect(websocket, "locks", since=since, stream=stream)
+    
+    try:
+        while True:
+            data = await websocket.receive_text()
+            manager.registrar_actividad(websocket)
+            if data == "ping":
+                await manager.reply(websocket, "pong")
+    except WebSocketDisconnect:
+        manager.disconnect(websocket, "locks")
+    except Exception as e:
+        logger.error(f"Error en WebSocket locks: {e}")
+        manager.disconnect(websocket, "locks")
@@ -128,6 +128,12 @@ class AtencionListResponseDto(BaseModel):
         from_attributes = True
 
 
+
+class AtencionPaginaResponseDto(BaseModel):
+    """Página de atenciones con cursor opaco para solicitar la siguiente"""
+    items: List[AtencionListResponseDto]
+    next_cursor: Optional[str] = None  # None cuando no hay más páginas
+
 # Mantener compatibilidad con código existente
 class PacienteDto(BaseModel):
     id: str
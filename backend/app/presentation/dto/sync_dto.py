@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Literal
 from datetime import date
 
 
@@ -15,6 +15,9 @@ class SyncRangoFechasDto(BaseModel):
     fecha_inicio: date
     fecha_fin: date
     external_db_url: Optional[str] = None
+    # Backfill paralelo: tamaño de partición y workers (usa la configuración si se omiten)
+    particion: Optional[Literal["dia", "semana", "ninguna"]] = None
+    max_workers: Optional[int] = Field(None, ge=1, le=16)
     
     @field_validator('fecha_fin')
     @classmethod
@@ -35,6 +38,19 @@ class SyncResponseDto(BaseModel):
         from_attributes = True
 
 
+class SyncParticionDto(BaseModel):
+    """DTO con el resultado de una partición de un backfill paralelo"""
+    fecha_inicio: str
+    fecha_fin: str
+    success: bool
+    registros_procesados: int
+    lotes: int
+    duracion_segundos: float
+    pacientes: dict
+    atenciones: dict
+    errores: List[str] = []
+
+
 class SyncClinicaResponseDto(BaseModel):
     """DTO para respuesta de sincronización desde Clínica Florida"""
     success: bool
@@ -45,6 +61,35 @@ class SyncClinicaResponseDto(BaseModel):
     pacientes: dict
     atenciones: dict
     errores: List[str] = []
+    particiones: Optional[List[SyncParticionDto]] = None
+    watermark: Optional[dict] = None
     
     class Config:
         from_attributes = True
+
+
+class SyncJobProgresoDto(BaseModel):
+    """Avance de un job de sincronización en segundo plano"""
+    filas_leidas: int = 0
+    filas_procesadas: int = 0
+    lotes: int = 0
+    pacientes_creados: int = 0
+    pacientes_omitidos: int = 0
+    atenciones_creadas: int = 0
+    atenciones_omitidas: int = 0
+    duracion_segundos: Optional[float] = None
+    filas_por_segundo: Optional[float] = None
+
+
+class SyncJobDto(BaseModel):
+    """DTO de un job de sincronización en segundo plano"""
+    id: str
+    tipo: str
+    estado: Literal["pendiente", "en_progreso", "completado", "parcial", "fallido"]
+    parametros: dict
+    creado_en: str
+    iniciado_en: Optional[str] = None
+    finalizado_en: Optional[str] = None
+    progreso: SyncJobProgresoDto
+    resultado: Optional[SyncClinicaResponseDto] = None
+    error: Optional[str] = None
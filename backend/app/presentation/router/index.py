@@ -12,6 +12,7 @@ from app.presentation.controller.empresa_controller import router as empresa_rou
 from app.presentation.controller.tipo_empresa_controller import router as tipo_empresa_router
 from app.presentation.controller.tipo_documento_controller import router as tipo_documento_router
 from app.presentation.controller.websocket_controller import router as websocket_router
+from app.presentation.controller.lock_controller import router as lock_router
 from app.configuration.app.database import engine
 
 router = APIRouter()
@@ -40,4 +41,5 @@ router.include_router(sync_router, tags=["Sincronizacion"])
 router.include_router(empresa_router, tags=["Empresas"])
 router.include_router(tipo_empresa_router, tags=["TiposEmpresas"])
 router.include_router(tipo_documento_router, tags=["TiposDocumentos"])
-router.include_router(websocket_router, tags=["WebSocket"])
\ No newline at end of file
+router.include_router(websocket_router, tags=["WebSocket"])
+router.include_router(lock_router, tags=["Locks"])
\ No newline at end of file
@@ -2,9 +2,15 @@
 Servicio para gestión de atenciones con toda la información relacionada.
 """
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from sqlalchemy.engine import RowMapping
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import base64
+import csv
+import io
+import json
 
+from app.configuration.app.database import SessionLocal
 from app.persistence.entity.atenciones_entity import Atencion
 from app.persistence.entity.pacientes_entity import Paciente
 from app.persistence.repository import atencion_repository
@@ -13,25 +19,53 @@ from app.presentation.dto.atencion_paciente_dto import (
     AtencionUpdateDto,
     AtencionDetalleResponseDto,
     AtencionListResponseDto,
+    AtencionPaginaResponseDto,
     ServicioAtencionDto,
     AtencionConPacienteCreateDto
 )
-from app.persistence.repository import paciente_repository
+from app.persistence.repository import paciente_repository, busqueda_repository
+from app.service.implementation.catalog_cache import (
+    get_catalog_cache,
+    EMPRESAS,
+    ESTADOS,
+    SEGUIMIENTOS,
+    SERVICIOS
+)
 
 
 class AtencionService:
     """Servicio de negocio para atenciones"""
     
+    # Formatos de exportación soportados y su media type
+    FORMATOS_EXPORTACION = {
+        "ndjson": "application/x-ndjson",
+        "csv": "text/csv; charset=utf-8",
+    }
+    
+    COLUMNAS_CSV = [
+        "id_atencion", "fecha_atencion", "id_paciente", "nombre_paciente",
+        "telefono_uno", "telefono_dos", "email",
+        "id_empresa", "nombre_empresa", "tipo_empresa_nombre",
+        "id_estado_atencion", "nombre_estado_atencion",
+        "id_seguimiento_atencion", "nombre_seguimiento_atencion",
+        "servicios", "observacion", "fecha_modificacion", "nombre_usuario_modificacion",
+    ]
+    
+    @staticmethod
+    def _componer_nombre(primer_nombre, segundo_nombre, primer_apellido, segundo_apellido) -> str:
+        """Une las partes del nombre omitiendo las vacías"""
+        partes = [primer_nombre, segundo_nombre or "", primer_apellido, segundo_apellido or ""]
+        return " ".join(filter(None, partes)).strip()
+    
     @staticmethod
     def _build_nombre_paciente(paciente: Paciente) -> str:
         """Construye el nombre completo del paciente"""
-        partes = [
+        return AtencionService._componer_nombre(
             paciente.primer_nombre,
-            paciente.segundo_nombre or "",
+            paciente.segundo_nombre,
             paciente.primer_apellido,
-            paciente.segundo_apellido or ""
-        ]
-        return " ".join(filter(None, partes)).strip()
+            paciente.segundo_apellido
+        )
     
     @staticmethod
     def _atencion_to_detalle_dto(atencion: Atencion) -> AtencionDetalleResponseDto:
@@ -82,45 +116,50 @@ class AtencionService:
         )
     
     @staticmethod
-    def _atencion_to_list_dto(atencion: Atencion) -> AtencionListResponseDto:
-        """Convierte una entidad Atencion a AtencionListResponseDto"""
-        nombre_paciente = AtencionService._build_nombre_paciente(atencion.paciente)
-        
-        # Construir lista de servicios
-        servicios = [
-            ServicioAtencionDto(
-                id_servicio=as_rel.servicio.id,
-                nombre_servicio=as_rel.servicio.nombre
-            )
-            for as_rel in atencion.servicios_rel
-        ]
-        
-        # Obtener nombre del usuario que modificó (si existe)
-        nombre_usuario_modificacion = None
-        if atencion.usuario:
-            nombre_usuario_modificacion = atencion.usuario.username
+    def _fila_to_list_dto(fila: RowMapping) -> AtencionListResponseDto:
+        """
+        Convierte una fila proyectada por atencion_repository.get_listado_por_ids en
+        AtencionListResponseDto, sin pasar por entidades ORM.
+        """
+        catalogos = get_catalog_cache()
+        empresa = catalogos.get(EMPRESAS, fila["id_empresa"]) or {}
+        ids_servicios = [int(s) for s in fila["servicios"].split(",")] if fila["servicios"] else []
         
         return AtencionListResponseDto(
-            id_atencion=atencion.id,
-            fecha_atencion=atencion.fecha_ingreso,
-            observacion=atencion.observacion,
-            id_paciente=atencion.id_paciente,
-            nombre_paciente=nombre_paciente,
-            telefono_uno=atencion.paciente.telefono_uno,
-            telefono_dos=atencion.paciente.telefono_dos,
-            email=atencion.paciente.email,
-            id_empresa=atencion.empresa.id,
-            nombre_empresa=atencion.empresa.nombre,
-            tipo_empresa_nombre=(atencion.empresa.tipo_empresa.nombre if getattr(atencion.empresa, 'tipo_empresa', None) else getattr(atencion.empresa, 'tipo_empresa_nombre', None)),
-            id_estado_atencion=atencion.estado_atencion.id,
-            nombre_estado_atencion=atencion.estado_atencion.nombre,
-            id_seguimiento_atencion=atencion.seguimiento_atencion.id if atencion.seguimiento_atencion else None,
-            nombre_seguimiento_atencion=atencion.seguimiento_atencion.nombre if atencion.seguimiento_atencion else None,
-            servicios=servicios,
-            fecha_modificacion=atencion.fecha_modificacion,
-            nombre_usuario_modificacion=nombre_usuario_modificacion
+            id_atencion=fila["id"],
+            fecha_atencion=fila["fecha_ingreso"],
+            observacion=fila["observacion"],
+            id_paciente=fila["id_paciente"],
+            nombre_paciente=AtencionService._componer_nombre(
+                fila["primer_nombre"],
+                fila["segundo_nombre"],
+                fila["primer_apellido"],
+                fila["segundo_apellido"]
+            ),
+            telefono_uno=fila["telefono_uno"],
+            telefono_dos=fila["telefono_dos"],
+            email=fila["email"],
+            id_empresa=fila["id_empresa"],
+            nombre_empresa=empresa.get("nombre", ""),
+            tipo_empresa_nombre=empresa.get("tipo_empresa_nombre"),
+            id_estado_atencion=fila["id_estado_atencion"],
+            nombre_estado_atencion=catalogos.nombre(ESTADOS, fila["id_estado_atencion"]) or "",
+            id_seguimiento_atencion=fila["id_seguimiento_atencion"],
+            nombre_seguimiento_atencion=catalogos.nombre(SEGUIMIENTOS, fila["id_seguimiento_atencion"]),
+            servicios=[
+                ServicioAtencionDto(id_servicio=id_servicio, nombre_servicio=catalogos.nombre(SERVICIOS, id_servicio) or "")
+                for id_servicio in ids_servicios
+            ],
+            fecha_modificacion=fila["fecha_modificacion"],
+            nombre_usuario_modificacion=fila["nombre_usuario_modificacion"]
         )
     
+    @staticmethod
+    def _listado_por_ids(db: Session, atencion_ids: List[str]) -> List[AtencionListResponseDto]:
+        """Arma los DTOs de listado de una página ya resuelta usando la proyección de Core"""
+        filas = atencion_repository.get_listado_por_ids(db, atencion_ids)
+        return [AtencionService._fila_to_list_dto(f) for f in filas]
+    
     @staticmethod
     def get_atencion_by_id(db: Session, atencion_id: str) -> Optional[AtencionDetalleResponseDto]:
         """Obtiene una atención por ID con toda su información"""
@@ -139,7 +178,7 @@ class AtencionService:
         fecha_fin: Optional[datetime] = None
     ) -> List[AtencionListResponseDto]:
         """Obtiene todas las atenciones. Si `fecha` se provee, filtra por ese día. Si fecha_inicio y fecha_fin se proveen, filtra por rango."""
-        atenciones = atencion_repository.get_all_atenciones(
+        ids = atencion_repository.get_atencion_ids(
             db, 
             skip=skip, 
             limit=limit, 
@@ -147,7 +186,103 @@ class AtencionService:
             fecha_inicio=fecha_inicio,
             fecha_fin=fecha_fin
         )
-        return [AtencionService._atencion_to_list_dto(a) for a in atenciones]
+        return AtencionService._listado_por_ids(db, ids)
+    
+    @staticmethod
+    def _encode_cursor(fecha_ingreso: datetime, atencion_id: str) -> str:
+        """Codifica la clave (fecha_ingreso, id) de la última fila como un cursor opaco"""
+        clave = {"f": fecha_ingreso.isoformat(), "id": atencion_id}
+        return base64.urlsafe_b64encode(json.dumps(clave).encode()).decode()
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+        """Decodifica un cursor generado por _encode_cursor"""
+        try:
+            clave = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(clave["f"]), str(clave["id"])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError("Cursor de paginación inválido")
+    
+    @staticmethod
+    def get_atenciones_paginadas(
+        db: Session,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        fecha: Optional[datetime] = None,
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None
+    ) -> AtencionPaginaResponseDto:
+        """
+        Obtiene una página de atenciones (más recientes primero) con keyset pagination.
+        `cursor` es el `next_cursor` de la página anterior; se omite para la primera página.
+        """
+        despues_de = AtencionService._decode_cursor(cursor) if cursor else None
+        # Se pide una fila de más para saber si existe una página siguiente
+        claves = atencion_repository.get_atencion_ids_keyset(
+            db,
+            limit=limit + 1,
+            despues_de=despues_de,
+            fecha=fecha,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin
+        )
+        hay_mas = len(claves) > limit
+        claves = claves[:limit]
+        return AtencionPaginaResponseDto(
+            items=AtencionService._listado_por_ids(db, [atencion_id for _, atencion_id in claves]),
+            next_cursor=AtencionService._encode_cursor(*claves[-1]) if hay_mas else None
+        )
+    
+    @staticmethod
+    def _filas_csv(dtos: List[AtencionListResponseDto]) -> str:
+        """Serializa un lote de DTOs como filas CSV (servicios separados por ' | ')"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for dto in dtos:
+            datos = dto.model_dump(mode="json")
+            datos["servicios"] = " | ".join(s["nombre_servicio"] for s in datos["servicios"])
+            writer.writerow([datos.get(columna) for columna in AtencionService.COLUMNAS_CSV])
+        return buffer.getvalue()
+    
+    @staticmethod
+    def exportar_atenciones(
+        formato: str = "ndjson",
+        fecha: Optional[datetime] = None,
+        fecha_inicio: Optional[datetime] = None,
+        fecha_fin: Optional[datetime] = None,
+        empresa_id: Optional[int] = None,
+        estado_id: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Genera la exportación de atenciones por lotes (NDJSON o CSV) leyendo con un cursor del
+        lado del servidor, para usarse con un StreamingResponse.
+        
+        Abre su propia sesión: el generador se consume mientras se envía la respuesta, cuando
+        la sesión de la petición (get_db) ya fue cerrada.
+        """
+        db = SessionLocal()
+        try:
+            if formato == "csv":
+                # BOM para que Excel reconozca UTF-8 (tildes y eñes)
+                buffer = io.StringIO()
+                csv.writer(buffer).writerow(AtencionService.COLUMNAS_CSV)
+                yield "\ufeff" + buffer.getvalue()
+            
+            for lote in atencion_repository.stream_listado(
+                db,
+                fecha=fecha,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin,
+                empresa_id=empresa_id,
+                estado_id=estado_id
+            ):
+                dtos = [AtencionService._fila_to_list_dto(f) for f in lote]
+                if formato == "csv":
+                    yield AtencionService._filas_csv(dtos)
+                else:
+                    yield "".join(dto.model_dump_json() + "\n" for dto in dtos)
+        finally:
+            db.close()
     
     @staticmethod
     def get_atenciones_by_paciente(
@@ -164,8 +299,8 @@ class AtencionService:
         empresa_id: int
     ) -> List[AtencionListResponseDto]:
         """Obtiene todas las atenciones de una empresa"""
-        atenciones = atencion_repository.get_atenciones_by_empresa(db, empresa_id)
-        return [AtencionService._atencion_to_list_dto(a) for a in atenciones]
+        ids = atencion_repository.get_atencion_ids_by_empresa(db, empresa_id)
+        return AtencionService._listado_por_ids(db, ids)
     
     @staticmethod
     def get_atenciones_by_estado(
@@ -173,8 +308,8 @@ class AtencionService:
         estado_id: int
     ) -> List[AtencionListResponseDto]:
         """Obtiene todas las atenciones por estado"""
-        atenciones = atencion_repository.get_atenciones_by_estado(db, estado_id)
-        return [AtencionService._atencion_to_list_dto(a) for a in atenciones]
+        ids = atencion_repository.get_atencion_ids_by_estado(db, estado_id)
+        return AtencionService._listado_por_ids(db, ids)
     
     @staticmethod
     def search_atenciones(
@@ -186,7 +321,7 @@ class AtencionService:
         limit: int = 100
     ) -> List[AtencionListResponseDto]:
         """Busca atenciones con filtros"""
-        atenciones = atencion_repository.search_atenciones(
+        ids = atencion_repository.search_atencion_ids(
             db=db,
             search_term=search_term,
             empresa_id=empresa_id,
@@ -194,7 +329,7 @@ class AtencionService:
             skip=skip,
             limit=limit
         )
-        return [AtencionService._atencion_to_list_dto(a) for a in atenciones]
+        return AtencionService._listado_por_ids(db, ids)
     
     @staticmethod
     def create_atencion_con_paciente(
@@ -297,6 +432,18 @@ class AtencionService:
         # Obtener y retornar la atención completa
         return AtencionService.get_atencion_by_id(db, atencion_id)
     
+    @staticmethod
+    def get_valores_filtro(db: Session, atencion_id: str) -> Optional[Dict[str, Any]]:
+        """Fecha, empresa y estado vigentes de la atención (dimensiones de los filtros WebSocket)"""
+        atencion = atencion_repository.get_atencion_by_id(db, atencion_id)
+        if not atencion:
+            return None
+        return {
+            "fecha_atencion": atencion.fecha_ingreso,
+            "id_empresa": atencion.id_empresa,
+            "id_estado_atencion": atencion.id_estado_atencion,
+        }
+    
     @staticmethod
     def update_atencion(
         db: Session,
@@ -337,6 +484,10 @@ class AtencionService:
                         continue
                     setattr(paciente, key, value)
 
+                # Persistir el cambio (y un posible nuevo ID) antes de regenerar sus tokens de búsqueda
+                db.flush()
+                busqueda_repository.reindexar_paciente(db, paciente)
+
         # Agregar fecha de modificación
         update_data['fecha_modificacion'] = datetime.now()
 
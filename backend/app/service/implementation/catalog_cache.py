@@ -0,0 +1,193 @@
+"""
+Caché en memoria de las tablas de catálogo (empresas, estados, seguimientos, servicios y tipos).
+
+Los catálogos casi nunca cambian, así que se cargan una vez por proceso y se sirven desde
+diccionarios indexados por ID. Los service impls invalidan el catálogo afectado tras cada
+escritura; el TTL cubre los cambios hechos desde otros procesos o directamente en la BD.
+"""
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+import logging
+import threading
+import time
+
+from app.configuration.app.config import settings
+from app.configuration.app.database import SessionLocal
+from app.persistence.entity.tipos_documentos_entity import TipoDocumento
+from app.persistence.repository.empresa_repository import EmpresaRepository
+from app.persistence.repository.estado_atencion_repository import EstadoAtencionRepository
+from app.persistence.repository.seguimiento_atencion_repository import SeguimientoAtencionRepository
+from app.persistence.repository.servicio_repository import ServicioRepository
+from app.persistence.repository.tipo_empresa_repository import TipoEmpresaRepository
+
+logger = logging.getLogger(__name__)
+
+EMPRESAS = "empresas"
+ESTADOS = "estados"
+SEGUIMIENTOS = "seguimientos"
+SERVICIOS = "servicios"
+TIPOS_EMPRESAS = "tipos_empresas"
+TIPOS_DOCUMENTOS = "tipos_documentos"
+
+
+def _cargar_empresas(db: Session) -> List[dict]:
+    return [
+        {
+            "id": e.id,
+            "id_tipo_empresa": e.id_tipo_empresa,
+            "nombre": e.nombre,
+            "tipo_empresa_nombre": e.tipo_empresa.nombre if e.tipo_empresa else None,
+        }
+        for e in EmpresaRepository().get_all(db)
+    ]
+
+
+def _cargar_estados(db: Session) -> List[dict]:
+    return [
+        {"id": e.id, "nombre": e.nombre, "descripcion": e.descripcion}
+        for e in EstadoAtencionRepository().get_all(db)
+    ]
+
+
+def _cargar_seguimientos(db: Session) -> List[dict]:
+    return [
+        {"id": s.id, "nombre": s.nombre, "descripcion": s.descripcion}
+        for s in SeguimientoAtencionRepository().get_all(db)
+    ]
+
+
+def _cargar_servicios(db: Session) -> List[dict]:
+    return [
+        {"id": s.id, "nombre": s.nombre, "descripcion": s.descripcion}
+        for s in ServicioRepository().get_all(db)
+    ]
+
+
+def _cargar_tipos_empresas(db: Session) -> List[dict]:
+    return [{"id": t.id, "nombre": t.nombre} for t in TipoEmpresaRepository().get_all(db)]
+
+
+def _cargar_tipos_documentos(db: Session) -> List[dict]:
+    return [
+        {"id": t.id, "siglas": t.siglas, "descripcion": t.descripcion}
+        for t in db.query(TipoDocumento).all()
+    ]
+
+
+class CatalogCache:
+    """
+    Caché thread-safe de catálogos. Cada catálogo se guarda como {id: fila} en orden de carga.
+
+    Las filas son diccionarios compartidos entre peticiones: los llamadores no deben modificarlos.
+    """
+
+    _CARGADORES: Dict[str, Callable[[Session], List[dict]]] = {
+        EMPRESAS: _cargar_empresas,
+        ESTADOS: _cargar_estados,
+        SEGUIMIENTOS: _cargar_seguimientos,
+        SERVICIOS: _cargar_servicios,
+        TIPOS_EMPRESAS: _cargar_tipos_empresas,
+        TIPOS_DOCUMENTOS: _cargar_tipos_documentos,
+    }
+
+    def __init__(self, ttl_segundos: int, recarga_por_fallo_segundos: float = 5):
+        self._ttl = ttl_segundos
+        # Intervalo mínimo entre recargas provocadas por IDs ausentes, por catálogo
+        self._recarga_por_fallo = recarga_por_fallo_segundos
+        self._recargado_por_fallo_en: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._datos: Dict[str, Dict[int, dict]] = {}
+        self._cargado_en: Dict[str, float] = {}
+        # Se incrementa en cada invalidación; una carga que se cruza con una escritura se descarta
+        self._generacion: Dict[str, int] = {nombre: 0 for nombre in self._CARGADORES}
+
+    def _vigente(self, catalogo: str) -> Optional[Dict[int, dict]]:
+        datos = self._datos.get(catalogo)
+        if datos is None:
+            return None
+        if self._ttl > 0 and time.monotonic() - self._cargado_en[catalogo] > self._ttl:
+            return None
+        return datos
+
+    def _cargar(self, catalogo: str) -> Dict[int, dict]:
+        if catalogo not in self._CARGADORES:
+            raise KeyError(f"Catálogo desconocido: {catalogo}")
+        with self._lock:
+            generacion = self._generacion[catalogo]
+
+        db = SessionLocal()
+        try:
+            filas = self._CARGADORES[catalogo](db)
+        finally:
+            db.close()
+        datos = {fila["id"]: fila for fila in filas}
+
+        with self._lock:
+            if self._generacion[catalogo] == generacion:
+                self._datos[catalogo] = datos
+                self._cargado_en[catalogo] = time.monotonic()
+        logger.debug(f"Catálogo '{catalogo}' cargado en caché ({len(datos)} filas)")
+        return datos
+
+    def _obtener(self, catalogo: str) -> Dict[int, dict]:
+        with self._lock:
+            datos = self._vigente(catalogo)
+        return datos if datos is not None else self._cargar(catalogo)
+
+    def get_all(self, catalogo: str) -> List[dict]:
+        """Todas las filas del catálogo."""
+        return list(self._obtener(catalogo).values())
+
+    def get(self, catalogo: str, item_id: Optional[int]) -> Optional[dict]:
+        """
+        Fila del catálogo por ID en O(1). Un ID ausente puede indicar que la caché está
+        desactualizada (p. ej. un alta hecha desde otro proceso), así que se recarga antes de
+        rendirse, pero como mucho una vez cada CATALOG_CACHE_MISS_RELOAD_SECONDS por catálogo:
+        IDs que no existen (datos huérfanos o entradas inválidas) no recargan la tabla en cada consulta.
+        """
+        if item_id is None:
+            return None
+        fila = self._obtener(catalogo).get(item_id)
+        if fila is None and self._permitir_recarga_por_fallo(catalogo):
+            fila = self._cargar(catalogo).get(item_id)
+        return fila
+
+    def _permitir_recarga_por_fallo(self, catalogo: str) -> bool:
+        """Reserva la recarga por ID ausente si pasó el intervalo mínimo (sólo un hilo la obtiene)."""
+        ahora = time.monotonic()
+        with self._lock:
+            ultima = self._recargado_por_fallo_en.get(catalogo)
+            if ultima is not None and ahora - ultima < self._recarga_por_fallo:
+                return False
+            self._recargado_por_fallo_en[catalogo] = ahora
+            return True
+
+    def nombre(self, catalogo: str, item_id: Optional[int]) -> Optional[str]:
+        fila = self.get(catalogo, item_id)
+        return fila["nombre"] if fila else None
+
+    def invalidate(self, *catalogos: str) -> None:
+        """Descarta los catálogos indicados (todos si no se indica ninguno)."""
+        with self._lock:
+            for catalogo in catalogos or tuple(self._CARGADORES):
+                self._datos.pop(catalogo, None)
+                self._cargado_en.pop(catalogo, None)
+                self._recargado_por_fallo_en.pop(catalogo, None)
+                self._generacion[catalogo] += 1
+
+
+# Instancia global (singleton)
+_catalog_cache: Optional[CatalogCache] = None
+
+
+def get_catalog_cache() -> CatalogCache:
+    """
+    Retorna la instancia singleton del CatalogCache.
+    """
+    global _catalog_cache
+    if _catalog_cache is None:
+        _catalog_cache = CatalogCache(
+            settings.CATALOG_CACHE_TTL_SECONDS,
+            settings.CATALOG_CACHE_MISS_RELOAD_SECONDS
+        )
+    return _catalog_cache
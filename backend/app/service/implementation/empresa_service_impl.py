@@ -1,6 +1,7 @@
 from app.persistence.repository.empresa_repository import EmpresaRepository
 from app.persistence.entity.empresas_entity import Empresa
 from app.configuration.app.database import SessionLocal
+from app.service.implementation.catalog_cache import get_catalog_cache, EMPRESAS
 from app.presentation.dto.empresa_dto import EmpresaCreateDto, EmpresaUpdateDto
 from app.service.interface.empresa_service_interface import EmpresaServiceInterface
 
@@ -29,32 +30,15 @@ class EmpresaServiceImpl(EmpresaServiceInterface):
         except Exception:
             pass
         db.close()
+        get_catalog_cache().invalidate(EMPRESAS)
         return result
 
     def get_all_empresas(self):
-        db = SessionLocal()
-        result = self.repo.get_all(db)
-        # Adjuntar el nombre del tipo de empresa a cada instancia de Empresa para que el DTO pueda exponerlo
-        for empresa in result:
-            try:
-                tipo_nombre = empresa.tipo_empresa.nombre if getattr(empresa, 'tipo_empresa', None) else None
-            except Exception:
-                tipo_nombre = None
-            setattr(empresa, 'tipo_empresa_nombre', tipo_nombre)
-        db.close()
-        return result
+        # Las filas en caché ya incluyen tipo_empresa_nombre para el DTO
+        return get_catalog_cache().get_all(EMPRESAS)
 
     def get_empresa(self, empresa_id: int):
-        db = SessionLocal()
-        empresa = self.repo.get_by_id(db, empresa_id)
-        # attach tipo_empresa_nombre for single fetch
-        if empresa:
-            try:
-                tipo_nombre = empresa.tipo_empresa.nombre if getattr(empresa, 'tipo_empresa', None) else None
-            except Exception:
-                tipo_nombre = None
-            setattr(empresa, 'tipo_empresa_nombre', tipo_nombre)
-        db.close()
+        empresa = get_catalog_cache().get(EMPRESAS, empresa_id)
         if not empresa:
             raise Exception("Empresa no encontrada")
         return empresa
@@ -74,6 +58,7 @@ class EmpresaServiceImpl(EmpresaServiceInterface):
             tipo_nombre = None
         setattr(result, 'tipo_empresa_nombre', tipo_nombre)
         db.close()
+        get_catalog_cache().invalidate(EMPRESAS)
         return result
 
     def delete_empresa(self, empresa_id: int):
@@ -84,3 +69,4 @@ class EmpresaServiceImpl(EmpresaServiceInterface):
             raise Exception("Empresa no encontrada")
         self.repo.delete(db, empresa)
         db.close()
+        get_catalog_cache().invalidate(EMPRESAS)
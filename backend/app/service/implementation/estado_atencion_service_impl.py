@@ -1,6 +1,7 @@
 from app.persistence.repository.estado_atencion_repository import EstadoAtencionRepository
 from app.persistence.entity.estados_atenciones_entity import EstadoAtencion
 from app.configuration.app.database import SessionLocal
+from app.service.implementation.catalog_cache import get_catalog_cache, ESTADOS
 from app.presentation.dto.estado_atencion_dto import EstadoAtencionCreateDto, EstadoAtencionUpdateDto
 from app.service.interface.estado_atencion_service_interface import EstadoAtencionServiceInterface
 
@@ -14,18 +15,14 @@ class EstadoAtencionServiceImpl(EstadoAtencionServiceInterface):
         entidad = EstadoAtencion(nombre=data.nombre, descripcion=data.descripcion)
         result = self.repo.create(db, entidad)
         db.close()
+        get_catalog_cache().invalidate(ESTADOS)
         return result
 
     def get_all_estados(self):
-        db = SessionLocal()
-        result = self.repo.get_all(db)
-        db.close()
-        return result
+        return get_catalog_cache().get_all(ESTADOS)
 
     def get_estado(self, estado_id: int):
-        db = SessionLocal()
-        entidad = self.repo.get_by_id(db, estado_id)
-        db.close()
+        entidad = get_catalog_cache().get(ESTADOS, estado_id)
         if not entidad:
             raise Exception("Estado no encontrado")
         return entidad
@@ -39,6 +36,7 @@ class EstadoAtencionServiceImpl(EstadoAtencionServiceInterface):
         update_data = data.dict(exclude_unset=True)
         result = self.repo.update(db, entidad, update_data)
         db.close()
+        get_catalog_cache().invalidate(ESTADOS)
         return result
 
     def delete_estado(self, estado_id: int):
@@ -49,3 +47,4 @@ class EstadoAtencionServiceImpl(EstadoAtencionServiceInterface):
             raise Exception("Estado no encontrado")
         self.repo.delete(db, entidad)
         db.close()
+        get_catalog_cache().invalidate(ESTADOS)
@@ -0,0 +1,166 @@
+"""
+Implementaciones del bus de eventos WebSocket entre workers (WS_BACKPLANE).
+
+- memory: entrega directa dentro del proceso. Correcto con un solo worker; también sirve de
+  sustituto en pruebas.
+- redis: PUBLISH/SUBSCRIBE sobre un canal de Redis (o compatible, p. ej. Valkey). Requiere el
+  paquete opcional `redis` (>= 4.2, cliente asyncio).
+"""
+from typing import Optional
+import asyncio
+import itertools
+import logging
+import uuid
+
+from app.configuration.app.config import settings
+from app.service.interface.event_backplane_interface import EventBackplaneInterface, ManejadorMensaje
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # dependencia opcional: sólo se necesita con WS_BACKPLANE=redis
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+BACKPLANE_MEMORY = "memory"
+BACKPLANE_REDIS = "redis"
+
+# Espera entre reintentos de suscripción a Redis (segundos, con backoff hasta el máximo)
+_REINTENTO_INICIAL = 1.0
+_REINTENTO_MAXIMO = 30.0
+
+# INCR y PUBLISH en un solo script: Redis ejecuta los scripts de forma atómica, así ningún
+# worker publica N+1 antes de que N esté publicado
+_SCRIPT_PUBLICAR = """
+local seq = redis.call('INCR', KEYS[1])
+redis.call('PUBLISH', ARGV[1], '{"seq":' .. seq .. ',' .. string.sub(ARGV[2], 2))
+return seq
+"""
+
+
+def con_seq(message_json: str, seq: int) -> str:
+    """Inserta 'seq' como primer campo de un objeto JSON ya serializado (igual que el script de Redis)"""
+    return '{"seq":' + str(seq) + ',' + message_json[1:]
+
+
+class InProcessBackplane(EventBackplaneInterface):
+    """Bus local: publicar equivale a entregar a los sockets de este proceso."""
+
+    def __init__(self):
+        self._on_message: Optional[ManejadorMensaje] = None
+        # La numeración vive en el proceso: un reinicio empieza otra secuencia
+        self._stream_id = uuid.uuid4().hex
+        self._contador = itertools.count(1)
+        self._actual = 0
+
+    @property
+    def stream_id(self) -> str:
+        return self._stream_id
+
+    async def current_sequence(self) -> int:
+        return self._actual
+
+    async def start(self, on_message: ManejadorMensaje) -> None:
+        self._on_message = on_message
+
+    async def publish(self, message_json: str) -> int:
+        # Sin awaits entre numerar y entregar: el orden de entrega es el de numeración
+        self._actual = next(self._contador)
+        if self._on_message is not None:
+            await self._on_message(con_seq(message_json, self._actual))
+        return self._actual
+
+    async def stop(self) -> None:
+        self._on_message = None
+
+
+class RedisBackplane(EventBackplaneInterface):
+    """
+    Bus sobre Redis pub/sub. Cada worker publica en `channel` y mantiene una tarea suscrita
+    que entrega cada mensaje recibido; si Redis se cae, la suscripción se reintenta con backoff.
+    Los mensajes publicados mientras un worker está desconectado se pierden para ese worker.
+
+    La numeración de eventos es global (INCR sobre '<channel>:seq', en el mismo script que el
+    PUBLISH); '<channel>:stream' se crea una sola vez y sólo cambia si Redis pierde las claves,
+    lo que obliga a resincronizar.
+    """
+
+    def __init__(self, url: str, channel: str):
+        if redis_asyncio is None:
+            raise RuntimeError("WS_BACKPLANE=redis requiere el paquete 'redis' (pip install redis)")
+        self._url = url
+        self._channel = channel
+        self._clave_seq = f"{channel}:seq"
+        self._clave_stream = f"{channel}:stream"
+        self._stream_id = ""
+        self._client = None
+        self._script_publicar = None
+        self._tarea: Optional[asyncio.Task] = None
+
+    @property
+    def stream_id(self) -> str:
+        return self._stream_id
+
+    async def current_sequence(self) -> int:
+        return int(await self._client.get(self._clave_seq) or 0)
+
+    async def start(self, on_message: ManejadorMensaje) -> None:
+        self._client = redis_asyncio.from_url(self._url, decode_responses=True)
+        self._script_publicar = self._client.register_script(_SCRIPT_PUBLICAR)
+        await self._client.set(self._clave_stream, uuid.uuid4().hex, nx=True)
+        self._stream_id = await self._client.get(self._clave_stream)
+        self._tarea = asyncio.ensure_future(self._suscribir(on_message))
+
+    async def _suscribir(self, on_message: ManejadorMensaje) -> None:
+        espera = _REINTENTO_INICIAL
+        while True:
+            pubsub = self._client.pubsub()
+            try:
+                await pubsub.subscribe(self._channel)
+                logger.info(f"Suscrito al canal Redis '{self._channel}' para eventos WebSocket")
+                espera = _REINTENTO_INICIAL
+                async for mensaje in pubsub.listen():
+                    if mensaje.get("type") != "message":
+                        continue
+                    try:
+                        await on_message(mensaje["data"])
+                    except Exception as e:
+                        logger.error(f"Error entregando evento del backplane: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Suscripción Redis interrumpida ({e}); reintento en {espera:.0f}s")
+                await asyncio.sleep(espera)
+                espera = min(espera * 2, _REINTENTO_MAXIMO)
+            finally:
+                try:
+                    await pubsub.close()
+                except Exception:
+                    pass
+
+    async def publish(self, message_json: str) -> int:
+        if self._client is None:
+            raise RuntimeError("RedisBackplane no iniciado")
+        return int(await self._script_publicar(keys=[self._clave_seq], args=[self._channel, message_json]))
+
+    async def stop(self) -> None:
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._tarea = None
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+def crear_backplane(nombre: Optional[str] = None) -> EventBackplaneInterface:
+    """Crea el backplane configurado en WS_BACKPLANE."""
+    nombre = nombre or settings.WS_BACKPLANE
+    if nombre == BACKPLANE_MEMORY:
+        return InProcessBackplane()
+    if nombre == BACKPLANE_REDIS:
+        return RedisBackplane(settings.WS_REDIS_URL, settings.WS_REDIS_CHANNEL)
+    raise ValueError(f"WS_BACKPLANE desconocido: {nombre} (use '{BACKPLANE_MEMORY}' o '{BACKPLANE_REDIS}')")
@@ -1,58 +1,302 @@
+import heapq
+import logging
 import threading
 import time
-from typing import Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any, List, Tuple
 
-class LockService:
-    def __init__(self, ttl_seconds: int = 300):
+from sqlalchemy.exc import OperationalError
+
+from app.configuration.app.config import settings
+from app.configuration.app.database import SessionLocal
+from app.persistence.repository import edit_lock_repository
+from app.service.implementation.websocket_manager import get_websocket_manager
+from app.service.interface.lock_backend_interface import LockBackendInterface
+
+logger = logging.getLogger(__name__)
+
+BACKEND_MEMORY = "memory"
+BACKEND_MYSQL = "mysql"
+
+# Espacios de nombres de bloqueo: los IDs de distintas entidades no colisionan entre sí
+NS_ATENCIONES = "atenciones"
+NS_PACIENTES = "pacientes"
+NS_USUARIOS = "usuarios"
+NS_ROLES = "roles"
+NS_SERVICIOS = "servicios"
+NAMESPACES = (NS_ATENCIONES, NS_PACIENTES, NS_USUARIOS, NS_ROLES, NS_SERVICIOS)
+
+# Códigos de MySQL reintentables: deadlock y lock wait timeout
+_ERRORES_REINTENTABLES = (1213, 1205)
+_MAX_INTENTOS = 3
+
+
+class InMemoryLockBackend(LockBackendInterface):
+    """
+    Bloqueos en un dict del proceso. Sólo es correcto con un único worker.
+
+    Los vencimientos se guardan además en un min-heap (expires_at, recurso): cada operación
+    revisa sólo el recurso consultado (expiración perezosa: un vencido cuenta como libre) y
+    purge_expired() descarta los vencidos desde la cima del heap, sin recorrer todos los bloqueos.
+    """
+
+    def __init__(self):
         self._locks: Dict[str, Dict[str, Any]] = {}
-        self._ttl = ttl_seconds
+        self._vencimientos: List[Tuple[float, str]] = []
         self._lock = threading.Lock()
 
-    def _cleanup(self):
-        now = time.time()
-        keys = list(self._locks.keys())
-        for k in keys:
-            info = self._locks.get(k)
-            if not info:
-                continue
-            if info.get('expires_at', 0) <= now:
-                del self._locks[k]
+    def _vigente(self, resource_id: str) -> Optional[Dict[str, Any]]:
+        # Los vencidos se dejan en el dict para que purge_expired() los reporte como expirados
+        info = self._locks.get(resource_id)
+        if info and info['expires_at'] <= time.monotonic():
+            return None
+        return info
 
-    def acquire(self, resource_id: str, locker: Dict[str, Any]) -> Dict[str, Any]:
+    def _programar(self, resource_id: str, ttl_seconds: int) -> float:
+        expires_at = time.monotonic() + ttl_seconds
+        heapq.heappush(self._vencimientos, (expires_at, resource_id))
+        return expires_at
+
+    def acquire(self, resource_id: str, locker: Dict[str, Any], ttl_seconds: int) -> Dict[str, Any]:
         with self._lock:
-            self._cleanup()
-            info = self._locks.get(resource_id)
-            now = time.time()
-            if info and info.get('expires_at', 0) > now:
+            info = self._vigente(resource_id)
+            if info:
                 # ya está bloqueado
                 return {'ok': False, 'lockedBy': info.get('lockedBy')}
-            expires_at = now + self._ttl
             self._locks[resource_id] = {
                 'lockedBy': locker,
-                'locked_at': now,
-                'expires_at': expires_at
+                'locked_at': time.time(),
+                'expires_at': self._programar(resource_id, ttl_seconds)
             }
             return {'ok': True, 'lockedBy': locker}
 
-    def release(self, resource_id: str, locker_id: Optional[Any] = None) -> bool:
+    def refresh(self, resource_id: str, locker_id: Any, ttl_seconds: int) -> bool:
         with self._lock:
-            info = self._locks.get(resource_id)
+            info = self._vigente(resource_id)
+            if not info or str(info.get('lockedBy', {}).get('id')) != str(locker_id):
+                return False
+            # La entrada anterior del heap queda obsoleta y se descarta al llegar a la cima
+            info['expires_at'] = self._programar(resource_id, ttl_seconds)
+            return True
+
+    def release(self, resource_id: str, locker_id: Optional[Any] = None) -> Dict[str, bool]:
+        with self._lock:
+            info = self._vigente(resource_id)
             if not info:
-                return True
+                return {'ok': True, 'released': False}
             # Si se proporciona locker_id, asegúrese de que solo el casillero pueda liberarse.
             if locker_id is not None and str(info.get('lockedBy', {}).get('id')) != str(locker_id):
-                return False
+                return {'ok': False, 'released': False}
             del self._locks[resource_id]
-            return True
+            return {'ok': True, 'released': True}
 
     def status(self, resource_id: str) -> Dict[str, Any]:
         with self._lock:
-            self._cleanup()
-            info = self._locks.get(resource_id)
+            info = self._vigente(resource_id)
             if not info:
                 return {'locked': False}
             return {'locked': True, 'lockedBy': info.get('lockedBy'), 'lockedAt': info.get('locked_at')}
 
+    def list_locks(self, prefix: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            ahora = time.monotonic()
+            return [
+                {'resource_id': rid, 'lockedBy': info.get('lockedBy'), 'lockedAt': info.get('locked_at')}
+                for rid, info in self._locks.items()
+                if rid.startswith(prefix) and info['expires_at'] > ahora
+            ]
+
+    def purge_expired(self) -> List[str]:
+        eliminados = []
+        with self._lock:
+            ahora = time.monotonic()
+            while self._vencimientos and self._vencimientos[0][0] <= ahora:
+                expires_at, resource_id = heapq.heappop(self._vencimientos)
+                info = self._locks.get(resource_id)
+                # Sólo si la entrada corresponde al vencimiento vigente (no renovado ni readquirido)
+                if info and info['expires_at'] == expires_at:
+                    del self._locks[resource_id]
+                    eliminados.append(resource_id)
+            # Las renovaciones dejan entradas obsoletas: reconstruir si el heap creció de más
+            if len(self._vencimientos) > 2 * len(self._locks) + 64:
+                self._vencimientos = [(info['expires_at'], rid) for rid, info in self._locks.items()]
+                heapq.heapify(self._vencimientos)
+        return eliminados
+
+
+class MySqlLockBackend(LockBackendInterface):
+    """
+    Bloqueos en la tabla edit_locks, compartidos por todos los workers y réplicas.
+    Cada operación usa su propia sesión corta y confirma de inmediato.
+    """
+
+    def _ejecutar(self, operacion):
+        for intento in range(1, _MAX_INTENTOS + 1):
+            db = SessionLocal()
+            try:
+                resultado = operacion(db)
+                db.commit()
+                return resultado
+            except OperationalError as e:
+                db.rollback()
+                codigo = e.orig.args[0] if e.orig is not None and e.orig.args else None
+                if codigo not in _ERRORES_REINTENTABLES or intento == _MAX_INTENTOS:
+                    raise
+                logger.warning(f"Reintentando operación de bloqueo ({intento}/{_MAX_INTENTOS}): {e.orig}")
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+
+    def acquire(self, resource_id: str, locker: Dict[str, Any], ttl_seconds: int) -> Dict[str, Any]:
+        adquirido, fila = self._ejecutar(lambda db: edit_lock_repository.try_acquire(
+            db, resource_id, str(locker.get('id')), locker, ttl_seconds
+        ))
+        return {'ok': adquirido, 'lockedBy': fila["owner"] if fila else None}
+
+    def refresh(self, resource_id: str, locker_id: Any, ttl_seconds: int) -> bool:
+        return self._ejecutar(
+            lambda db: edit_lock_repository.refresh(db, resource_id, str(locker_id), ttl_seconds)
+        )
+
+    def release(self, resource_id: str, locker_id: Optional[Any] = None) -> Dict[str, bool]:
+        def _release(db):
+            owner_id = str(locker_id) if locker_id is not None else None
+            if edit_lock_repository.delete_lock(db, resource_id, owner_id):
+                return {'ok': True, 'released': True}
+            # No se eliminó nada: o no había bloqueo, o pertenece a otro usuario
+            return {'ok': edit_lock_repository.get_vigente(db, resource_id) is None, 'released': False}
+        return self._ejecutar(_release)
+
+    def status(self, resource_id: str) -> Dict[str, Any]:
+        fila = self._ejecutar(lambda db: edit_lock_repository.get_vigente(db, resource_id))
+        if not fila:
+            return {'locked': False}
+        return {'locked': True, 'lockedBy': fila["owner"], 'lockedAt': float(fila["locked_at"])}
+
+    def list_locks(self, prefix: str) -> List[Dict[str, Any]]:
+        filas = self._ejecutar(lambda db: edit_lock_repository.get_vigentes_por_prefijo(db, prefix))
+        return [
+            {'resource_id': f["recurso"], 'lockedBy': f["owner"], 'lockedAt': float(f["locked_at"])}
+            for f in filas
+        ]
+
+    def purge_expired(self) -> List[str]:
+        return self._ejecutar(edit_lock_repository.delete_vencidos)
+
+
+class LockNamespace:
+    """Vista de LockService restringida a un espacio de nombres (claves '<namespace>:<id>')."""
+
+    def __init__(self, service: "LockService", namespace: str):
+        self._service = service
+        self.namespace = namespace
+
+    def _clave(self, resource_id: str) -> str:
+        return f"{self.namespace}:{resource_id}"
+
+    @property
+    def ttl_seconds(self) -> int:
+        return self._service.ttl_seconds
+
+    def acquire(self, resource_id: str, locker: Dict[str, Any]) -> Dict[str, Any]:
+        return self._service.acquire(self._clave(resource_id), locker)
+
+    def refresh(self, resource_id: str, locker_id: Any) -> bool:
+        return self._service.refresh(self._clave(resource_id), locker_id)
+
+    def release(self, resource_id: str, locker_id: Optional[Any] = None) -> bool:
+        return self._service.release(self._clave(resource_id), locker_id)
+
+    def status(self, resource_id: str) -> Dict[str, Any]:
+        return self._service.status(self._clave(resource_id))
+
+    def list_locks(self) -> List[Dict[str, Any]]:
+        return self._service.list_locks(self.namespace)
+
+
+class LockService:
+    """
+    Bloqueos de edición con TTL usados por los endpoints /lock de atenciones, pacientes,
+    usuarios, roles y servicios. Delega el almacenamiento en un LockBackendInterface.
+    Los controllers usan namespace() para no compartir claves entre entidades.
+
+    Cada cambio de estado (acquired, released, expired) se publica en el canal WebSocket
+    'locks' con {namespace, id, lockedBy}, para que los clientes no consulten el estado por fila.
+    """
+
+    RESOURCE = "locks"
+
+    def __init__(
+        self,
+        backend: LockBackendInterface,
+        ttl_seconds: int = 300,
+        publicar: Optional[Callable[[str, str, dict], None]] = None
+    ):
+        self._backend = backend
+        self._ttl = ttl_seconds
+        self._publicar_evento = publicar
+
+    @property
+    def ttl_seconds(self) -> int:
+        return self._ttl
+
+    def _publicar(self, event_type: str, clave: str, locked_by: Optional[Dict[str, Any]] = None):
+        if self._publicar_evento is None:
+            return
+        namespace, _, resource_id = clave.partition(":")
+        data = {"namespace": namespace, "id": resource_id, "lockedBy": locked_by}
+        try:
+            self._publicar_evento(event_type, self.RESOURCE, data)
+        except Exception as e:
+            # Un fallo al notificar no debe afectar la operación de bloqueo
+            logger.warning(f"No se pudo publicar el evento de bloqueo {event_type} ({clave}): {e}")
+
+    def acquire(self, resource_id: str, locker: Dict[str, Any]) -> Dict[str, Any]:
+        res = self._backend.acquire(resource_id, locker, self._ttl)
+        if res.get('ok'):
+            self._publicar("acquired", resource_id, locker)
+        return res
+
+    def refresh(self, resource_id: str, locker_id: Any) -> bool:
+        return self._backend.refresh(resource_id, locker_id, self._ttl)
+
+    def release(self, resource_id: str, locker_id: Optional[Any] = None) -> bool:
+        """False sólo si el bloqueo vigente pertenece a otro usuario."""
+        res = self._backend.release(resource_id, locker_id)
+        # Sólo se notifica si realmente se eliminó un bloqueo (no si no existía o era ajeno)
+        if res['released']:
+            self._publicar("released", resource_id)
+        return res['ok']
+
+    def status(self, resource_id: str) -> Dict[str, Any]:
+        return self._backend.status(resource_id)
+
+    def list_locks(self, namespace: str) -> List[Dict[str, Any]]:
+        """Bloqueos vigentes de un espacio de nombres: [{'id', 'lockedBy', 'lockedAt'}]."""
+        prefijo = f"{namespace}:"
+        return [
+            {'id': lock['resource_id'][len(prefijo):], 'lockedBy': lock['lockedBy'], 'lockedAt': lock['lockedAt']}
+            for lock in self._backend.list_locks(prefijo)
+        ]
+
+    def purge_expired(self) -> int:
+        vencidos = self._backend.purge_expired()
+        for clave in vencidos:
+            self._publicar("expired", clave)
+        return len(vencidos)
+
+    def namespace(self, nombre: str) -> LockNamespace:
+        return LockNamespace(self, nombre)
+
+
+def _crear_backend(nombre: str) -> LockBackendInterface:
+    if nombre == BACKEND_MEMORY:
+        return InMemoryLockBackend()
+    if nombre == BACKEND_MYSQL:
+        return MySqlLockBackend()
+    raise ValueError(f"LOCK_BACKEND desconocido: {nombre} (use '{BACKEND_MEMORY}' o '{BACKEND_MYSQL}')")
+
 
 # singleton
 _instance: Optional[LockService] = None
@@ -60,5 +304,10 @@ _instance: Optional[LockService] = None
 def get_lock_service() -> LockService:
     global _instance
     if _instance is None:
-        _instance = LockService()
+        _instance = LockService(
+            _crear_backend(settings.LOCK_BACKEND),
+            settings.LOCK_TTL_SECONDS,
+            publicar=get_websocket_manager().send_event_threadsafe
+        )
+        logger.info(f"LockService iniciado con backend '{settings.LOCK_BACKEND}' (TTL {settings.LOCK_TTL_SECONDS}s)")
     return _instance
@@ -1,10 +1,17 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
+from apscheduler.executors.asyncio import AsyncIOExecutor
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED
+from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
+import asyncio
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Optional, Dict, Any
 
-from app.service.implementation.sync_clinica_service import SyncClinicaService
+from app.service.implementation.lock_service import get_lock_service
+from app.service.implementation.sync_clinica_service import SyncClinicaService, SyncEnCurso
 from app.configuration.app.database import SessionLocal
 from app.configuration.app.config import settings
 
@@ -14,13 +21,33 @@ logger = logging.getLogger(__name__)
 class SchedulerService:
     """Servicio para gestionar tareas programadas."""
     
+    # Executor dedicado para trabajos con I/O bloqueante (fuera del event loop de uvicorn)
+    SYNC_EXECUTOR = 'sync'
+
     _scheduler: Optional[AsyncIOScheduler] = None
+    _sync_executor: Optional[ThreadPoolExecutor] = None
+
+    # Registro de estado por job: {job_id: {running, started_at, last_status, ...}}
+    _status: Dict[str, Dict[str, Any]] = {}
+    _status_lock = threading.Lock()
     
     @classmethod
     def get_scheduler(cls) -> AsyncIOScheduler:
         """Obtiene o crea la instancia del scheduler."""
         if cls._scheduler is None:
-            cls._scheduler = AsyncIOScheduler()
+            cls._sync_executor = ThreadPoolExecutor(max_workers=settings.SCHEDULER_SYNC_MAX_WORKERS)
+            cls._scheduler = AsyncIOScheduler(
+                executors={
+                    'default': AsyncIOExecutor(),
+                    cls.SYNC_EXECUTOR: cls._sync_executor,
+                },
+                job_defaults={
+                    'coalesce': True,   # varias ejecuciones atrasadas se reducen a una
+                    'max_instances': 1,  # nunca dos ejecuciones simultáneas del mismo job
+                    'misfire_grace_time': 60,
+                }
+            )
+            cls._scheduler.add_listener(cls._on_job_skipped, EVENT_JOB_MAX_INSTANCES | EVENT_JOB_MISSED)
         return cls._scheduler
     
     @classmethod
@@ -29,30 +56,100 @@ class SchedulerService:
         print("[SCHEDULER] Iniciando scheduler...")
         scheduler = cls.get_scheduler()
         
-        # Registrar tarea de sincronización diaria a las 6:00 AM (hora del servidor)
+        # Registrar sincronización incremental periódica (continúa desde la marca de agua)
         scheduler.add_job(
             func=cls.sync_clinica_florida_job,
-            trigger=CronTrigger(hour=11, minute=00),
+            trigger=IntervalTrigger(minutes=settings.SYNC_INTERVAL_MINUTES),
             id='sync_clinica_florida',
             name='Sincronización Clínica Florida',
+            executor=cls.SYNC_EXECUTOR,
+            max_instances=1,
+            replace_existing=True
+        )
+        
+        # Purga periódica de bloqueos de edición vencidos (la consulta ya los ignora al vencer)
+        scheduler.add_job(
+            func=cls.purge_expired_locks_job,
+            trigger=IntervalTrigger(seconds=settings.LOCK_REAPER_INTERVAL_SECONDS),
+            id='purge_expired_locks',
+            name='Purga de bloqueos de edición vencidos',
+            executor=cls.SYNC_EXECUTOR,
+            max_instances=1,
             replace_existing=True
         )
         
         scheduler.start()
-        logger.info("Scheduler iniciado - Sincronización diaria a las 6:00 AM")
+        logger.info(f"Scheduler iniciado - Sincronización incremental cada {settings.SYNC_INTERVAL_MINUTES} minutos")
     
     @classmethod
-    def shutdown(cls):
-        """Detiene el scheduler de forma ordenada."""
+    async def shutdown(cls):
+        """
+        Detiene el scheduler de forma ordenada sin bloquear el event loop: deja de programar
+        jobs y espera en otro hilo a que terminen los que están en curso.
+        """
         if cls._scheduler is not None:
-            cls._scheduler.shutdown(wait=True)
+            # AsyncIOScheduler ejecuta shutdown() dentro del event loop; con wait=True la espera
+            # a los jobs bloqueantes congelaría el loop (y los eventos que esos jobs publican)
+            cls._scheduler.shutdown(wait=False)
+            await asyncio.to_thread(cls._sync_executor.shutdown, True)
             logger.info("Scheduler detenido")
     
-    @staticmethod
-    def sync_clinica_florida_job():
+    @classmethod
+    def _on_job_skipped(cls, event):
+        """Registra las ejecuciones omitidas porque la anterior sigue en curso o se perdieron."""
+        motivo = "ejecución anterior aún en curso" if event.code == EVENT_JOB_MAX_INSTANCES else "ejecución perdida"
+        logger.warning(f"Job {event.job_id} omitido: {motivo}")
+        with cls._status_lock:
+            estado = cls._status.setdefault(event.job_id, {"running": False})
+            estado["skipped_count"] = estado.get("skipped_count", 0) + 1
+            estado["last_skipped_at"] = datetime.now().isoformat()
+
+    @classmethod
+    def _marcar_inicio(cls, job_id: str):
+        with cls._status_lock:
+            estado = cls._status.setdefault(job_id, {})
+            estado["running"] = True
+            estado["started_at"] = datetime.now().isoformat()
+            estado["_started_monotonic"] = time.monotonic()
+
+    @classmethod
+    def _marcar_fin(cls, job_id: str, status: str, resumen: Optional[dict] = None, error: Optional[str] = None):
+        with cls._status_lock:
+            estado = cls._status.setdefault(job_id, {})
+            inicio = estado.pop("_started_monotonic", None)
+            estado["running"] = False
+            estado["last_started_at"] = estado.pop("started_at", None)
+            estado["last_finished_at"] = datetime.now().isoformat()
+            estado["last_duration_seconds"] = round(time.monotonic() - inicio, 3) if inicio else None
+            estado["last_status"] = status
+            estado["last_result"] = resumen
+            estado["last_error"] = error
+
+    @classmethod
+    def get_jobs_status(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Estado de los jobs programados: si están corriendo y desde hace cuánto,
+        cómo terminó la última ejecución y cuándo es la próxima.
+        """
+        with cls._status_lock:
+            snapshot = {job_id: dict(estado) for job_id, estado in cls._status.items()}
+
+        jobs = cls._scheduler.get_jobs() if cls._scheduler is not None else []
+        for job in jobs:
+            snapshot.setdefault(job.id, {"running": False})
+            snapshot[job.id]["name"] = job.name
+            snapshot[job.id]["next_run_time"] = job.next_run_time.isoformat() if job.next_run_time else None
+
+        for estado in snapshot.values():
+            inicio = estado.pop("_started_monotonic", None)
+            estado["elapsed_seconds"] = round(time.monotonic() - inicio, 3) if estado.get("running") and inicio else None
+        return snapshot
+
+    @classmethod
+    def sync_clinica_florida_job(cls):
         """
-        Tarea programada: Sincronización de admisiones desde Clínica Florida.
-        Se ejecuta todos los días a las 6:00 AM.
+        Tarea programada: Sincronización incremental de admisiones desde Clínica Florida.
+        Se ejecuta cada SYNC_INTERVAL_MINUTES minutos y sólo trae lo posterior a la marca de agua.
         """
         print("="*60)
         print(f"[SYNC JOB] Iniciando sincronización automática - {datetime.now()}")
@@ -61,6 +158,8 @@ class SchedulerService:
         logger.info(f"Iniciando sincronización automática - {datetime.now()}")
         logger.info("="*60)
         
+        job_id = 'sync_clinica_florida'
+        cls._marcar_inicio(job_id)
         db = SessionLocal()
         try:
             # Obtener URL de la base de datos externa
@@ -68,10 +167,11 @@ class SchedulerService:
             
             if not external_db_url:
                 logger.error("No se ha configurado la conexión a la BD externa")
+                cls._marcar_fin(job_id, "error", error="No se ha configurado la conexión a la BD externa")
                 return
             
             # Ejecutar sincronización
-            result = SyncClinicaService.sync_admisiones_dia_anterior(
+            result = SyncClinicaService.sync_admisiones_incremental(
                 db_local=db,
                 external_db_url=external_db_url
             )
@@ -94,9 +194,25 @@ class SchedulerService:
                 if result['errores']:
                     for error in result['errores'][:10]:
                         logger.error(f"   {error}")
+
+            cls._marcar_fin(
+                job_id,
+                "success" if result['success'] else "partial",
+                resumen={
+                    "registros_procesados": result['registros_procesados'],
+                    "pacientes": result['pacientes'],
+                    "atenciones": result['atenciones'],
+                    "errores": len(result['errores']),
+                }
+            )
+        
+        except SyncEnCurso as e:
+            logger.warning(f"Sincronización programada omitida: {e}")
+            cls._marcar_fin(job_id, "skipped", error=str(e))
         
         except Exception as e:
             logger.error(f"Error crítico en tarea de sincronización: {e}", exc_info=True)
+            cls._marcar_fin(job_id, "error", error=str(e))
         
         finally:
             db.close()
@@ -106,3 +222,13 @@ class SchedulerService:
             logger.info("="*60)
             logger.info("Sincronización automática finalizada")
             logger.info("="*60)
+
+    @classmethod
+    def purge_expired_locks_job(cls):
+        """Tarea programada: elimina los bloqueos de edición vencidos del backend configurado."""
+        try:
+            eliminados = get_lock_service().purge_expired()
+            if eliminados:
+                logger.debug(f"Bloqueos de edición vencidos eliminados: {eliminados}")
+        except Exception as e:
+            logger.warning(f"No se pudieron purgar los bloqueos vencidos: {e}")
@@ -1,6 +1,7 @@
 from app.persistence.repository.seguimiento_atencion_repository import SeguimientoAtencionRepository
 from app.persistence.entity.seguimientos_atenciones_entity import SeguimientoAtencion
 from app.configuration.app.database import SessionLocal
+from app.service.implementation.catalog_cache import get_catalog_cache, SEGUIMIENTOS
 from app.presentation.dto.seguimiento_atencion_dto import (
     SeguimientoAtencionCreateDto,
     SeguimientoAtencionUpdateDto,
@@ -17,18 +18,14 @@ class SeguimientoAtencionServiceImpl(SeguimientoAtencionServiceInterface):
         entidad = SeguimientoAtencion(nombre=data.nombre, descripcion=data.descripcion)
         result = self.repo.create(db, entidad)
         db.close()
+        get_catalog_cache().invalidate(SEGUIMIENTOS)
         return result
 
     def get_all_seguimientos(self):
-        db = SessionLocal()
-        result = self.repo.get_all(db)
-        db.close()
-        return result
+        return get_catalog_cache().get_all(SEGUIMIENTOS)
 
     def get_seguimiento(self, seguimiento_id: int):
-        db = SessionLocal()
-        entidad = self.repo.get_by_id(db, seguimiento_id)
-        db.close()
+        entidad = get_catalog_cache().get(SEGUIMIENTOS, seguimiento_id)
         if not entidad:
             raise Exception("Seguimiento no encontrado")
         return entidad
@@ -42,6 +39,7 @@ class SeguimientoAtencionServiceImpl(SeguimientoAtencionServiceInterface):
         update_data = data.dict(exclude_unset=True)
         result = self.repo.update(db, entidad, update_data)
         db.close()
+        get_catalog_cache().invalidate(SEGUIMIENTOS)
         return result
 
     def delete_seguimiento(self, seguimiento_id: int):
@@ -52,3 +50,4 @@ class SeguimientoAtencionServiceImpl(SeguimientoAtencionServiceInterface):
             raise Exception("Seguimiento no encontrado")
         self.repo.delete(db, entidad)
         db.close()
+        get_catalog_cache().invalidate(SEGUIMIENTOS)
@@ -1,6 +1,7 @@
 from app.persistence.repository.servicio_repository import ServicioRepository
 from app.persistence.entity.servicios_entity import Servicio
 from app.configuration.app.database import SessionLocal
+from app.service.implementation.catalog_cache import get_catalog_cache, SERVICIOS
 from app.presentation.dto.servicio_dto import ServicioCreateDto, ServicioUpdateDto
 from app.service.interface.servicio_service_interface import ServicioServiceInterface
 
@@ -14,18 +15,14 @@ class ServicioServiceImpl(ServicioServiceInterface):
         servicio = Servicio(nombre=data.nombre, descripcion=getattr(data, 'descripcion', None))
         result = self.repo.create(db, servicio)
         db.close()
+        get_catalog_cache().invalidate(SERVICIOS)
         return result
 
     def get_all_servicios(self):
-        db = SessionLocal()
-        result = self.repo.get_all(db)
-        db.close()
-        return result
+        return get_catalog_cache().get_all(SERVICIOS)
 
     def get_servicio(self, servicio_id: int):
-        db = SessionLocal()
-        servicio = self.repo.get_by_id(db, servicio_id)
-        db.close()
+        servicio = get_catalog_cache().get(SERVICIOS, servicio_id)
         if not servicio:
             raise Exception("Servicio no encontrado")
         return servicio
@@ -40,6 +37,7 @@ class ServicioServiceImpl(ServicioServiceInterface):
         # allow updating descripcion as well
         result = self.repo.update(db, servicio, update_data)
         db.close()
+        get_catalog_cache().invalidate(SERVICIOS)
         return result
 
     def delete_servicio(self, servicio_id: int):
@@ -50,3 +48,4 @@ class ServicioServiceImpl(ServicioServiceInterface):
             raise Exception("Servicio no encontrado")
         self.repo.delete(db, servicio)
         db.close()
+        get_catalog_cache().invalidate(SERVICIOS)
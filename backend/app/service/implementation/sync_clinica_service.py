@@ -1,27 +1,112 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DataError, IntegrityError, OperationalError
 from sqlalchemy.orm import Session
-from typing import Dict, Any
-from datetime import datetime, date
-from app.persistence.entity.pacientes_entity import Paciente
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterable, List, Optional
+from datetime import datetime, date, timedelta
+import threading
+import time
 from app.persistence.entity.atenciones_entity import Atencion
-from app.persistence.entity.empresas_entity import Empresa
-from app.persistence.repository.paciente_repository import get_paciente_by_id
-from app.persistence.repository.atencion_repository import get_atencion_by_id
+from app.persistence.entity.pacientes_entity import Paciente
+from app.persistence.repository import atencion_repository, paciente_repository, sync_watermark_repository
+from app.persistence.repository.empresa_repository import EmpresaRepository
 from app.configuration.app.config import settings
+from app.configuration.app.database import SessionLocal, engine
+from app.configuration.app.external_database import open_external_engine, get_external_pool_capacity
+from app.service.implementation.catalog_cache import get_catalog_cache, EMPRESAS, TIPOS_DOCUMENTOS, TIPOS_EMPRESAS
+from app.service.implementation.websocket_manager import get_websocket_manager
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class MonitorSync:
+    """
+    Receptor del avance de una sincronización. La implementación base no hace nada;
+    los jobs en segundo plano la extienden para reportar progreso. Con particiones en
+    paralelo se invoca desde varios hilos a la vez.
+    """
+
+    def filas_leidas(self, cantidad: int) -> None:
+        """Se leyó un lote de `cantidad` filas desde la BD externa."""
+
+    def lote_confirmado(self, cantidad: int, estadisticas: dict) -> None:
+        """Se confirmó en la BD local un lote de `cantidad` filas."""
+
+
+def _longitud(columna) -> int:
+    return columna.type.length
+
+
+# Longitudes máximas de las columnas locales que se llenan con datos externos
+_MAX_ID_PACIENTE = _longitud(Paciente.id)
+_MAX_ID_ATENCION = _longitud(Atencion.id)
+_CAMPOS_PACIENTE = {
+    # campo externo: (columna local, obligatorio)
+    "primer_nombre": (Paciente.primer_nombre, True),
+    "segundo_nombre": (Paciente.segundo_nombre, False),
+    "primer_apellido": (Paciente.primer_apellido, True),
+    "segundo_apellido": (Paciente.segundo_apellido, False),
+    "telefono": (Paciente.telefono_uno, False),
+    "email": (Paciente.email, False),
+}
+
+
+class PacientesCreados:
+    """
+    IDs de pacientes ya contados como creados en una sincronización con particiones concurrentes.
+
+    Dos particiones pueden insertar el mismo paciente (el INSERT ... ON DUPLICATE KEY evita el
+    duplicado); sólo el primer lote confirmado que lo reclama lo cuenta y lo notifica.
+    """
+
+    def __init__(self):
+        self._ids = set()
+        self._lock = threading.Lock()
+
+    def reclamar(self, ids: List[str]) -> List[str]:
+        """Los `ids` que ninguna otra partición había reclamado (quedan reclamados)."""
+        with self._lock:
+            nuevos = [paciente_id for paciente_id in ids if paciente_id not in self._ids]
+            self._ids.update(nuevos)
+            return nuevos
+
+
+class SyncEnCurso(RuntimeError):
+    """Ya hay una sincronización incremental en ejecución (en este u otro proceso)."""
+
+
 class SyncClinicaService:
     """
     Servicio especializado para sincronizar datos desde bdClinicaFlorida_produccion_informes.
     """
+
+    # Estados por defecto de las atenciones sincronizadas
+    ID_ESTADO_INGRESADO = 1
+    ID_SEGUIMIENTO_DEFECTO = 8
+
+    # Códigos MySQL de deadlock / lock wait timeout: el lote se reintenta
+    ERRORES_REINTENTABLES = (1205, 1213)
+    MAX_REINTENTOS_LOTE = 3
+
+    # Tamaño de cada partición para backfills paralelos
+    PARTICIONES = {"dia": 1, "semana": 7}
+
+    _empresa_repo = EmpresaRepository()
     
-    # Query SQL proporcionado para obtener admisiones del día anterior
-    QUERY_ADMISIONES = """
+    # Fuente usada para la marca de agua de la sincronización incremental
+    FUENTE_WATERMARK = "clinica_florida_admisiones"
+    # Bloqueo con nombre de MySQL que serializa las incrementales entre workers
+    BLOQUEO_INCREMENTAL = "postcare:sync_incremental"
+
+    # SELECT y filtros comunes a todas las consultas de admisiones. Los filtros de fecha
+    # se agregan sobre la columna sin transformar (sargables) para permitir index seeks.
+    _SELECT_ADMISIONES = """
     SELECT 
         consecutivo         = 'ADM' + CAST(adm.cnsctvo_admsns AS VARCHAR(20)), 
+        cnsctvo_admsns      = adm.cnsctvo_admsns,
         fecha_atencion      = adm.fcha_admsn, 
         tipo_doc_codigo     = td.cdgo,
         id_tipo_doc         = td.unco,
@@ -45,10 +130,23 @@ class SyncClinicaService:
     WHERE 
         emp.unco_tpo_emprsa IN (4, 5)
         AND ae.unco_emprsa <> 89
-        AND CAST(adm.fcha_admsn AS DATE) = CAST(DATEADD(day, -1, GETDATE()) AS DATE)
         AND adm.cnsctvo_admsns IS NOT NULL
     """
 
+    # Admisiones del día anterior
+    QUERY_ADMISIONES = _SELECT_ADMISIONES + """
+        AND adm.fcha_admsn >= CAST(DATEADD(day, -1, CAST(GETDATE() AS DATE)) AS DATETIME)
+        AND adm.fcha_admsn < CAST(CAST(GETDATE() AS DATE) AS DATETIME)
+    """
+
+    # Admisiones posteriores a la marca de agua (fecha, consecutivo), en orden de ingesta.
+    # El primer predicado es sargable; el segundo sólo descarta el empate en la fecha límite.
+    QUERY_ADMISIONES_INCREMENTAL = _SELECT_ADMISIONES + """
+        AND adm.fcha_admsn >= :desde_fecha
+        AND NOT (adm.fcha_admsn = :desde_fecha AND adm.cnsctvo_admsns <= :desde_consecutivo)
+    ORDER BY adm.fcha_admsn, adm.cnsctvo_admsns
+    """
+
     @staticmethod
     def _validar_url_externa(external_db_url: str = None) -> str:
         """Valida y obtiene la URL de conexión externa."""
@@ -63,209 +161,251 @@ class SyncClinicaService:
     @staticmethod
     def _crear_query_rango_fechas() -> str:
         """Genera el query SQL para obtener admisiones por rango de fechas."""
-        return """
-        SELECT 
-            consecutivo         = 'ADM' + CAST(adm.cnsctvo_admsns AS VARCHAR(20)), 
-            fecha_atencion      = adm.fcha_admsn, 
-            tipo_doc_codigo     = td.cdgo,
-            id_tipo_doc         = td.unco,
-            tipo_doc_desc       = td.dscrpcn, 
-            numero_id           = afl.nmro_idntfccn, 
-            primer_nombre       = afl.prmr_nmbre, 
-            segundo_nombre      = afl.sgndo_nmbre, 
-            primer_apellido     = afl.prmr_aplldo, 
-            segundo_apellido    = afl.sgndo_aplldo, 
-            telefono            = afl.tlfno, 
-            email               = afl.eml, 
-            id_empresa          = ae.unco_emprsa, 
-            tipo_empresa_id     = emp.unco_tpo_emprsa, 
-            tipo_empresa_desc   = te.dscrpcn
-        FROM tbAdmisiones AS adm 
-            INNER JOIN tbAfiliados            AS afl ON adm.unco_afldo = afl.unco 
-            INNER JOIN tbTiposDocumentos      AS td  ON afl.unco_tpo_idntfccn = td.unco 
-            INNER JOIN tbAdmisionesEmpresas   AS ae  ON adm.unco = ae.unco_admsns 
-            INNER JOIN tbEmpresas             AS emp ON ae.unco_emprsa = emp.unco 
-            INNER JOIN tbTipoEmpresa          AS te  ON emp.unco_tpo_emprsa = te.unco
-        WHERE 
-            emp.unco_tpo_emprsa IN (4, 5)
-            AND ae.unco_emprsa <> 89
-            AND CAST(adm.fcha_admsn AS DATE) BETWEEN :fecha_inicio AND :fecha_fin
-            AND adm.cnsctvo_admsns IS NOT NULL
+        return SyncClinicaService._SELECT_ADMISIONES + """
+            AND adm.fcha_admsn >= :fecha_inicio
+            AND adm.fcha_admsn < :fecha_fin_exclusiva
         """
 
     @staticmethod
-    def _procesar_paciente(db_local: Session, data: dict, idx: int, errores: list) -> tuple[int, int, int]:
+    def _params_rango_fechas(fecha_inicio: date, fecha_fin: date) -> dict:
+        """Parámetros del query por rango: [inicio 00:00, día siguiente al fin 00:00)."""
+        return {
+            "fecha_inicio": datetime.combine(fecha_inicio, datetime.min.time()),
+            "fecha_fin_exclusiva": datetime.combine(fecha_fin + timedelta(days=1), datetime.min.time())
+        }
+
+    @staticmethod
+    def _clasificar_pacientes(
+        data_rows: list,
+        existentes: set,
+        tipos_documento: set,
+        inicio: int,
+        errores: list
+    ) -> tuple[list, set, dict]:
         """
-        Procesa un paciente: lo crea si no existe, lo omite si ya existe.
+        Decide, sin consultar la BD, qué pacientes del lote se insertan y cuáles se omiten.
         
         Returns:
-            tuple: (creados, actualizados, omitidos)
+            tuple: (filas a insertar, IDs disponibles para atenciones, estadísticas)
         """
-        paciente_id = data.get("numero_id")
-        
-        if not paciente_id:
-            errores.append(f"Registro {idx}: numero_id vacío")
-            return (0, 0, 0)
-        
-        # Verificar si paciente ya existe
-        paciente_existente = get_paciente_by_id(db_local, paciente_id)
-        
-        if paciente_existente:
-            logger.debug(f"Paciente {paciente_id} ya existe, omitiendo")
-            return (0, 0, 1)
-        
-        # Crear nuevo paciente
-        id_tipo_documento = data.get("id_tipo_doc")
-        
-        if not id_tipo_documento:
-            errores.append(f"Registro {idx}: id_tipo_doc vacío")
-            return (0, 0, 1)
-        
-        nuevo_paciente = Paciente(
-            id=paciente_id,
-            id_tipo_documento=id_tipo_documento,
-            primer_nombre=data.get("primer_nombre"),
-            segundo_nombre=data.get("segundo_nombre"),
-            primer_apellido=data.get("primer_apellido"),
-            segundo_apellido=data.get("segundo_apellido"),
-            telefono_uno=data.get("telefono"),
-            email=data.get("email")
-        )
-        db_local.add(nuevo_paciente)
-        db_local.flush()
-        logger.debug(f"Paciente {paciente_id} creado")
-        return (1, 0, 0)
+        nuevos = []
+        disponibles = set(existentes)
+        creados = omitidos = 0
+
+        for idx, data in enumerate(data_rows, inicio):
+            paciente_id = data.get("numero_id")
+
+            if not paciente_id:
+                errores.append(f"Registro {idx}: numero_id vacío")
+                continue
+            if len(paciente_id) > _MAX_ID_PACIENTE:
+                errores.append(f"Registro {idx}: numero_id excede {_MAX_ID_PACIENTE} caracteres")
+                continue
+
+            # Ya existe en la BD local o ya se agregó en este mismo lote
+            if paciente_id in disponibles:
+                omitidos += 1
+                continue
+
+            id_tipo_documento = data.get("id_tipo_doc")
+            if not id_tipo_documento:
+                errores.append(f"Registro {idx}: id_tipo_doc vacío")
+                omitidos += 1
+                continue
+            if id_tipo_documento not in tipos_documento:
+                errores.append(f"Registro {idx}: tipo de documento {id_tipo_documento} no existe en la BD local")
+                omitidos += 1
+                continue
+
+            error = SyncClinicaService._validar_campos_paciente(data)
+            if error:
+                errores.append(f"Registro {idx}: paciente {paciente_id} omitido, {error}")
+                omitidos += 1
+                continue
+
+            nuevos.append({
+                "id": paciente_id,
+                "id_tipo_documento": id_tipo_documento,
+                "primer_nombre": data.get("primer_nombre"),
+                "segundo_nombre": data.get("segundo_nombre"),
+                "primer_apellido": data.get("primer_apellido"),
+                "segundo_apellido": data.get("segundo_apellido"),
+                "telefono_uno": data.get("telefono"),
+                "telefono_dos": None,
+                "email": data.get("email")
+            })
+            disponibles.add(paciente_id)
+            creados += 1
+
+        return nuevos, disponibles, {"creados": creados, "actualizados": 0, "omitidos": omitidos}
+
+    @staticmethod
+    def _validar_campos_paciente(data: dict) -> Optional[str]:
+        """Motivo por el que la fila violaría las restricciones de `pacientes`, o None"""
+        for campo, (columna, obligatorio) in _CAMPOS_PACIENTE.items():
+            valor = data.get(campo)
+            if obligatorio and not (valor and str(valor).strip()):
+                return f"{campo} vacío"
+            if valor is not None and len(str(valor)) > _longitud(columna):
+                return f"{campo} excede {_longitud(columna)} caracteres"
+        return None
 
     @staticmethod
-    def _procesar_atencion(db_local: Session, data: dict, idx: int, errores: list) -> tuple[int, int, int]:
+    def _clasificar_atenciones(
+        data_rows: list,
+        existentes: set,
+        pacientes_disponibles: set,
+        empresas_existentes: set,
+        tipos_empresa: set,
+        inicio: int,
+        errores: list
+    ) -> tuple[list, list, dict]:
         """
-        Procesa una atención: la crea si no existe, la omite si ya existe.
+        Decide, sin consultar la BD, qué atenciones (y empresas mínimas) del lote se insertan.
         
         Returns:
-            tuple: (creadas, actualizadas, omitidas)
+            tuple: (atenciones a insertar, empresas mínimas a insertar, estadísticas)
         """
-        atencion_id = data.get("consecutivo")
-        
-        if not atencion_id:
-            errores.append(f"Registro {idx}: consecutivo vacío")
-            return (0, 0, 0)
-        
-        # Verificar si atención ya existe
-        atencion_existente = get_atencion_by_id(db_local, atencion_id)
-        
-        if atencion_existente:
-            logger.debug(f"Atención {atencion_id} ya existe, omitiendo")
-            return (0, 0, 1)
-        
-        # Crear nueva atención
-        id_empresa = data.get("id_empresa")
-        paciente_id = data.get("numero_id")
-        
-        if not id_empresa:
-            errores.append(f"Registro {idx}: id_empresa vacío")
-            return (0, 0, 1)
-        
-        # Asegurar que la empresa exista en la BD local (evita violaciones FK)
-        empresa_existente = db_local.query(Empresa).filter(Empresa.id == id_empresa).first()
-        if not empresa_existente:
-            # Intentar crear una empresa mínima con la información disponible
-            tipo_empresa_id = data.get("tipo_empresa_id")
-            tipo_empresa_desc = data.get("tipo_empresa_desc") or f"Empresa {id_empresa}"
-            nueva_empresa = Empresa(
-                id=id_empresa,
-                id_tipo_empresa=tipo_empresa_id or 0,
-                nombre=tipo_empresa_desc
-            )
-            db_local.add(nueva_empresa)
-            try:
-                db_local.flush()
-                logger.debug(f"Empresa {id_empresa} creada (mínima) para evitar FK")
-            except Exception as e:
-                # Si crear la empresa falla, registrar el error y omitir la atención
-                errores.append(f"Registro {idx}: no se pudo crear empresa {id_empresa}: {e}")
-                logger.error(f"Error creando empresa {id_empresa}: {e}")
-                db_local.rollback()
-                return (0, 0, 1)
+        nuevas = []
+        empresas_nuevas = {}
+        vistas = set(existentes)
+        creadas = omitidas = 0
 
-        # Estados por defecto
-        id_estado_atencion = 1  # Ingresado
-        id_seguimiento_atencion = 8
-        
-        nueva_atencion = Atencion(
-            id=atencion_id,
-            id_paciente=paciente_id,
-            id_empresa=id_empresa,
-            id_estado_atencion=id_estado_atencion,
-            id_seguimiento_atencion=id_seguimiento_atencion,
-            fecha_ingreso=data.get("fecha_atencion") or datetime.now(),
-            observacion=""
-        )
-        db_local.add(nueva_atencion)
-        db_local.flush()
-        logger.debug(f"Atención {atencion_id} creada")
-        return (1, 0, 0)
+        for idx, data in enumerate(data_rows, inicio):
+            atencion_id = data.get("consecutivo")
+
+            if not atencion_id:
+                errores.append(f"Registro {idx}: consecutivo vacío")
+                continue
+            if len(atencion_id) > _MAX_ID_ATENCION:
+                errores.append(f"Registro {idx}: consecutivo excede {_MAX_ID_ATENCION} caracteres")
+                continue
+
+            if atencion_id in vistas:
+                omitidas += 1
+                continue
+
+            id_empresa = data.get("id_empresa")
+            paciente_id = data.get("numero_id")
+
+            if not id_empresa:
+                errores.append(f"Registro {idx}: id_empresa vacío")
+                omitidas += 1
+                continue
+
+            # Sin paciente local la atención violaría la FK
+            if not paciente_id or paciente_id not in pacientes_disponibles:
+                errores.append(f"Registro {idx}: paciente {paciente_id} no disponible, atención {atencion_id} omitida")
+                omitidas += 1
+                continue
+
+            # Asegurar que la empresa exista en la BD local (evita violaciones FK)
+            if id_empresa not in empresas_existentes and id_empresa not in empresas_nuevas:
+                tipo_empresa_id = data.get("tipo_empresa_id")
+                if tipo_empresa_id not in tipos_empresa:
+                    errores.append(
+                        f"Registro {idx}: tipo de empresa {tipo_empresa_id} no existe en la BD local, "
+                        f"atención {atencion_id} omitida"
+                    )
+                    omitidas += 1
+                    continue
+                empresas_nuevas[id_empresa] = {
+                    "id": id_empresa,
+                    "id_tipo_empresa": tipo_empresa_id,
+                    "nombre": (data.get("tipo_empresa_desc") or f"Empresa {id_empresa}")[:255]
+                }
+
+            nuevas.append({
+                "id": atencion_id,
+                "id_paciente": paciente_id,
+                "id_empresa": id_empresa,
+                "id_estado_atencion": SyncClinicaService.ID_ESTADO_INGRESADO,
+                "id_seguimiento_atencion": SyncClinicaService.ID_SEGUIMIENTO_DEFECTO,
+                "fecha_ingreso": data.get("fecha_atencion") or datetime.now(),
+                "observacion": ""
+            })
+            vistas.add(atencion_id)
+            creadas += 1
+
+        return nuevas, list(empresas_nuevas.values()), {"creadas": creadas, "actualizadas": 0, "omitidas": omitidas}
+
+    @staticmethod
+    def _ids_en_catalogo(catalogo: str, ids: Iterable) -> set:
+        """
+        Cuáles de los IDs existen en el catálogo, resueltos con la caché de catálogos en lugar de
+        consultar la tabla en cada lote (un ID ausente recarga la caché con límite de frecuencia).
+        """
+        cache = get_catalog_cache()
+        return {item_id for item_id in set(ids) if item_id is not None and cache.get(catalogo, item_id) is not None}
 
     @staticmethod
     def _procesar_admisiones(
         db_local: Session,
         admisiones: list,
-        errores: list
+        errores: list,
+        inicio: int = 1
     ) -> dict:
         """
-        Procesa una lista de admisiones: crea pacientes y atenciones.
+        Procesa un lote de admisiones con operaciones por conjuntos:
+        1. Pre-carga los IDs existentes de pacientes, atenciones y empresas con consultas IN (...)
+           y resuelve los tipos de documento y de empresa con la caché de catálogos
+        2. Clasifica las filas en memoria (crear / omitir / error)
+        3. Inserta los faltantes con INSERT multi-fila ... ON DUPLICATE KEY
+        
+        No hace commit: el llamador controla la transacción.
         
         Returns:
             dict: Estadísticas de procesamiento
         """
-        pacientes_creados = 0
-        pacientes_actualizados = 0
-        pacientes_omitidos = 0
-        atenciones_creadas = 0
-        atenciones_actualizadas = 0
-        atenciones_omitidas = 0
-        
-        for idx, row in enumerate(admisiones, 1):
-            try:
-                data = dict(row)
-                
-                # Procesar paciente
-                p_creados, p_actualizados, p_omitidos = SyncClinicaService._procesar_paciente(
-                    db_local, data, idx, errores
-                )
-                pacientes_creados += p_creados
-                pacientes_actualizados += p_actualizados
-                pacientes_omitidos += p_omitidos
-                
-                # Procesar atención
-                a_creadas, a_actualizadas, a_omitidas = SyncClinicaService._procesar_atencion(
-                    db_local, data, idx, errores
-                )
-                atenciones_creadas += a_creadas
-                atenciones_actualizadas += a_actualizadas
-                atenciones_omitidas += a_omitidas
-                
-            except Exception as e:
-                errores.append(f"Registro {idx}: {str(e)}")
-                logger.error(f"Error procesando registro {idx}: {e}")
-                # Asegurar que la sesión se restaure si hubo un fallo en flush/commit
-                try:
-                    db_local.rollback()
-                except Exception:
-                    logger.exception("Error al hacer rollback de la sesión después de excepción por registro")
-                continue
-        
+        data_rows = [dict(row) for row in admisiones]
+
+        pacientes_existentes = paciente_repository.get_existing_paciente_ids(
+            db_local, (d["numero_id"] for d in data_rows if d.get("numero_id"))
+        )
+        atenciones_existentes = atencion_repository.get_existing_atencion_ids(
+            db_local, (d["consecutivo"] for d in data_rows if d.get("consecutivo"))
+        )
+        empresas_existentes = SyncClinicaService._empresa_repo.get_existing_ids(
+            db_local, (d["id_empresa"] for d in data_rows if d.get("id_empresa"))
+        )
+        tipos_documento = SyncClinicaService._ids_en_catalogo(TIPOS_DOCUMENTOS, (d.get("id_tipo_doc") for d in data_rows))
+        tipos_empresa = SyncClinicaService._ids_en_catalogo(TIPOS_EMPRESAS, (d.get("tipo_empresa_id") for d in data_rows))
+
+        pacientes_nuevos, pacientes_disponibles, stats_pacientes = SyncClinicaService._clasificar_pacientes(
+            data_rows, pacientes_existentes, tipos_documento, inicio, errores
+        )
+        atenciones_nuevas, empresas_nuevas, stats_atenciones = SyncClinicaService._clasificar_atenciones(
+            data_rows, atenciones_existentes, pacientes_disponibles, empresas_existentes, tipos_empresa,
+            inicio, errores
+        )
+
+        # Orden de inserción respetando las FK: empresas -> pacientes -> atenciones
+        if empresas_nuevas:
+            SyncClinicaService._empresa_repo.bulk_insert(db_local, empresas_nuevas)
+            logger.debug(f"{len(empresas_nuevas)} empresas mínimas creadas para evitar FK")
+        if pacientes_nuevos:
+            paciente_repository.bulk_insert_pacientes(db_local, pacientes_nuevos)
+        if atenciones_nuevas:
+            atencion_repository.bulk_insert_atenciones(db_local, atenciones_nuevas)
+
+        logger.debug(
+            f"Lote procesado: {stats_pacientes['creados']} pacientes y "
+            f"{stats_atenciones['creadas']} atenciones insertadas"
+        )
+
         return {
             "pacientes": {
-                "creados": pacientes_creados,
-                "actualizados": pacientes_actualizados,
-                "omitidos": pacientes_omitidos,
-                "total": pacientes_creados + pacientes_actualizados
+                **stats_pacientes,
+                "total": stats_pacientes["creados"] + stats_pacientes["actualizados"]
             },
             "atenciones": {
-                "creadas": atenciones_creadas,
-                "actualizadas": atenciones_actualizadas,
-                "omitidas": atenciones_omitidas,
-                "total": atenciones_creadas + atenciones_actualizadas
+                **stats_atenciones,
+                "total": stats_atenciones["creadas"] + stats_atenciones["actualizadas"]
+            },
+            "empresas": {"creadas": len(empresas_nuevas)},
+            "ids_creados": {
+                "pacientes": [p["id"] for p in pacientes_nuevos],
+                "atenciones": [a["id"] for a in atenciones_nuevas],
             }
         }
 
@@ -276,7 +416,8 @@ class SyncClinicaService:
         estadisticas: dict,
         errores: list,
         fecha_inicio: date = None,
-        fecha_fin: date = None
+        fecha_fin: date = None,
+        particiones: List[dict] = None
     ) -> dict:
         """Construye la respuesta estándar de sincronización."""
         respuesta = {
@@ -291,123 +432,511 @@ class SyncClinicaService:
         if fecha_inicio and fecha_fin:
             respuesta["fecha_inicio"] = fecha_inicio.isoformat()
             respuesta["fecha_fin"] = fecha_fin.isoformat()
+
+        if particiones is not None:
+            respuesta["particiones"] = particiones
         
         return respuesta
 
     @staticmethod
-    def sync_admisiones_dia_anterior(db_local: Session, external_db_url: str = None) -> Dict[str, Any]:
+    def _estadisticas_vacias() -> dict:
+        """Estadísticas iniciales para acumular el resultado de varios lotes."""
+        return {
+            "pacientes": {"creados": 0, "actualizados": 0, "omitidos": 0, "total": 0},
+            "atenciones": {"creadas": 0, "actualizadas": 0, "omitidas": 0, "total": 0}
+        }
+
+    @staticmethod
+    def _acumular_estadisticas(total: dict, parcial: dict) -> None:
+        """Suma las estadísticas de un lote sobre el acumulado."""
+        for entidad in ("pacientes", "atenciones"):
+            for clave, valor in parcial[entidad].items():
+                total[entidad][clave] = total[entidad].get(clave, 0) + valor
+
+    @staticmethod
+    def _procesar_lote(
+        db_local: Session,
+        lote: list,
+        errores: list,
+        inicio: int,
+        antes_de_confirmar: Optional[Callable[[Session, list], None]] = None,
+        pacientes_creados: Optional[PacientesCreados] = None
+    ) -> dict:
         """
-        Sincroniza las admisiones del día anterior desde SQL Server externo.
+        Procesa y confirma un lote. Los deadlocks entre particiones concurrentes que insertan
+        el mismo paciente o empresa se resuelven reintentando el lote completo.
         
-        Proceso:
-        1. Conecta a bdClinicaFlorida_produccion_informes
-        2. Ejecuta query para obtener admisiones de ayer (tipos empresa 4 y 5)
-        3. Crea/actualiza pacientes en BD local
-        4. Crea/actualiza atenciones en BD local
+        `antes_de_confirmar` se ejecuta dentro de la misma transacción del lote (e.g. para
+        avanzar la marca de agua de forma atómica con los datos).
         """
-        external_db_url = SyncClinicaService._validar_url_externa(external_db_url)
-        errores = []
-        external_engine = None
+        for intento in range(1, SyncClinicaService.MAX_REINTENTOS_LOTE + 1):
+            errores_lote = []
+            try:
+                estadisticas = SyncClinicaService._procesar_admisiones(db_local, lote, errores_lote, inicio=inicio)
+                if antes_de_confirmar:
+                    antes_de_confirmar(db_local, lote)
+                db_local.commit()
+                SyncClinicaService._despues_de_confirmar(estadisticas, pacientes_creados)
+                errores.extend(errores_lote)
+                return estadisticas
+            except (IntegrityError, DataError) as e:
+                # Una fila que la validación no anticipó no debe descartar el lote completo
+                db_local.rollback()
+                logger.warning(f"Lote (registro {inicio}) rechazado por la BD ({e.orig}); se procesa fila por fila")
+                return SyncClinicaService._procesar_fila_a_fila(
+                    db_local, lote, errores, inicio, antes_de_confirmar, pacientes_creados
+                )
+            except OperationalError as e:
+                db_local.rollback()
+                codigo = e.orig.args[0] if getattr(e, "orig", None) is not None and e.orig.args else None
+                if codigo not in SyncClinicaService.ERRORES_REINTENTABLES or intento == SyncClinicaService.MAX_REINTENTOS_LOTE:
+                    raise
+                logger.warning(f"Conflicto de bloqueo en lote (registro {inicio}), reintento {intento}")
+                time.sleep(0.1 * intento)
+
+    @staticmethod
+    def _procesar_fila_a_fila(
+        db_local: Session,
+        lote: list,
+        errores: list,
+        inicio: int,
+        antes_de_confirmar: Optional[Callable[[Session, list], None]] = None,
+        pacientes_creados: Optional[PacientesCreados] = None
+    ) -> dict:
+        """
+        Procesa cada fila del lote en su propio SAVEPOINT: las que la BD rechaza se registran en
+        `errores` y el resto se confirma junto, en una sola transacción.
+        """
+        estadisticas = SyncClinicaService._estadisticas_vacias()
+        estadisticas["empresas"] = {"creadas": 0}
+        estadisticas["ids_creados"] = {"pacientes": [], "atenciones": []}
+        for desplazamiento, fila in enumerate(lote):
+            idx = inicio + desplazamiento
+            errores_fila = []
+            try:
+                with db_local.begin_nested():
+                    parcial = SyncClinicaService._procesar_admisiones(db_local, [fila], errores_fila, inicio=idx)
+            except (IntegrityError, DataError) as e:
+                errores.append(f"Registro {idx}: rechazado por la BD ({e.orig})")
+                continue
+            errores.extend(errores_fila)
+            SyncClinicaService._acumular_estadisticas(estadisticas, parcial)
+            estadisticas["empresas"]["creadas"] += parcial["empresas"]["creadas"]
+            for recurso, ids in parcial["ids_creados"].items():
+                estadisticas["ids_creados"][recurso].extend(ids)
+        if antes_de_confirmar:
+            antes_de_confirmar(db_local, lote)
+        db_local.commit()
+        SyncClinicaService._despues_de_confirmar(estadisticas, pacientes_creados)
+        return estadisticas
+
+    @staticmethod
+    def _despues_de_confirmar(estadisticas: dict, pacientes_creados: Optional[PacientesCreados] = None) -> None:
+        if pacientes_creados is not None:
+            # Pacientes que otra partición ya insertó y contó: aquí sólo fueron un no-op
+            ids = estadisticas["ids_creados"]["pacientes"]
+            propios = pacientes_creados.reclamar(ids)
+            repetidos = len(ids) - len(propios)
+            if repetidos:
+                estadisticas["ids_creados"]["pacientes"] = propios
+                estadisticas["pacientes"]["creados"] -= repetidos
+                estadisticas["pacientes"]["total"] -= repetidos
+                estadisticas["pacientes"]["omitidos"] += repetidos
+        if estadisticas["empresas"]["creadas"]:
+            get_catalog_cache().invalidate(EMPRESAS)
+        SyncClinicaService._notificar_creados(estadisticas["ids_creados"])
+
+    @staticmethod
+    def _notificar_creados(ids_creados: Dict[str, List[str]]) -> None:
+        """
+        Un evento 'bulk_created' por recurso con los IDs insertados en el lote confirmado,
+        en lugar de un 'create' por registro.
+        """
+        for recurso, ids in ids_creados.items():
+            if ids:
+                get_websocket_manager().send_event_threadsafe(
+                    "bulk_created", recurso, {"ids": ids, "count": len(ids)}
+                )
+
+    @staticmethod
+    def _sincronizar_por_lotes(
+        db_local: Session,
+        external_conn,
+        query: str,
+        params: dict,
+        errores: list,
+        progreso: dict,
+        chunk_size: int = None,
+        antes_de_confirmar: Optional[Callable[[Session, list], None]] = None,
+        monitor: Optional[MonitorSync] = None,
+        pacientes_creados: Optional[PacientesCreados] = None
+    ) -> None:
+        """
+        Lee el resultado externo por lotes de tamaño fijo y confirma cada lote en la BD local
+        antes de pedir el siguiente, de modo que la memoria se mantiene constante sin importar
+        el rango y los lotes ya confirmados sobreviven a un fallo posterior.
+        
+        `progreso` se actualiza en sitio (registros, lotes, estadisticas) para que el llamador
+        conozca el avance incluso si se produce una excepción.
+        """
+        chunk_size = chunk_size or settings.SYNC_CHUNK_SIZE
+        monitor = monitor or MonitorSync()
+
+        # yield_per hace que partitions() use fetchmany(chunk_size); pymssql entrega las
+        # filas del flujo TDS a medida que se piden, sin cargar todo el resultado.
+        result = external_conn.execution_options(yield_per=chunk_size).execute(text(query), params)
+
+        for lote in result.mappings().partitions():
+            monitor.filas_leidas(len(lote))
+            estadisticas = SyncClinicaService._procesar_lote(
+                db_local, lote, errores, inicio=progreso["registros"] + 1,
+                antes_de_confirmar=antes_de_confirmar,
+                pacientes_creados=pacientes_creados
+            )
+
+            progreso["registros"] += len(lote)
+            progreso["lotes"] += 1
+            SyncClinicaService._acumular_estadisticas(progreso["estadisticas"], estadisticas)
+            monitor.lote_confirmado(len(lote), estadisticas)
+            logger.info(f"Lote {progreso['lotes']} confirmado: {len(lote)} admisiones ({progreso['registros']} acumuladas)")
+
+    @staticmethod
+    def _ejecutar_sync(
+        db_local: Session,
+        external_db_url: str,
+        query: str,
+        params: dict = None,
+        fecha_inicio: date = None,
+        fecha_fin: date = None,
+        antes_de_confirmar: Optional[Callable[[Session, list], None]] = None,
+        monitor: Optional[MonitorSync] = None
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta una sincronización en modo streaming.
         
+        Si falla antes de confirmar el primer lote se propaga la excepción; si falla después,
+        los lotes confirmados se conservan y se retorna una respuesta con success=False.
+        """
+        errores = []
+        progreso = {"registros": 0, "lotes": 0, "estadisticas": SyncClinicaService._estadisticas_vacias()}
+
         try:
-            # Conectar a SQL Server externo
-            external_engine = create_engine(external_db_url, pool_pre_ping=True)
-            logger.info(f"Conectado a BD externa: {external_db_url.split('@')[1]}")
-            
-            with external_engine.connect() as external_conn:
-                # Ejecutar query de admisiones
-                result = external_conn.execute(text(SyncClinicaService.QUERY_ADMISIONES))
-                admisiones = result.mappings().all()
-                
-                logger.info(f"Obtenidas {len(admisiones)} admisiones del día anterior")
-                
-                # Procesar admisiones
-                estadisticas = SyncClinicaService._procesar_admisiones(db_local, admisiones, errores)
-            
-            # Commit DESPUÉS de salir del contexto de conexión externa
-            db_local.commit()
-            logger.info("Sincronización completada y cambios guardados en BD local")
-            
+            # Tomar una conexión del pool externo compartido
+            with open_external_engine(external_db_url) as external_engine, external_engine.connect() as external_conn:
+                logger.info(f"Conectado a BD externa: {external_db_url.split('@')[1]}")
+                SyncClinicaService._sincronizar_por_lotes(
+                    db_local, external_conn, query, params or {}, errores, progreso,
+                    antes_de_confirmar=antes_de_confirmar,
+                    monitor=monitor
+                )
+
+            logger.info(f"Sincronización completada: {progreso['registros']} admisiones en {progreso['lotes']} lotes")
+
             return SyncClinicaService._construir_respuesta(
                 success=True,
-                registros_procesados=len(admisiones),
-                estadisticas=estadisticas,
-                errores=errores
+                registros_procesados=progreso["registros"],
+                estadisticas=progreso["estadisticas"],
+                errores=errores,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin
             )
-            
+
         except Exception as e:
             db_local.rollback()
             logger.error(f"Error en sincronización: {e}")
-            raise Exception(f"Error sincronizando desde bdClinicaFlorida: {str(e)}")
-        
+
+            if progreso["lotes"] == 0:
+                raise Exception(f"Error sincronizando desde bdClinicaFlorida: {str(e)}")
+
+            errores.insert(0, f"Sincronización interrumpida después de {progreso['lotes']} lotes confirmados: {str(e)}")
+            return SyncClinicaService._construir_respuesta(
+                success=False,
+                registros_procesados=progreso["registros"],
+                estadisticas=progreso["estadisticas"],
+                errores=errores,
+                fecha_inicio=fecha_inicio,
+                fecha_fin=fecha_fin
+            )
+
+    @staticmethod
+    def _particionar_rango(fecha_inicio: date, fecha_fin: date, particion: str) -> List[tuple[date, date]]:
+        """Divide [fecha_inicio, fecha_fin] en particiones contiguas de un día o una semana."""
+        dias = SyncClinicaService.PARTICIONES.get(particion)
+        if dias is None:
+            return [(fecha_inicio, fecha_fin)]
+
+        particiones = []
+        actual = fecha_inicio
+        while actual <= fecha_fin:
+            fin = min(actual + timedelta(days=dias - 1), fecha_fin)
+            particiones.append((actual, fin))
+            actual = fin + timedelta(days=1)
+        return particiones
+
+    @staticmethod
+    def _sincronizar_particion(
+        external_engine: Engine,
+        fecha_inicio: date,
+        fecha_fin: date,
+        monitor: Optional[MonitorSync] = None,
+        pacientes_creados: Optional[PacientesCreados] = None
+    ) -> dict:
+        """
+        Sincroniza una partición del rango con su propia conexión externa y su propia sesión local.
+        Nunca lanza excepciones: el resultado indica éxito o fallo de la partición.
+        """
+        errores = []
+        progreso = {"registros": 0, "lotes": 0, "estadisticas": SyncClinicaService._estadisticas_vacias()}
+        success = True
+        inicio = time.monotonic()
+        db = SessionLocal()
+
+        try:
+            with external_engine.connect() as external_conn:
+                SyncClinicaService._sincronizar_por_lotes(
+                    db,
+                    external_conn,
+                    SyncClinicaService._crear_query_rango_fechas(),
+                    SyncClinicaService._params_rango_fechas(fecha_inicio, fecha_fin),
+                    errores,
+                    progreso,
+                    monitor=monitor,
+                    pacientes_creados=pacientes_creados
+                )
+        except Exception as e:
+            db.rollback()
+            success = False
+            errores.insert(0, f"Partición {fecha_inicio} - {fecha_fin} interrumpida después de {progreso['lotes']} lotes: {str(e)}")
+            logger.error(f"Error en partición {fecha_inicio} - {fecha_fin}: {e}")
         finally:
-            if external_engine:
-                external_engine.dispose()
-                logger.info("Conexión externa cerrada")
+            db.close()
+
+        return {
+            "fecha_inicio": fecha_inicio.isoformat(),
+            "fecha_fin": fecha_fin.isoformat(),
+            "success": success,
+            "registros_procesados": progreso["registros"],
+            "lotes": progreso["lotes"],
+            "duracion_segundos": round(time.monotonic() - inicio, 3),
+            "pacientes": progreso["estadisticas"]["pacientes"],
+            "atenciones": progreso["estadisticas"]["atenciones"],
+            "errores": errores[:20]
+        }
+
+    @staticmethod
+    def _ejecutar_sync_paralelo(
+        external_db_url: str,
+        particiones: List[tuple[date, date]],
+        max_workers: int,
+        fecha_inicio: date,
+        fecha_fin: date,
+        monitor: Optional[MonitorSync] = None
+    ) -> Dict[str, Any]:
+        """
+        Ejecuta las particiones con un pool acotado de hilos y combina sus resultados.
+        
+        Particiones concurrentes pueden intentar crear el mismo paciente: el INSERT ... ON DUPLICATE
+        KEY evita el duplicado y PacientesCreados hace que sólo una lo cuente y lo notifique.
+        """
+        # Cada worker ocupa una conexión del pool externo compartido
+        workers = max(1, min(max_workers, len(particiones), get_external_pool_capacity()))
+        logger.info(f"Backfill paralelo de {len(particiones)} particiones con {workers} workers")
+        pacientes_creados = PacientesCreados()
+
+        with open_external_engine(external_db_url) as external_engine, \
+                ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sync-particion") as executor:
+            resultados = list(executor.map(
+                lambda p: SyncClinicaService._sincronizar_particion(
+                    external_engine, p[0], p[1], monitor, pacientes_creados
+                ),
+                particiones
+            ))
+
+        estadisticas = SyncClinicaService._estadisticas_vacias()
+        errores = []
+        for resultado in resultados:
+            SyncClinicaService._acumular_estadisticas(estadisticas, resultado)
+            errores.extend(resultado["errores"])
+
+        # Si nada llegó a confirmarse se mantiene el comportamiento de error previo
+        if not any(r["lotes"] for r in resultados) and not all(r["success"] for r in resultados):
+            raise Exception(f"Error sincronizando desde bdClinicaFlorida: {errores[0] if errores else 'error desconocido'}")
+
+        return SyncClinicaService._construir_respuesta(
+            success=all(r["success"] for r in resultados),
+            registros_procesados=sum(r["registros_procesados"] for r in resultados),
+            estadisticas=estadisticas,
+            errores=errores,
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            particiones=resultados
+        )
+
+    @staticmethod
+    def sync_admisiones_dia_anterior(
+        db_local: Session,
+        external_db_url: str = None,
+        monitor: Optional[MonitorSync] = None
+    ) -> Dict[str, Any]:
+        """
+        Sincroniza las admisiones del día anterior desde SQL Server externo.
+        
+        Proceso:
+        1. Conecta a bdClinicaFlorida_produccion_informes
+        2. Lee por lotes las admisiones de ayer (tipos empresa 4 y 5)
+        3. Crea pacientes y atenciones faltantes, confirmando cada lote
+        """
+        external_db_url = SyncClinicaService._validar_url_externa(external_db_url)
+        return SyncClinicaService._ejecutar_sync(
+            db_local,
+            external_db_url,
+            SyncClinicaService.QUERY_ADMISIONES,
+            monitor=monitor
+        )
+
+    @staticmethod
+    def _avanzar_watermark(db_local: Session, lote: list) -> None:
+        """
+        Avanza la marca de agua hasta la última fila del lote (el query viene ordenado). Con la
+        ventana de relectura los primeros lotes quedan detrás de la marca y no la modifican.
+        """
+        ultima = lote[-1]
+        sync_watermark_repository.save_watermark(
+            db_local,
+            SyncClinicaService.FUENTE_WATERMARK,
+            ultima["fecha_atencion"],
+            ultima["cnsctvo_admsns"]
+        )
+
+    @staticmethod
+    @contextmanager
+    def _exclusion_incremental():
+        """
+        GET_LOCK sobre una conexión propia durante toda la ejecución: la incremental programada
+        y la manual (o las de varios workers) nunca corren a la vez.
+        """
+        with engine.connect() as conn:
+            obtenido = conn.execute(
+                text("SELECT GET_LOCK(:nombre, 0)"), {"nombre": SyncClinicaService.BLOQUEO_INCREMENTAL}
+            ).scalar()
+            if obtenido != 1:
+                raise SyncEnCurso("Ya hay una sincronización incremental en curso")
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT RELEASE_LOCK(:nombre)"), {"nombre": SyncClinicaService.BLOQUEO_INCREMENTAL})
+
+    @staticmethod
+    def sync_admisiones_incremental(
+        db_local: Session,
+        external_db_url: str = None,
+        monitor: Optional[MonitorSync] = None
+    ) -> Dict[str, Any]:
+        """
+        Sincroniza sólo las admisiones posteriores a la marca de agua persistida.
+        
+        Proceso:
+        1. Lee la marca de agua (última fecha/consecutivo ingeridos); si no existe parte de ayer
+        2. Lee por lotes, en orden, las admisiones desde la marca menos SYNC_INCREMENTAL_LOOKBACK_MINUTES
+           (admisiones registradas tarde con fecha anterior); las ya ingeridas se omiten
+        3. Crea pacientes y atenciones faltantes y avanza la marca en la misma transacción
+           (nunca hacia atrás)
+        
+        Una ejecución perdida no pierde datos: la siguiente continúa desde la marca.
+        
+        Raises:
+            SyncEnCurso: Otra incremental se está ejecutando
+        """
+        external_db_url = SyncClinicaService._validar_url_externa(external_db_url)
+        with SyncClinicaService._exclusion_incremental():
+            return SyncClinicaService._sync_incremental(db_local, external_db_url, monitor)
+
+    @staticmethod
+    def _sync_incremental(
+        db_local: Session,
+        external_db_url: str,
+        monitor: Optional[MonitorSync]
+    ) -> Dict[str, Any]:
+
+        watermark = sync_watermark_repository.get_watermark(db_local, SyncClinicaService.FUENTE_WATERMARK)
+        if watermark and watermark.ultima_fecha is not None:
+            lookback = timedelta(minutes=settings.SYNC_INCREMENTAL_LOOKBACK_MINUTES)
+            if lookback:
+                desde_fecha = watermark.ultima_fecha - lookback
+                desde_consecutivo = -1
+            else:
+                desde_fecha = watermark.ultima_fecha
+                desde_consecutivo = watermark.ultimo_consecutivo if watermark.ultimo_consecutivo is not None else -1
+        else:
+            desde_fecha = datetime.combine(date.today() - timedelta(days=1), datetime.min.time())
+            desde_consecutivo = -1
+        logger.info(f"Sincronización incremental desde ({desde_fecha}, {desde_consecutivo})")
+
+        respuesta = SyncClinicaService._ejecutar_sync(
+            db_local,
+            external_db_url,
+            SyncClinicaService.QUERY_ADMISIONES_INCREMENTAL,
+            {"desde_fecha": desde_fecha, "desde_consecutivo": desde_consecutivo},
+            antes_de_confirmar=SyncClinicaService._avanzar_watermark,
+            monitor=monitor
+        )
+
+        watermark = sync_watermark_repository.get_watermark(db_local, SyncClinicaService.FUENTE_WATERMARK)
+        if watermark:
+            respuesta["watermark"] = {
+                "ultima_fecha": watermark.ultima_fecha.isoformat() if watermark.ultima_fecha else None,
+                "ultimo_consecutivo": watermark.ultimo_consecutivo
+            }
+        return respuesta
 
     @staticmethod
     def sync_admisiones_rango_fechas(
         db_local: Session, 
         fecha_inicio: date, 
         fecha_fin: date,
-        external_db_url: str = None
+        external_db_url: str = None,
+        particion: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        monitor: Optional[MonitorSync] = None
     ) -> Dict[str, Any]:
         """
         Sincroniza las admisiones en un rango de fechas desde SQL Server externo.
         
         Proceso:
         1. Conecta a bdClinicaFlorida_produccion_informes
-        2. Ejecuta query para obtener admisiones del rango (tipos empresa 4 y 5)
+        2. Lee por lotes las admisiones del rango (tipos empresa 4 y 5)
         3. Crea pacientes si no existen (evita duplicados)
         4. Crea atenciones si no existen (evita duplicados)
         
+        Cada lote se confirma antes de leer el siguiente. Si el rango abarca varias
+        particiones ('dia' o 'semana'), estas se sincronizan en paralelo, cada una con
+        su propia conexión externa y sesión local.
         """
         # Validar fechas
         if fecha_inicio > fecha_fin:
             raise ValueError("La fecha de inicio no puede ser posterior a la fecha de fin")
+
+        particion = particion or settings.SYNC_PARTICION
+        if particion != "ninguna" and particion not in SyncClinicaService.PARTICIONES:
+            raise ValueError(f"Partición no soportada: {particion}")
+        max_workers = max_workers or settings.SYNC_MAX_WORKERS
         
         external_db_url = SyncClinicaService._validar_url_externa(external_db_url)
-        query_rango = SyncClinicaService._crear_query_rango_fechas()
-        errores = []
-        external_engine = None
-        
-        try:
-            # Conectar a SQL Server externo
-            external_engine = create_engine(external_db_url, pool_pre_ping=True)
-            logger.info(f"Conectado a BD externa para rango {fecha_inicio} - {fecha_fin}")
-            
-            with external_engine.connect() as external_conn:
-                # Ejecutar query con parámetros de fecha
-                result = external_conn.execute(
-                    text(query_rango),
-                    {"fecha_inicio": fecha_inicio, "fecha_fin": fecha_fin}
-                )
-                admisiones = result.mappings().all()
-                
-                logger.info(f"Obtenidas {len(admisiones)} admisiones entre {fecha_inicio} y {fecha_fin}")
-                
-                # Procesar admisiones
-                estadisticas = SyncClinicaService._procesar_admisiones(db_local, admisiones, errores)
-            
-            # Commit DESPUÉS de salir del contexto de conexión externa
-            db_local.commit()
-            logger.info("Sincronización completada y cambios guardados en BD local")
-            
-            return SyncClinicaService._construir_respuesta(
-                success=True,
-                registros_procesados=len(admisiones),
-                estadisticas=estadisticas,
-                errores=errores,
-                fecha_inicio=fecha_inicio,
-                fecha_fin=fecha_fin
+        particiones = SyncClinicaService._particionar_rango(fecha_inicio, fecha_fin, particion)
+
+        if len(particiones) > 1 and max_workers > 1:
+            return SyncClinicaService._ejecutar_sync_paralelo(
+                external_db_url, particiones, max_workers, fecha_inicio, fecha_fin, monitor
             )
-            
-        except Exception as e:
-            db_local.rollback()
-            logger.error(f"Error en sincronización: {e}")
-            raise Exception(f"Error sincronizando desde bdClinicaFlorida: {str(e)}")
-        
-        finally:
-            if external_engine:
-                external_engine.dispose()
-                logger.info("Conexión externa cerrada")
+
+        logger.info(f"Sincronizando rango {fecha_inicio} - {fecha_fin}")
+
+        return SyncClinicaService._ejecutar_sync(
+            db_local,
+            external_db_url,
+            SyncClinicaService._crear_query_rango_fechas(),
+            SyncClinicaService._params_rango_fechas(fecha_inicio, fecha_fin),
+            fecha_inicio=fecha_inicio,
+            fecha_fin=fecha_fin,
+            monitor=monitor
+        )
@@ -0,0 +1,344 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+import logging
+import threading
+import time
+import uuid
+
+from app.configuration.app.config import settings
+from app.configuration.app.database import SessionLocal
+from app.persistence.repository import sync_job_repository
+from app.presentation.dto.sync_dto import SyncRangoFechasDto
+from app.service.implementation.sync_clinica_service import SyncClinicaService, MonitorSync
+from app.service.implementation.websocket_manager import get_websocket_manager
+
+logger = logging.getLogger(__name__)
+
+# Estados de un job de sincronización
+ESTADO_PENDIENTE = "pendiente"
+ESTADO_EN_PROGRESO = "en_progreso"
+ESTADO_COMPLETADO = "completado"
+# Terminó con error después de confirmar lotes: el resultado trae lo que sí se guardó
+ESTADO_PARCIAL = "parcial"
+ESTADO_FALLIDO = "fallido"
+ESTADOS_ABIERTOS = (ESTADO_PENDIENTE, ESTADO_EN_PROGRESO)
+
+ERROR_INTERRUMPIDO = "Job interrumpido por reinicio del servidor"
+
+
+class _MonitorJob(MonitorSync):
+    """Acumula el progreso de un job (thread-safe) y lo publica por WebSocket."""
+
+    def __init__(self, job_id: str):
+        self._job_id = job_id
+
+    def filas_leidas(self, cantidad: int) -> None:
+        SyncJobService._actualizar_progreso(self._job_id, filas_leidas=cantidad)
+
+    def lote_confirmado(self, cantidad: int, estadisticas: dict) -> None:
+        SyncJobService._actualizar_progreso(
+            self._job_id,
+            filas_procesadas=cantidad,
+            lotes=1,
+            pacientes_creados=estadisticas["pacientes"]["creados"],
+            pacientes_omitidos=estadisticas["pacientes"]["omitidos"],
+            atenciones_creadas=estadisticas["atenciones"]["creadas"],
+            atenciones_omitidas=estadisticas["atenciones"]["omitidas"],
+        )
+
+
+class SyncJobService:
+    """
+    Ejecuta sincronizaciones largas como jobs en segundo plano.
+
+    Los endpoints encolan el job y retornan su ID de inmediato; el avance se consulta con
+    get_job() y se publica por WebSocket (recurso 'sync_jobs') a medida que se confirman lotes.
+
+    El estado vive en la tabla sync_jobs: el worker que ejecuta el job la actualiza en cada cambio
+    de estado y, como mucho, una vez por segundo con el progreso, así cualquier worker detrás del
+    balanceador puede responder la consulta.
+
+    Mientras el job está abierto, un hilo de latido renueva actualizado_en; los jobs abiertos sin
+    latido reciente (su worker se reinició o murió) se cierran como fallidos al consultarlos.
+    """
+
+    RESOURCE = "sync_jobs"
+    # Segundos mínimos entre escrituras del progreso en la BD
+    INTERVALO_GUARDADO = 1.0
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    # Jobs que se ejecutan en este proceso (el resto sólo existe en la BD)
+    _jobs: Dict[str, Dict[str, Any]] = {}
+    _lock = threading.Lock()
+    _detener_latido: Optional[threading.Event] = None
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        with cls._lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=settings.SYNC_JOBS_MAX_CONCURRENT,
+                    thread_name_prefix="sync-job"
+                )
+                cls._detener_latido = threading.Event()
+                threading.Thread(
+                    target=cls._latido, args=(cls._detener_latido,), name="sync-job-latido", daemon=True
+                ).start()
+            return cls._executor
+
+    @classmethod
+    def _latido(cls, detener: threading.Event):
+        """Renueva actualizado_en de los jobs abiertos de este proceso (incluidos los que esperan en cola)."""
+        while not detener.wait(settings.SYNC_JOBS_HEARTBEAT_SECONDS):
+            with cls._lock:
+                for job_id, job in cls._jobs.items():
+                    try:
+                        cls._guardar(job)
+                    except Exception as e:
+                        logger.warning(f"No se pudo renovar el latido del job {job_id}: {e}")
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Detiene el executor sin esperar a los jobs en curso y cierra como fallidos los jobs abiertos
+        de este proceso (los encolados se cancelan y los que corren no sobreviven al reinicio).
+        """
+        with cls._lock:
+            if cls._detener_latido is not None:
+                cls._detener_latido.set()
+                cls._detener_latido = None
+            if cls._executor is not None:
+                cls._executor.shutdown(wait=False, cancel_futures=True)
+                cls._executor = None
+                logger.info("Executor de jobs de sincronización detenido")
+            for job_id, job in list(cls._jobs.items()):
+                job["estado"] = ESTADO_FALLIDO
+                job["finalizado_en"] = datetime.now()
+                job["error"] = ERROR_INTERRUMPIDO
+                try:
+                    cls._guardar(job)
+                except Exception as e:
+                    # Sin latido, el job se cerrará por expiración
+                    logger.error(f"No se pudo cerrar el job interrumpido {job_id}: {e}")
+            cls._jobs.clear()
+
+    @classmethod
+    def expirar_interrumpidos(cls) -> int:
+        """Cierra como fallidos los jobs abiertos sin latido reciente (p. ej. al arrancar tras un reinicio)."""
+        db = SessionLocal()
+        try:
+            cerrados = cls._expirar(db)
+            if cerrados:
+                logger.warning(f"{cerrados} job(s) de sincronización cerrados por falta de latido")
+            return cerrados
+        except Exception as e:
+            logger.error(f"No se pudieron cerrar los jobs interrumpidos: {e}")
+            return 0
+        finally:
+            db.close()
+
+    @staticmethod
+    def _expirar(db) -> int:
+        limite = datetime.now() - timedelta(seconds=settings.SYNC_JOBS_STALE_SECONDS)
+        try:
+            cerrados = sync_job_repository.marcar_interrumpidos(
+                db, ESTADOS_ABIERTOS, limite, ESTADO_FALLIDO, ERROR_INTERRUMPIDO
+            )
+            db.commit()
+            return cerrados
+        except Exception:
+            db.rollback()
+            raise
+
+    @staticmethod
+    def _fila(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Columnas de sync_jobs a partir del job en memoria."""
+        return {k: v for k, v in job.items() if not k.startswith("_")}
+
+    @staticmethod
+    def _snapshot(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Copia pública del job (de memoria o de la BD) con el throughput calculado."""
+        snapshot = dict(job)
+        snapshot["progreso"] = dict(job["progreso"] or {})
+        for campo in ("creado_en", "iniciado_en", "finalizado_en", "actualizado_en"):
+            if isinstance(snapshot[campo], datetime):
+                snapshot[campo] = snapshot[campo].isoformat()
+        inicio = job.get("iniciado_en")
+        if inicio:
+            fin = job.get("finalizado_en") or datetime.now()
+            duracion = max((fin - inicio).total_seconds(), 1e-6)
+            snapshot["progreso"]["duracion_segundos"] = round(duracion, 3)
+            snapshot["progreso"]["filas_por_segundo"] = round(
+                snapshot["progreso"].get("filas_procesadas", 0) / duracion, 2
+            )
+        return snapshot
+
+    @classmethod
+    def _guardar(cls, job: Dict[str, Any], depurar: bool = False):
+        """Escribe el estado del job en sync_jobs (se llama con el lock tomado, para no reordenar escrituras)."""
+        job["actualizado_en"] = datetime.now()
+        db = SessionLocal()
+        try:
+            sync_job_repository.save_job(db, cls._fila(job))
+            if depurar:
+                # Conservar sólo el historial reciente
+                sync_job_repository.delete_antiguos(db, settings.SYNC_JOBS_HISTORY)
+            db.commit()
+            job["_guardado_monotonic"] = time.monotonic()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @classmethod
+    def _publicar(cls, event_type: str, snapshot: Optional[Dict[str, Any]]):
+        if snapshot is None:
+            return
+        get_websocket_manager().send_event_threadsafe(event_type, cls.RESOURCE, snapshot)
+
+    @classmethod
+    def _actualizar_progreso(cls, job_id: str, **incrementos):
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            if job is None:
+                return
+            for clave, valor in incrementos.items():
+                job["progreso"][clave] += valor
+            if time.monotonic() - job.get("_guardado_monotonic", 0) >= cls.INTERVALO_GUARDADO:
+                try:
+                    cls._guardar(job)
+                except Exception as e:
+                    # El progreso se vuelve a guardar en la siguiente escritura; no se corta el job
+                    logger.warning(f"No se pudo guardar el progreso del job {job_id}: {e}")
+            snapshot = cls._snapshot(cls._fila(job))
+        cls._publicar("progress", snapshot)
+
+    @classmethod
+    def _registrar(cls, tipo: str, parametros: dict) -> Dict[str, Any]:
+        job = {
+            "id": uuid.uuid4().hex,
+            "tipo": tipo,
+            "estado": ESTADO_PENDIENTE,
+            "parametros": parametros,
+            "creado_en": datetime.now(),
+            "iniciado_en": None,
+            "finalizado_en": None,
+            "actualizado_en": None,
+            "progreso": {
+                "filas_leidas": 0,
+                "filas_procesadas": 0,
+                "lotes": 0,
+                "pacientes_creados": 0,
+                "pacientes_omitidos": 0,
+                "atenciones_creadas": 0,
+                "atenciones_omitidas": 0,
+            },
+            "resultado": None,
+            "error": None,
+        }
+        with cls._lock:
+            cls._guardar(job, depurar=True)
+            cls._jobs[job["id"]] = job
+            return cls._snapshot(cls._fila(job))
+
+    @classmethod
+    def _marcar(cls, job_id: str, estado: str, resultado: Optional[dict] = None, error: Optional[str] = None):
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            if job is None:
+                return None
+            job["estado"] = estado
+            if estado == ESTADO_EN_PROGRESO:
+                job["iniciado_en"] = datetime.now()
+            else:
+                job["finalizado_en"] = datetime.now()
+                job["resultado"] = resultado
+                job["error"] = error
+                # Terminado: desde aquí sólo se consulta en la BD
+                cls._jobs.pop(job_id, None)
+            try:
+                cls._guardar(job)
+            except Exception as e:
+                logger.error(f"No se pudo guardar el estado '{estado}' del job {job_id}: {e}")
+            return cls._snapshot(cls._fila(job))
+
+    @classmethod
+    def _ejecutar_rango_fechas(cls, job_id: str, data: SyncRangoFechasDto):
+        cls._publicar("started", cls._marcar(job_id, ESTADO_EN_PROGRESO))
+        db = SessionLocal()
+        try:
+            resultado = SyncClinicaService.sync_admisiones_rango_fechas(
+                db_local=db,
+                fecha_inicio=data.fecha_inicio,
+                fecha_fin=data.fecha_fin,
+                external_db_url=data.external_db_url,
+                particion=data.particion,
+                max_workers=data.max_workers,
+                monitor=_MonitorJob(job_id)
+            )
+            estado = ESTADO_COMPLETADO if resultado["success"] else ESTADO_PARCIAL
+            error = None if resultado["success"] else (resultado["errores"][0] if resultado["errores"] else None)
+            snapshot = cls._marcar(job_id, estado, resultado=resultado, error=error)
+        except Exception as e:
+            logger.error(f"Job de sincronización {job_id} falló: {e}", exc_info=True)
+            estado = ESTADO_FALLIDO
+            snapshot = cls._marcar(job_id, estado, error=str(e))
+        finally:
+            db.close()
+        evento = {ESTADO_COMPLETADO: "completed", ESTADO_PARCIAL: "partial"}.get(estado, "failed")
+        cls._publicar(evento, snapshot)
+
+    @classmethod
+    def enqueue_rango_fechas(cls, data: SyncRangoFechasDto) -> Dict[str, Any]:
+        """Encola una sincronización por rango de fechas y retorna el job recién creado."""
+        parametros = data.model_dump(mode="json", exclude={"external_db_url"})
+        job = cls._registrar("rango_fechas", parametros)
+        cls._get_executor().submit(cls._ejecutar_rango_fechas, job["id"], data)
+        logger.info(f"Job de sincronización {job['id']} encolado: {parametros}")
+        return job
+
+    @staticmethod
+    def _desde_bd(fila) -> Dict[str, Any]:
+        return SyncJobService._snapshot({
+            "id": fila.id,
+            "tipo": fila.tipo,
+            "estado": fila.estado,
+            "parametros": fila.parametros,
+            "creado_en": fila.creado_en,
+            "iniciado_en": fila.iniciado_en,
+            "finalizado_en": fila.finalizado_en,
+            "actualizado_en": fila.actualizado_en,
+            "progreso": fila.progreso,
+            "resultado": fila.resultado,
+            "error": fila.error,
+        })
+
+    @classmethod
+    def get_job(cls, job_id: str) -> Optional[Dict[str, Any]]:
+        with cls._lock:
+            job = cls._jobs.get(job_id)
+            if job is not None:
+                # En ejecución en este worker: el progreso en memoria es más reciente que el guardado
+                return cls._snapshot(cls._fila(job))
+        db = SessionLocal()
+        try:
+            cls._expirar(db)
+            fila = sync_job_repository.get_job(db, job_id)
+            return cls._desde_bd(fila) if fila else None
+        finally:
+            db.close()
+
+    @classmethod
+    def list_jobs(cls) -> List[Dict[str, Any]]:
+        """Jobs recientes, del más nuevo al más antiguo."""
+        db = SessionLocal()
+        try:
+            cls._expirar(db)
+            filas = sync_job_repository.list_jobs(db, settings.SYNC_JOBS_HISTORY)
+        finally:
+            db.close()
+        with cls._lock:
+            locales = {job_id: cls._snapshot(cls._fila(job)) for job_id, job in cls._jobs.items()}
+        return [locales.get(fila.id) or cls._desde_bd(fila) for fila in filas]
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 from app.persistence.repository.paciente_repository import create_paciente, get_paciente_by_id
@@ -6,6 +6,7 @@ from app.persistence.repository.atencion_repository import create_atencion, get_
 from app.persistence.entity.pacientes_entity import Paciente
 from app.persistence.entity.atenciones_entity import Atencion
 from app.service.interface.sync_service_interface import SyncServiceInterface
+from app.configuration.app.external_database import open_external_engine
 
 
 class SyncService(SyncServiceInterface):
@@ -33,17 +34,14 @@ class SyncService(SyncServiceInterface):
         Returns:
             Dict con contadores de registros sincronizados
         """
-        external_engine = None
         try:
-            # Conectar a la BD externa
-            external_engine = create_engine(external_db_url, pool_pre_ping=True)
-            
             pacientes_creados = 0
             pacientes_actualizados = 0
             atenciones_creadas = 0
             atenciones_actualizadas = 0
             
-            with external_engine.connect() as external_conn:
+            # Conectar a la BD externa (engine con pool compartido si es la URL configurada)
+            with open_external_engine(external_db_url) as external_engine, external_engine.connect() as external_conn:
                 # Sincronizar pacientes
                 result_pacientes = external_conn.execute(text(query_pacientes))
                 pacientes_data = result_pacientes.mappings().all()
@@ -110,7 +108,3 @@ class SyncService(SyncServiceInterface):
         except Exception as e:
             db_local.rollback()
             raise Exception(f"Error sincronizando datos: {str(e)}")
-        
-        finally:
-            if external_engine:
-                external_engine.dispose()
@@ -1,6 +1,6 @@
 from app.persistence.repository.tipo_empresa_repository import TipoEmpresaRepository
 from app.persistence.entity.tipos_empresas_entity import TipoEmpresa
-from app.configuration.app.database import SessionLocal
+from app.service.implementation.catalog_cache import get_catalog_cache, TIPOS_EMPRESAS
 
 
 class TipoEmpresaServiceImpl:
@@ -8,7 +8,4 @@ class TipoEmpresaServiceImpl:
         self.repo = TipoEmpresaRepository()
 
     def get_all_tipos(self):
-        db = SessionLocal()
-        result = self.repo.get_all(db)
-        db.close()
-        return result
+        return get_catalog_cache().get_all(TIPOS_EMPRESAS)
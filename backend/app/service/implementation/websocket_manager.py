@@ -1,9 +1,23 @@
-from typing import Dict, Set
+from collections import deque
+from typing import Any, Deque, Dict, List, Set, Optional, Tuple, Union
 from fastapi import WebSocket
+import asyncio
 import json
 import logging
+import threading
+import time
 from datetime import datetime, date
 from decimal import Decimal
+from pydantic import BaseModel
+
+from app.configuration.app.config import settings
+from app.service.implementation.event_backplane import crear_backplane
+from app.service.interface.event_backplane_interface import EventBackplaneInterface
+
+try:
+    import orjson
+except ImportError:  # dependencia opcional: sin ella se usa el json de la biblioteca estándar
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -19,28 +33,530 @@ def json_serializer(obj):
     raise TypeError(f"Type {type(obj)} not serializable")
 
 
+def dumps(obj: Any) -> str:
+    """
+    Serializa un mensaje a JSON compacto. Cada evento se codifica una sola vez y el texto se
+    comparte entre todos los destinatarios (y los lotes lo concatenan sin volver a codificar).
+    Con orjson instalado datetime/date se codifican de forma nativa y mucho más rápido.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=json_serializer, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, default=json_serializer, separators=(",", ":"))
+
+
+def loads(texto: str) -> Any:
+    return orjson.loads(texto) if orjson is not None else json.loads(texto)
+
+
+# Políticas cuando la cola de salida de una conexión está llena
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE, OVERFLOW_DISCONNECT)
+
+
+class _Muestras:
+    """Ventana de las últimas N latencias (ms) con percentiles."""
+
+    def __init__(self, ventana: int = 500):
+        self._valores: Deque[float] = deque(maxlen=ventana)
+        self.maximo = 0.0
+
+    def agregar(self, ms: float):
+        self._valores.append(ms)
+        self.maximo = max(self.maximo, ms)
+
+    def resumen(self) -> Dict[str, Optional[float]]:
+        ordenadas = sorted(self._valores)
+        if not ordenadas:
+            return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+        return {
+            "p50_ms": round(ordenadas[len(ordenadas) // 2], 3),
+            "p95_ms": round(ordenadas[int(len(ordenadas) * 0.95)], 3),
+            "max_ms": round(self.maximo, 3),
+        }
+
+
+class _MetricasFanout:
+    """
+    Métricas de broadcast por tipo de evento: costo de encolar (lo que paga quien publica) y
+    latencia de entrega (desde que se encola hasta que el writer lo envía a cada cliente).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_evento: Dict[str, Dict[str, Any]] = {}
+        self.contadores: Dict[str, int] = {
+            "overflow_dropped": 0,
+            "coalesced": 0,
+            "disconnected_overflow": 0,
+            "disconnected_slow": 0,
+            "batches": 0,
+            "batched_events": 0,
+            "batch_coalesced": 0,
+            "heartbeats_sent": 0,
+            "evicted_idle": 0,
+        }
+
+    def _evento(self, evento: Optional[str]) -> Dict[str, Any]:
+        return self._por_evento.setdefault(evento or "desconocido", {
+            "count": 0, "recipients": 0, "delivered": 0, "failed": 0,
+            "_encolado": _Muestras(), "_entrega": _Muestras(),
+        })
+
+    def registrar_broadcast(self, evento: Optional[str], duracion: float, destinatarios: int):
+        with self._lock:
+            m = self._evento(evento)
+            m["count"] += 1
+            m["recipients"] += destinatarios
+            m["_encolado"].agregar(duracion * 1000)
+
+    def registrar_entrega(self, evento: Optional[str], latencia: float, ok: bool):
+        with self._lock:
+            m = self._evento(evento)
+            if ok:
+                m["delivered"] += 1
+                m["_entrega"].agregar(latencia * 1000)
+            else:
+                m["failed"] += 1
+
+    def incrementar(self, contador: str, cantidad: int = 1):
+        with self._lock:
+            self.contadores[contador] += cantidad
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self.contadores),
+                "events": {
+                    evento: {
+                        "count": m["count"],
+                        "recipients": m["recipients"],
+                        "delivered": m["delivered"],
+                        "failed": m["failed"],
+                        "enqueue": m["_encolado"].resumen(),
+                        "delivery": m["_entrega"].resumen(),
+                    }
+                    for evento, m in self._por_evento.items()
+                },
+            }
+
+
+# Recursos cuyos eventos sólo reciben las conexiones de administradores (como GET /ws/metrics)
+RECURSOS_ADMIN = ("sync_jobs",)
+
+# Dimensiones por las que un cliente de /ws/updates puede filtrar los eventos de un recurso,
+# con los campos del evento de los que se toma cada una (fecha se compara por día)
+FILTER_DIMENSIONS = ("fecha", "id_empresa", "id_estado_atencion")
+_CAMPOS_DIMENSION = {
+    "fecha": ("fecha_atencion", "fecha_ingreso", "fecha"),
+    "id_empresa": ("id_empresa",),
+    "id_estado_atencion": ("id_estado_atencion",),
+}
+
+
+def _normalizar_valor(dimension: str, valor: Any) -> str:
+    if dimension == "fecha":
+        texto = valor.isoformat() if isinstance(valor, (datetime, date)) else str(valor)
+        return texto[:10]
+    return str(valor)
+
+
+def _valores_evento(data: Any) -> Dict[str, str]:
+    """Valor de cada dimensión presente en los datos del evento"""
+    valores = {}
+    if not isinstance(data, dict):
+        return valores
+    for dimension, campos in _CAMPOS_DIMENSION.items():
+        for campo in campos:
+            if data.get(campo) is not None:
+                valores[dimension] = _normalizar_valor(dimension, data[campo])
+                break
+    return valores
+
+
+class _IndiceSuscripciones:
+    """
+    Suscripciones filtradas a un recurso: índice (dimensión, valor) -> conexiones, más las
+    conexiones que no filtran por cada dimensión. Los destinatarios de un evento se obtienen
+    intersectando, dimensión por dimensión, quienes piden su valor y quienes no filtran por ella;
+    una dimensión que el evento no trae (p. ej. un delete sólo con el ID) no descarta a nadie.
+    """
+
+    def __init__(self):
+        self.filtros: Dict[WebSocket, Dict[str, Set[str]]] = {}
+        self._por_valor: Dict[Tuple[str, str], Set[WebSocket]] = {}
+        self._sin_filtro: Dict[str, Set[WebSocket]] = {d: set() for d in FILTER_DIMENSIONS}
+
+    def agregar(self, websocket: WebSocket, filtros: Dict[str, Set[str]]):
+        self.quitar(websocket)
+        self.filtros[websocket] = filtros
+        for dimension in FILTER_DIMENSIONS:
+            valores = filtros.get(dimension)
+            if not valores:
+                self._sin_filtro[dimension].add(websocket)
+                continue
+            for valor in valores:
+                self._por_valor.setdefault((dimension, valor), set()).add(websocket)
+
+    def quitar(self, websocket: WebSocket):
+        filtros = self.filtros.pop(websocket, None)
+        if filtros is None:
+            return
+        for dimension in FILTER_DIMENSIONS:
+            self._sin_filtro[dimension].discard(websocket)
+            for valor in filtros.get(dimension, ()):
+                conexiones = self._por_valor.get((dimension, valor))
+                if conexiones is not None:
+                    conexiones.discard(websocket)
+                    if not conexiones:
+                        del self._por_valor[(dimension, valor)]
+
+    def destinatarios(self, data: Any) -> Set[WebSocket]:
+        if not self.filtros:
+            return set()
+        candidatos: Optional[Set[WebSocket]] = None
+        for dimension, valor in _valores_evento(data).items():
+            coinciden = self._sin_filtro[dimension] | self._por_valor.get((dimension, valor), set())
+            candidatos = coinciden if candidatos is None else candidatos & coinciden
+            if not candidatos:
+                return set()
+        return set(self.filtros) if candidatos is None else candidatos
+
+
+class _Mensaje:
+    __slots__ = ("clave", "evento", "texto", "encolado_en")
+
+    def __init__(self, clave: Optional[tuple], evento: Optional[str], texto: str):
+        self.clave = clave
+        self.evento = evento
+        self.texto = texto
+        self.encolado_en = time.perf_counter()
+
+
+class _Conexion:
+    """
+    Cola de salida acotada de un WebSocket y su tarea writer. Publicar sólo encola; el writer
+    envía en orden y con timeout, así un cliente lento sólo se atrasa a sí mismo.
+    
+    Con WS_BATCH_WINDOW_MS > 0 el writer espera esa ventana antes de vaciar la cola y envía los
+    eventos acumulados en un solo mensaje {"type": "batch", "events": [...]}, conservando sólo
+    el último de cada registro (misma clave de coalescencia).
+    
+    Si el desbordamiento descarta un evento, antes del siguiente envío se manda
+    {"type": "resync", "reason": "overflow"} para que el cliente recargue sus datos.
+    """
+
+    def __init__(self, websocket: WebSocket, manager: "WebSocketManager"):
+        self.websocket = websocket
+        self._manager = manager
+        self._cola: Deque[_Mensaje] = deque()
+        self._hay_mensajes = asyncio.Event()
+        self._tarea: Optional[asyncio.Task] = None
+        # Último mensaje recibido del cliente (time.monotonic)
+        self.visto_en = time.monotonic()
+        # Token de administrador válido al conectar: habilita RECURSOS_ADMIN
+        self.es_admin = False
+        # Se descartó algún evento por desbordamiento y el cliente aún no lo sabe
+        self._perdio_eventos = False
+
+    def iniciar(self):
+        self._tarea = asyncio.ensure_future(self._writer())
+
+    def detener(self):
+        if self._tarea is not None and not self._tarea.done():
+            self._tarea.cancel()
+
+    def pendientes(self) -> int:
+        return len(self._cola)
+
+    def encolar(self, mensaje: _Mensaje) -> bool:
+        """Encola aplicando la política de desbordamiento. Retorna False si hay que desconectar."""
+        manager = self._manager
+        if len(self._cola) >= manager._queue_max_size:
+            politica = manager._overflow_policy
+            if politica == OVERFLOW_DISCONNECT:
+                manager._metricas.incrementar("disconnected_overflow")
+                return False
+            if politica == OVERFLOW_COALESCE and mensaje.clave is not None:
+                # Reemplaza en su lugar el último pendiente del mismo evento y registro
+                # (el último, para no adelantar el nuevo a otro pendiente de la misma clave)
+                for i in range(len(self._cola) - 1, -1, -1):
+                    if self._cola[i].clave == mensaje.clave:
+                        self._cola[i] = mensaje
+                        manager._metricas.incrementar("coalesced")
+                        return True
+            descartado = self._cola.popleft()
+            if descartado.evento is not None:
+                self._perdio_eventos = True
+            manager._metricas.incrementar("overflow_dropped")
+        self._cola.append(mensaje)
+        self._hay_mensajes.set()
+        return True
+
+    @staticmethod
+    def _grupos(mensajes: List[_Mensaje]) -> List[List[_Mensaje]]:
+        """
+        Agrupa eventos consecutivos; los mensajes de control (hello, pong, respuestas), sin
+        evento, van solos y en su lugar.
+        """
+        grupos: List[List[_Mensaje]] = []
+        eventos: List[_Mensaje] = []
+        for mensaje in mensajes:
+            if mensaje.evento is None:
+                if eventos:
+                    grupos.append(eventos)
+                    eventos = []
+                grupos.append([mensaje])
+            else:
+                eventos.append(mensaje)
+        if eventos:
+            grupos.append(eventos)
+        return grupos
+
+    @staticmethod
+    def _coalescer(eventos: List[_Mensaje]) -> List[_Mensaje]:
+        """Conserva el último evento de cada clave, en su posición (el estado final no cambia)"""
+        ultimos = {m.clave: i for i, m in enumerate(eventos) if m.clave is not None}
+        return [m for i, m in enumerate(eventos) if m.clave is None or ultimos[m.clave] == i]
+
+    async def _enviar(self, grupo: List[_Mensaje]) -> bool:
+        manager = self._manager
+        enviar = self._coalescer(grupo) if len(grupo) > 1 else grupo
+        if len(enviar) == 1:
+            texto = enviar[0].texto
+        else:
+            # Los eventos ya están serializados: el lote se arma concatenando
+            texto = '{"type":"batch","events":[' + ",".join(m.texto for m in enviar) + "]}"
+            manager._metricas.incrementar("batches")
+            manager._metricas.incrementar("batched_events", len(enviar))
+        if len(enviar) < len(grupo):
+            manager._metricas.incrementar("batch_coalesced", len(grupo) - len(enviar))
+        ok = await manager._send(self.websocket, texto)
+        ahora = time.perf_counter()
+        for mensaje in enviar:
+            manager._metricas.registrar_entrega(mensaje.evento, ahora - mensaje.encolado_en, ok)
+        return ok
+
+    async def _writer(self):
+        manager = self._manager
+        try:
+            while True:
+                await self._hay_mensajes.wait()
+                if manager._batch_window > 0:
+                    await asyncio.sleep(manager._batch_window)
+                while self._cola:
+                    pendientes = list(self._cola)
+                    self._cola.clear()
+                    if self._perdio_eventos:
+                        # Va primero: lo que el cliente recargue ya incluye lo descartado
+                        self._perdio_eventos = False
+                        pendientes.insert(0, _Mensaje(None, None, dumps({"type": "resync", "reason": "overflow"})))
+                    grupos = self._grupos(pendientes) if manager._batch_window > 0 else [[m] for m in pendientes]
+                    for grupo in grupos:
+                        if not await self._enviar(grupo):
+                            manager._metricas.incrementar("disconnected_slow")
+                            manager._drop(self.websocket)
+                            return
+                self._hay_mensajes.clear()
+        except asyncio.CancelledError:
+            pass
+
+
 class WebSocketManager:
     """
     Gestiona conexiones WebSocket y broadcasting de eventos en tiempo real.
+    
+    Cada conexión tiene una cola de salida acotada (WS_QUEUE_MAX_SIZE) vaciada por su propia
+    tarea writer: publicar un evento sólo serializa y encola, sin esperar a ningún socket.
+    
+    Los eventos se publican en un backplane (WS_BACKPLANE) y cada worker entrega a sus propios
+    sockets lo que recibe de él, así con varios workers todos los clientes reciben todo.
+    
+    Un cliente de /ws/updates puede enviar suscripciones con filtros (subscribe()): desde ese
+    momento deja el canal 'all' y sólo recibe los eventos de los recursos suscritos que
+    coinciden con sus filtros.
     """
     
-    def __init__(self):
+    def __init__(self, backplane: Optional[EventBackplaneInterface] = None):
         # Almacena conexiones activas: {resource_type: {connection_id: WebSocket}}
         self.active_connections: Dict[str, Set[WebSocket]] = {
             "atenciones": set(),
             "pacientes": set(),
+            "locks": set(),
             "all": set()  # Usuarios suscritos a todos los eventos
         }
+        # Cola y writer de cada WebSocket
+        self._conexiones: Dict[WebSocket, _Conexion] = {}
+        # Event loop de la aplicación, para publicar eventos desde hilos de trabajo
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Tiempo máximo de envío a un cliente antes de considerarlo lento y desconectarlo
+        self._send_timeout = settings.WS_SEND_TIMEOUT_SECONDS
+        self._queue_max_size = settings.WS_QUEUE_MAX_SIZE
+        if settings.WS_OVERFLOW_POLICY not in OVERFLOW_POLICIES:
+            raise ValueError(f"WS_OVERFLOW_POLICY desconocida: {settings.WS_OVERFLOW_POLICY} (use {', '.join(OVERFLOW_POLICIES)})")
+        self._overflow_policy = settings.WS_OVERFLOW_POLICY
+        # Ventana (s) durante la que cada writer acumula eventos para enviarlos en un lote
+        self._batch_window = max(settings.WS_BATCH_WINDOW_MS, 0) / 1000
+        self._metricas = _MetricasFanout()
+        self._backplane = backplane or crear_backplane()
+        self._backplane_iniciado = False
+        # Últimos eventos entregados (seq, resource, json) para reenviar tras una reconexión
+        self._replay: Deque[Tuple[int, str, str]] = deque(maxlen=settings.WS_REPLAY_BUFFER_SIZE)
+        self._ultimo_seq = 0
+        # Suscripciones filtradas por recurso y conexiones que ya no reciben todo
+        self._suscripciones: Dict[str, _IndiceSuscripciones] = {}
+        self._filtradas: Set[WebSocket] = set()
+        # Heartbeat: ping periódico a cada cliente y desalojo de los que no responden
+        self._heartbeat_interval = settings.WS_HEARTBEAT_INTERVAL_SECONDS
+        self._heartbeat_timeout = settings.WS_HEARTBEAT_TIMEOUT_SECONDS
+        self._tarea_heartbeat: Optional[asyncio.Task] = None
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """
+        Registra el event loop de la aplicación (se invoca en el lifespan de FastAPI).
+        """
+        self._loop = loop
+    
+    async def start(self):
+        """Se suscribe al backplane (se invoca en el lifespan de FastAPI)."""
+        await self._backplane.start(self._recibir)
+        self._backplane_iniciado = True
+        logger.info(f"Backplane de eventos WebSocket iniciado: {type(self._backplane).__name__}")
+        if self._heartbeat_interval > 0 and self._tarea_heartbeat is None:
+            self._tarea_heartbeat = asyncio.ensure_future(self._heartbeat())
     
-    async def connect(self, websocket: WebSocket, resource_type: str = "all"):
+    async def stop(self):
+        if self._tarea_heartbeat is not None:
+            self._tarea_heartbeat.cancel()
+            self._tarea_heartbeat = None
+        self._backplane_iniciado = False
+        await self._backplane.stop()
+    
+    def registrar_actividad(self, websocket: WebSocket):
+        """Marca la conexión como viva; se invoca con cada mensaje recibido del cliente."""
+        conexion = self._conexiones.get(websocket)
+        if conexion is not None:
+            conexion.visto_en = time.monotonic()
+    
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            try:
+                self.revisar_conexiones()
+            except Exception as e:
+                logger.error(f"Error en el heartbeat WebSocket: {e}")
+    
+    def revisar_conexiones(self) -> int:
+        """
+        Desaloja las conexiones sin mensajes del cliente en WS_HEARTBEAT_TIMEOUT_SECONDS
+        (conexiones medio abiertas que ningún envío detectó) y envía {"type": "ping"} a las
+        demás; el cliente responde 'pong'. Retorna cuántas se desalojaron.
+        """
+        ahora = time.monotonic()
+        ping = dumps({"type": "ping"})
+        desalojadas = 0
+        for websocket, conexion in list(self._conexiones.items()):
+            if ahora - conexion.visto_en > self._heartbeat_timeout:
+                logger.info(f"Cliente WebSocket inactivo por {ahora - conexion.visto_en:.0f}s: se desaloja")
+                self._metricas.incrementar("evicted_idle")
+                self._drop(websocket, code=1001)
+                desalojadas += 1
+            elif conexion.encolar(_Mensaje(None, None, ping)):
+                self._metricas.incrementar("heartbeats_sent")
+            else:
+                self._drop(websocket)
+        return desalojadas
+    
+    async def _recibir(self, message_json: str):
+        """Entrega localmente un mensaje recibido del backplane."""
+        message = loads(message_json)
+        self._entregar(message, message_json)
+    
+    async def _secuencia_actual(self) -> int:
+        try:
+            return max(await self._backplane.current_sequence(), self._ultimo_seq)
+        except Exception as e:
+            logger.warning(f"No se pudo consultar la secuencia del backplane: {e}")
+            return self._ultimo_seq
+
+    def _eventos_desde(
+        self, since: int, stream: Optional[str], actual: int, resource_type: str, es_admin: bool = False
+    ) -> Optional[List[str]]:
+        """
+        Eventos con seq > since del canal pedido, en orden. None si no se pueden reconstruir
+        (otra secuencia, buffer desbordado, huecos en el buffer o más eventos de los que caben
+        en la cola).
+        
+        Los seq posteriores al último del buffer y hasta `actual` se consideran en camino: llegan
+        por el backplane después del hello y se entregan como cualquier evento nuevo.
         """
-        Acepta una nueva conexión WebSocket y la registra.
+        if stream != self._backplane.stream_id or since > actual:
+            return None
+        if since >= actual:
+            return []
+        if not self._replay:
+            return None
+        # Deben estar todos los seq desde since + 1: un hueco es un evento que este proceso no
+        # recibió (p. ej. mientras se restablecía la suscripción al backplane)
+        seqs = sorted({seq for seq, _, _ in self._replay if seq > since})
+        if seqs and (seqs[0] != since + 1 or seqs[-1] - seqs[0] + 1 != len(seqs)):
+            return None
+        eventos = sorted(
+            (seq, texto) for seq, recurso, texto in self._replay
+            if seq > since and (resource_type == "all" or recurso == resource_type)
+            and (es_admin or recurso not in RECURSOS_ADMIN)
+        )
+        if len(eventos) >= self._queue_max_size:
+            return None
+        return [texto for _, texto in eventos]
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        resource_type: str = "all",
+        since: Optional[int] = None,
+        stream: Optional[str] = None,
+        es_admin: bool = False
+    ):
+        """
+        Acepta una nueva conexión WebSocket, la registra e inicia su writer.
+        
+        El primer mensaje es {"type": "hello", "stream", "last_seq", "resync", "replayed"}.
+        Si el cliente se reconecta con since/stream (último seq recibido y su stream), se le
+        reenvían sólo los eventos perdidos (resync="ok") o se le indica que recargue todo
+        (resync="required") cuando ya no están en el buffer.
+        
+        Los eventos de RECURSOS_ADMIN sólo llegan a conexiones con es_admin.
         """
         await websocket.accept()
+        actual = await self._secuencia_actual()
         
+        # Desde aquí no hay awaits: el reenvío queda encolado antes que cualquier evento nuevo
         if resource_type not in self.active_connections:
             self.active_connections[resource_type] = set()
         
+        conexion = self._conexiones.get(websocket)
+        if conexion is None:
+            conexion = _Conexion(websocket, self)
+            self._conexiones[websocket] = conexion
+            conexion.iniciar()
+        conexion.es_admin = conexion.es_admin or es_admin
+        
+        resync, reenviar = None, []
+        if since is not None:
+            eventos = self._eventos_desde(since, stream, actual, resource_type, conexion.es_admin)
+            resync, reenviar = ("ok", eventos) if eventos is not None else ("required", [])
+        hello = {
+            "type": "hello",
+            "stream": self._backplane.stream_id,
+            "last_seq": actual,
+            "resync": resync,
+            "replayed": len(reenviar),
+        }
+        conexion.encolar(_Mensaje(None, None, dumps(hello)))
+        for texto in reenviar:
+            conexion.encolar(_Mensaje(None, "replay", texto))
         self.active_connections[resource_type].add(websocket)
         logger.info(f"Nueva conexión WebSocket para {resource_type}. Total: {len(self.active_connections[resource_type])}")
     
@@ -51,59 +567,224 @@ class WebSocketManager:
         if resource_type in self.active_connections:
             self.active_connections[resource_type].discard(websocket)
             logger.info(f"Conexión WebSocket cerrada para {resource_type}. Total: {len(self.active_connections[resource_type])}")
+        if resource_type == "all":
+            self._quitar_suscripciones(websocket)
+        if not any(websocket in conns for conns in self.active_connections.values()):
+            conexion = self._conexiones.pop(websocket, None)
+            if conexion is not None:
+                conexion.detener()
     
-    async def broadcast(self, message: dict, resource_type: str):
-        """
-        Envía un mensaje a todos los clientes conectados a un tipo de recurso.
+    def subscribe(self, websocket: WebSocket, resource_type: str, filtros: Dict[str, Any]) -> Dict[str, List[str]]:
         """
-        message_json = json.dumps(message, default=json_serializer)
+        Suscribe una conexión de /ws/updates a un recurso con filtros opcionales por
+        FILTER_DIMENSIONS (un valor o una lista de valores; sin valor = no filtra). Reemplaza
+        la suscripción anterior al mismo recurso. Retorna los filtros normalizados.
         
-        # Enviar a conexiones específicas del recurso
-        connections_to_remove = set()
-        
-        total_sent = 0
-        if resource_type in self.active_connections:
-            for connection in self.active_connections[resource_type]:
-                try:
-                    await connection.send_text(message_json)
-                    total_sent += 1
-                except Exception as e:
-                    logger.error(f"Error enviando mensaje por WebSocket: {e}")
-                    connections_to_remove.add(connection)
+        Raises:
+            ValueError: Recurso vacío o dimensión desconocida
+        """
+        if not resource_type or not isinstance(resource_type, str) or resource_type == "all":
+            raise ValueError("Se requiere el recurso a suscribir")
+        desconocidas = set(filtros) - set(FILTER_DIMENSIONS)
+        if desconocidas:
+            raise ValueError(
+                f"Filtros desconocidos: {', '.join(sorted(desconocidas))} (use {', '.join(FILTER_DIMENSIONS)})"
+            )
+        normalizados: Dict[str, Set[str]] = {}
+        for dimension, valor in filtros.items():
+            valores = valor if isinstance(valor, (list, tuple, set)) else [valor]
+            valores = {_normalizar_valor(dimension, v) for v in valores if v is not None and v != ""}
+            if valores:
+                normalizados[dimension] = valores
         
-        # También enviar a conexiones "all"
-        if "all" in self.active_connections:
-            for connection in self.active_connections["all"]:
-                try:
-                    await connection.send_text(message_json)
-                    total_sent += 1
-                except Exception as e:
-                    logger.error(f"Error enviando mensaje por WebSocket: {e}")
-                    connections_to_remove.add(connection)
+        self.active_connections["all"].discard(websocket)
+        self._filtradas.add(websocket)
+        self._suscripciones.setdefault(resource_type, _IndiceSuscripciones()).agregar(websocket, normalizados)
+        logger.info(f"Suscripción WebSocket a {resource_type} con filtros {normalizados or 'ninguno'}")
+        return {dimension: sorted(valores) for dimension, valores in normalizados.items()}
+    
+    def unsubscribe(self, websocket: WebSocket, resource_type: str):
+        """Cancela la suscripción de la conexión a un recurso (sigue sin recibir 'all')."""
+        indice = self._suscripciones.get(resource_type)
+        if indice is not None:
+            indice.quitar(websocket)
+    
+    def _quitar_suscripciones(self, websocket: WebSocket):
+        self._filtradas.discard(websocket)
+        for indice in self._suscripciones.values():
+            indice.quitar(websocket)
+    
+    async def reply(self, websocket: WebSocket, text: str):
+        """
+        Respuesta directa a un cliente (p. ej. 'pong'). Pasa por su cola para no escribir en
+        el socket a la vez que el writer.
+        """
+        conexion = self._conexiones.get(websocket)
+        if conexion is None:
+            return
+        if not conexion.encolar(_Mensaje(None, None, text)):
+            self._drop(websocket)
+    
+    async def _send(self, connection: WebSocket, message_json: str) -> bool:
+        """Envía a una conexión con timeout. Retorna False si falló o fue demasiado lenta."""
+        try:
+            await asyncio.wait_for(connection.send_text(message_json), timeout=self._send_timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"Cliente WebSocket lento (>{self._send_timeout}s): se desconecta")
+            return False
+        except Exception as e:
+            logger.error(f"Error enviando mensaje por WebSocket: {e}")
+            return False
+
+    def _drop(self, connection: WebSocket, code: int = 1008):
+        """Quita la conexión de todos los canales, detiene su writer y la cierra en segundo plano."""
+        for conn_type in self.active_connections:
+            self.active_connections[conn_type].discard(connection)
+        self._quitar_suscripciones(connection)
+        conexion = self._conexiones.pop(connection, None)
+        if conexion is not None:
+            conexion.detener()
+        asyncio.ensure_future(self._close_quietly(connection, code))
+
+    async def _close_quietly(self, connection: WebSocket, code: int = 1008):
+        try:
+            await asyncio.wait_for(connection.close(code=code), timeout=self._send_timeout)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _clave_coalescencia(message: dict) -> Optional[tuple]:
+        """(evento, recurso, namespace, id) para reemplazar actualizaciones pendientes del mismo registro"""
+        data = message.get("data")
+        if not isinstance(data, dict):
+            return None
+        item_id = data.get("id", data.get("id_atencion"))
+        if item_id is None:
+            return None
+        return (message.get("event"), message.get("resource"), data.get("namespace"), str(item_id))
+
+    async def broadcast(self, message: dict, resource_type: str):
+        """
+        Encola un mensaje para los clientes de este proceso conectados a un tipo de recurso
+        (y a 'all'). Para llegar a los demás workers usar send_event().
+        """
+        message = dict(message, resource=resource_type)
+        self._entregar(message, dumps(message))
+    
+    def _entregar(self, message: dict, message_json: str):
+        """
+        Encola el mensaje ya serializado en cada destinatario local. No espera a ningún socket:
+        cada writer envía por su cuenta, con timeout, y un cliente lento sólo afecta a su cola.
+        """
+        inicio = time.perf_counter()
+        resource_type = message.get("resource")
+        clave = self._clave_coalescencia(message)
+        seq = message.get("seq")
+        if seq is not None:
+            self._replay.append((seq, resource_type, message_json))
+            self._ultimo_seq = max(self._ultimo_seq, seq)
         
-        logger.info(f"Broadcast enviado a {total_sent} clientes ({resource_type}): {message.get('event')} - {message.get('resource')}")
+        # Destinatarios sin duplicados (una conexión puede estar en ambos canales)
+        destinatarios = self.active_connections.get(resource_type, set()) | self.active_connections.get("all", set())
+        indice = self._suscripciones.get(resource_type)
+        if indice is not None:
+            destinatarios |= indice.destinatarios(message.get("data"))
+            if message.get("previous"):
+                # Quienes tenían el registro antes del cambio deben enterarse de que salió del filtro
+                destinatarios |= indice.destinatarios(message["previous"])
+        solo_admin = resource_type in RECURSOS_ADMIN
+        for connection in destinatarios:
+            conexion = self._conexiones.get(connection)
+            if conexion is None or (solo_admin and not conexion.es_admin):
+                continue
+            if not conexion.encolar(_Mensaje(clave, message.get('event'), message_json)):
+                logger.warning("Cola WebSocket llena: se desconecta al cliente")
+                self._drop(connection)
         
-        # Limpiar conexiones rotas
-        for connection in connections_to_remove:
-            for conn_type in self.active_connections:
-                self.active_connections[conn_type].discard(connection)
+        duracion = time.perf_counter() - inicio
+        self._metricas.registrar_broadcast(message.get('event'), duracion, len(destinatarios))
+        logger.info(
+            f"Broadcast encolado para {len(destinatarios)} clientes ({resource_type}) en {duracion * 1000:.2f} ms: "
+            f"{message.get('event')} - {message.get('resource')}"
+        )
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Conexiones por canal, colas pendientes y latencias de fan-out por tipo de evento."""
+        pendientes = [c.pendientes() for c in self._conexiones.values()]
+        ahora = time.monotonic()
+        return {
+            "connections_total": len(self._conexiones),
+            "connections": {canal: len(conns) for canal, conns in self.active_connections.items()},
+            "heartbeat_interval_seconds": self._heartbeat_interval,
+            "heartbeat_timeout_seconds": self._heartbeat_timeout,
+            "idle_seconds_max": round(max((ahora - c.visto_en for c in self._conexiones.values()), default=0), 3),
+            "filtered_connections": len(self._filtradas),
+            "subscriptions": {recurso: len(indice.filtros) for recurso, indice in self._suscripciones.items()},
+            "send_timeout_seconds": self._send_timeout,
+            "queue_max_size": self._queue_max_size,
+            "overflow_policy": self._overflow_policy,
+            "batch_window_ms": self._batch_window * 1000,
+            "queued_total": sum(pendientes),
+            "queued_max": max(pendientes, default=0),
+            "stream": self._backplane.stream_id,
+            "last_seq": self._ultimo_seq,
+            "replay_buffered": len(self._replay),
+            "replay_oldest_seq": self._replay[0][0] if self._replay else None,
+            **self._metricas.snapshot(),
+        }
     
-    async def send_event(self, event_type: str, resource_type: str, data: dict):
+    async def send_event(
+        self,
+        event_type: str,
+        resource_type: str,
+        data: Union[dict, BaseModel],
+        previous: Optional[dict] = None
+    ):
         """
         Envía un evento específico (create, update, delete) a los clientes.
         
         Args:
-            event_type: 'create', 'update', 'delete'
+            event_type: 'create', 'update', 'delete' o 'bulk_created' (data = {"ids": [...]})
             resource_type: 'atenciones', 'pacientes', etc.
-            data: Datos del recurso afectado
+            data: Datos del recurso afectado. Un DTO se pasa tal cual: se convierte a tipos de
+                Python sin pasar por JSON y el mensaje completo se codifica una sola vez.
+            previous: En un update, los valores de FILTER_DIMENSIONS antes del cambio. El evento
+                llega también a las suscripciones que coincidían con ellos, para que quiten el
+                registro que salió de su filtro.
         """
         logger.info(f"Enviando evento WebSocket: {event_type} - {resource_type}")
+        if isinstance(data, BaseModel):
+            data = data.model_dump()
         message = {
             "event": event_type,
             "resource": resource_type,
             "data": data
         }
-        await self.broadcast(message, resource_type)
+        if previous:
+            message["previous"] = previous
+        # El backplane agrega 'seq' al publicar: numerar y publicar es un solo paso
+        message_json = dumps(message)
+        if not self._backplane_iniciado:
+            self._entregar(message, message_json)
+            return
+        try:
+            await self._backplane.publish(message_json)
+        except Exception as e:
+            # Sin backplane al menos los clientes de este worker reciben el evento (sin número,
+            # así que no se podrá reenviar)
+            logger.error(f"No se pudo publicar en el backplane ({e}); se entrega sólo localmente")
+            self._entregar(message, message_json)
+
+    def send_event_threadsafe(self, event_type: str, resource_type: str, data: dict):
+        """
+        Programa el envío de un evento desde un hilo que no es el del event loop
+        (jobs en segundo plano, scheduler). No espera a que el envío termine.
+        """
+        if self._loop is None or self._loop.is_closed():
+            logger.debug(f"Evento WebSocket descartado (sin event loop): {event_type} - {resource_type}")
+            return
+        asyncio.run_coroutine_threadsafe(self.send_event(event_type, resource_type, data), self._loop)
 
 
 # Singleton
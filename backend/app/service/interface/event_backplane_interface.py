@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+
+# Recibe el mensaje ya serializado (JSON) tal como se publicó
+ManejadorMensaje = Callable[[str], Awaitable[None]]
+
+
+class EventBackplaneInterface(ABC):
+    """
+    Bus pub/sub entre procesos para los eventos WebSocket. Cada worker publica en el bus y
+    entrega a sus propios sockets lo que recibe del bus, incluidos sus propios mensajes.
+    """
+
+    @abstractmethod
+    async def start(self, on_message: ManejadorMensaje) -> None:
+        """Empieza a recibir mensajes del bus y entregarlos a on_message."""
+
+    @property
+    @abstractmethod
+    def stream_id(self) -> str:
+        """Identifica la secuencia de eventos: cambia si la numeración se reinicia."""
+
+    @abstractmethod
+    async def current_sequence(self) -> int:
+        """Último número de evento asignado."""
+
+    @abstractmethod
+    async def publish(self, message_json: str) -> int:
+        """
+        Numera y publica un mensaje (objeto JSON sin 'seq') para todos los workers suscritos, en
+        un solo paso: el número, creciente y único entre workers, se inserta como primer campo
+        y los mensajes se entregan en el orden de su número. Retorna el número asignado.
+        """
+
+    @abstractmethod
+    async def stop(self) -> None:
+        """Cancela la suscripción y libera las conexiones."""
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+
+class LockBackendInterface(ABC):
+    """
+    Almacenamiento de bloqueos de edición con vencimiento (TTL).
+    acquire y refresh deben ser atómicos frente a otros workers que usen el mismo backend.
+    """
+
+    @abstractmethod
+    def acquire(self, resource_id: str, locker: Dict[str, Any], ttl_seconds: int) -> Dict[str, Any]:
+        """Retorna {'ok': bool, 'lockedBy': dict} con el dueño vigente del bloqueo."""
+
+    @abstractmethod
+    def refresh(self, resource_id: str, locker_id: Any, ttl_seconds: int) -> bool:
+        """Extiende el bloqueo si sigue vigente y pertenece a locker_id."""
+
+    @abstractmethod
+    def release(self, resource_id: str, locker_id: Optional[Any] = None) -> Dict[str, bool]:
+        """
+        Retorna {'ok': bool, 'released': bool}: ok es False sólo si el bloqueo vigente pertenece
+        a otro usuario; released indica si realmente se eliminó un bloqueo.
+        """
+
+    @abstractmethod
+    def status(self, resource_id: str) -> Dict[str, Any]:
+        """Retorna {'locked': False} o {'locked': True, 'lockedBy': dict, 'lockedAt': epoch}."""
+
+    @abstractmethod
+    def list_locks(self, prefix: str) -> List[Dict[str, Any]]:
+        """Bloqueos vigentes cuya clave empieza por prefix: [{'resource_id', 'lockedBy', 'lockedAt'}]."""
+
+    @abstractmethod
+    def purge_expired(self) -> List[str]:
+        """Elimina los bloqueos vencidos y retorna sus claves."""
@@ -28,4 +28,7 @@ echo "MySQL está listo. Ejecutando migraciones de Alembic..."
 alembic upgrade head
 
 echo "Migraciones completadas. Iniciando aplicación..."
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+# permessage-deflate ya viene activo por defecto en uvicorn; se expone WS_PER_MESSAGE_DEFLATE
+# sólo para poder apagarlo (p. ej. si un proxy intermedio no lo soporta)
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000 \
+  --ws-per-message-deflate "${WS_PER_MESSAGE_DEFLATE:-true}"
@@ -0,0 +1,263 @@
+"""
+Benchmark del listado de atenciones: compara estrategias de carga a distintos volúmenes.
+
+Siembra atenciones sintéticas (IDs con prefijo BENCH-) hasta cada tamaño pedido y mide, para
+una página al inicio y otra profunda del listado, el tiempo, las consultas SQL emitidas y las
+filas que MySQL devuelve al driver. Al terminar elimina los datos sembrados (salvo --conservar).
+
+Ejecutar contra una BD de desarrollo, desde el contenedor del backend:
+
+    python scripts/benchmark_atenciones_listado.py --tamanos 10000 100000 1000000
+
+Para medir el costo de armar listados grandes (hidratación ORM frente a proyección), usar
+páginas grandes, p. ej. --limit 100000.
+"""
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.configuration.app.database import SessionLocal, engine
+from app.persistence.entity.atenciones_entity import Atencion
+from app.persistence.entity.atenciones_servicios_entity import AtencionServicio
+from app.persistence.entity.empresas_entity import Empresa
+from app.persistence.entity.estados_atenciones_entity import EstadoAtencion
+from app.persistence.entity.pacientes_entity import Paciente
+from app.persistence.entity.servicios_entity import Servicio
+from app.persistence.entity.tipos_documentos_entity import TipoDocumento
+from app.persistence.repository import atencion_repository
+from app.persistence.repository.bulk_helpers import BULK_CHUNK_SIZE, chunked, insert_ignore_duplicates
+from app.presentation.dto.atencion_paciente_dto import AtencionListResponseDto, ServicioAtencionDto
+from app.service.implementation.atencion_service import AtencionService
+from app.service.implementation.catalog_cache import (
+    get_catalog_cache,
+    EMPRESAS,
+    ESTADOS,
+    SEGUIMIENTOS,
+    SERVICIOS
+)
+
+PREFIJO = "BENCH-"
+ATENCIONES_POR_PACIENTE = 5
+SERVICIOS_POR_ATENCION = 2
+
+
+class ContadorSql:
+    """Cuenta sentencias y filas devueltas por el driver mientras está activo."""
+
+    def __init__(self):
+        self.consultas = 0
+        self.filas = 0
+
+    def _despues_de_ejecutar(self, conn, cursor, statement, parameters, context, executemany):
+        self.consultas += 1
+        # mysqlclient almacena el resultado completo: rowcount es el número de filas del SELECT
+        if cursor.description is not None and cursor.rowcount and cursor.rowcount > 0:
+            self.filas += cursor.rowcount
+
+    def __enter__(self):
+        event.listen(engine, "after_cursor_execute", self._despues_de_ejecutar)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "after_cursor_execute", self._despues_de_ejecutar)
+
+
+# ==================== ESTRATEGIAS ====================
+
+def _entidad_a_dto(atencion: Atencion) -> AtencionListResponseDto:
+    """Mapeo de las estrategias ORM: entidad Atencion hidratada -> DTO de listado."""
+    catalogos = get_catalog_cache()
+    empresa = catalogos.get(EMPRESAS, atencion.id_empresa) or {}
+    return AtencionListResponseDto(
+        id_atencion=atencion.id,
+        fecha_atencion=atencion.fecha_ingreso,
+        observacion=atencion.observacion,
+        id_paciente=atencion.id_paciente,
+        nombre_paciente=AtencionService._build_nombre_paciente(atencion.paciente),
+        telefono_uno=atencion.paciente.telefono_uno,
+        telefono_dos=atencion.paciente.telefono_dos,
+        email=atencion.paciente.email,
+        id_empresa=atencion.id_empresa,
+        nombre_empresa=empresa.get("nombre", ""),
+        tipo_empresa_nombre=empresa.get("tipo_empresa_nombre"),
+        id_estado_atencion=atencion.id_estado_atencion,
+        nombre_estado_atencion=catalogos.nombre(ESTADOS, atencion.id_estado_atencion) or "",
+        id_seguimiento_atencion=atencion.id_seguimiento_atencion,
+        nombre_seguimiento_atencion=catalogos.nombre(SEGUIMIENTOS, atencion.id_seguimiento_atencion),
+        servicios=[
+            ServicioAtencionDto(
+                id_servicio=rel.id_servicio,
+                nombre_servicio=catalogos.nombre(SERVICIOS, rel.id_servicio) or ""
+            )
+            for rel in atencion.servicios_rel
+        ],
+        fecha_modificacion=atencion.fecha_modificacion,
+        nombre_usuario_modificacion=atencion.usuario.username if atencion.usuario else None
+    )
+
+
+def _listado_joinedload(db: Session, skip: int, limit: int) -> list:
+    """Estrategia anterior: seis joinedload encadenados con OFFSET/LIMIT sobre el JOIN."""
+    atenciones = db.query(Atencion)\
+        .options(
+            joinedload(Atencion.paciente),
+            joinedload(Atencion.empresa),
+            joinedload(Atencion.estado_atencion),
+            joinedload(Atencion.seguimiento_atencion),
+            joinedload(Atencion.usuario),
+            joinedload(Atencion.servicios_rel).joinedload(AtencionServicio.servicio)
+        )\
+        .order_by(Atencion.fecha_ingreso.desc())\
+        .offset(skip).limit(limit).all()
+    return [_entidad_a_dto(a) for a in atenciones]
+
+
+def _listado_ids_selectin(db: Session, skip: int, limit: int) -> list:
+    """Página de IDs primero y entidades ORM hidratadas con selectinload."""
+    atencion_ids = atencion_repository.get_atencion_ids(db, skip=skip, limit=limit)
+    por_id = {}
+    for chunk in chunked(atencion_ids):
+        consulta = db.query(Atencion)\
+            .options(
+                selectinload(Atencion.paciente),
+                selectinload(Atencion.usuario),
+                selectinload(Atencion.servicios_rel)
+            )\
+            .filter(Atencion.id.in_(chunk))
+        for atencion in consulta:
+            por_id[atencion.id] = atencion
+    return [_entidad_a_dto(por_id[i]) for i in atencion_ids if i in por_id]
+
+
+def _listado_proyeccion(db: Session, skip: int, limit: int) -> list:
+    """Estrategia actual: página de IDs y proyección de Core mapeada directo a DTOs."""
+    return AtencionService.get_all_atenciones(db, skip=skip, limit=limit)
+
+
+ESTRATEGIAS: Dict[str, Callable[[Session, int, int], list]] = {
+    "joinedload": _listado_joinedload,
+    "ids+selectinload": _listado_ids_selectin,
+    "proyeccion": _listado_proyeccion,
+}
+
+
+# ==================== DATOS SINTÉTICOS ====================
+
+def _contar_sembradas(db: Session) -> int:
+    return db.query(func.count(Atencion.id)).filter(Atencion.id.like(f"{PREFIJO}%")).scalar()
+
+
+def sembrar(db: Session, total: int) -> None:
+    """Inserta atenciones sintéticas hasta llegar a `total` (las existentes se conservan)."""
+    existentes = _contar_sembradas(db)
+    if existentes >= total:
+        return
+
+    tipo_documento = db.query(TipoDocumento.id).first()
+    empresa = db.query(Empresa.id).first()
+    estado = db.query(EstadoAtencion.id).first()
+    servicios = [row.id for row in db.query(Servicio.id).limit(SERVICIOS_POR_ATENCION)]
+    if not (tipo_documento and empresa and estado and servicios):
+        raise SystemExit("Se requieren catálogos sembrados (tipos de documento, empresas, estados, servicios)")
+
+    ahora = datetime.now()
+    print(f"Sembrando atenciones {existentes} -> {total}...")
+    for inicio in range(existentes, total, BULK_CHUNK_SIZE):
+        fin = min(inicio + BULK_CHUNK_SIZE, total)
+        pacientes, atenciones, relaciones = [], [], []
+        for n in range(inicio, fin):
+            id_paciente = f"{PREFIJO}P{n // ATENCIONES_POR_PACIENTE}"
+            id_atencion = f"{PREFIJO}A{n:08d}"
+            if n % ATENCIONES_POR_PACIENTE == 0:
+                pacientes.append({
+                    "id": id_paciente,
+                    "id_tipo_documento": tipo_documento.id,
+                    "primer_nombre": "BENCH",
+                    "primer_apellido": f"PACIENTE {n}",
+                })
+            atenciones.append({
+                "id": id_atencion,
+                "id_paciente": id_paciente,
+                "id_empresa": empresa.id,
+                "id_estado_atencion": estado.id,
+                "fecha_ingreso": ahora - timedelta(minutes=n),
+                "observacion": "",
+            })
+            relaciones.extend({"id_atencion": id_atencion, "id_servicio": s} for s in servicios)
+        insert_ignore_duplicates(db, Paciente.__table__, pacientes)
+        insert_ignore_duplicates(db, Atencion.__table__, atenciones)
+        db.execute(AtencionServicio.__table__.insert(), relaciones)
+        db.commit()
+
+
+def limpiar(db: Session) -> None:
+    """Elimina todo lo sembrado por el benchmark."""
+    patron = f"{PREFIJO}%"
+    db.query(AtencionServicio).filter(AtencionServicio.id_atencion.like(patron)).delete(synchronize_session=False)
+    db.query(Atencion).filter(Atencion.id.like(patron)).delete(synchronize_session=False)
+    db.query(Paciente).filter(Paciente.id.like(patron)).delete(synchronize_session=False)
+    db.commit()
+
+
+# ==================== MEDICIÓN ====================
+
+def medir(estrategia: Callable[[Session, int, int], list], skip: int, limit: int, repeticiones: int) -> dict:
+    """Mejor tiempo de `repeticiones` ejecuciones, cada una con sesión nueva (sin identity map previo)."""
+    mejor = None
+    for _ in range(repeticiones):
+        db = SessionLocal()
+        try:
+            with ContadorSql() as contador:
+                inicio = time.perf_counter()
+                resultado = estrategia(db, skip, limit)
+                duracion = time.perf_counter() - inicio
+        finally:
+            db.close()
+        if mejor is None or duracion < mejor["segundos"]:
+            mejor = {
+                "segundos": duracion,
+                "consultas": contador.consultas,
+                "filas_sql": contador.filas,
+                "items": len(resultado),
+            }
+    return mejor
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=500, help="Tamaño de página")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--estrategias", nargs="+", choices=list(ESTRATEGIAS), default=list(ESTRATEGIAS))
+    parser.add_argument("--conservar", action="store_true", help="No eliminar los datos sembrados al terminar")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        print(f"{'atenciones':>10} {'página':>8} {'estrategia':>18} {'ms':>10} {'consultas':>9} {'filas SQL':>10} {'items':>6}")
+        for tamano in sorted(args.tamanos):
+            sembrar(db, tamano)
+            for nombre_pagina, skip in (("inicio", 0), ("profunda", max(tamano - args.limit, 0))):
+                for nombre in args.estrategias:
+                    r = medir(ESTRATEGIAS[nombre], skip, args.limit, args.repeticiones)
+                    print(
+                        f"{tamano:>10} {nombre_pagina:>8} {nombre:>18} {r['segundos'] * 1000:>10.1f} "
+                        f"{r['consultas']:>9} {r['filas_sql']:>10} {r['items']:>6}"
+                    )
+    finally:
+        if not args.conservar:
+            print("Eliminando datos sembrados...")
+            limpiar(db)
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Benchmark de la difusión de eventos WebSocket: serialización, fan-out y tamaño en la red.
+
+No requiere BD ni servidor. Mide con un evento de atención representativo:
+
+1. Codificación por evento: el camino anterior (model_dump(mode='json') + json.dumps) frente al
+   actual (model_dump() + dumps(), con orjson si está instalado).
+2. Fan-out a 1, 100 y 1000 clientes simulados: costo de publicar codificando por destinatario
+   frente a codificar una vez y compartir el texto, y tiempo hasta que los writers entregan todo.
+3. Bytes en la red de un evento y de un lote, sin compresión y con permessage-deflate (deflate
+   crudo con contexto compartido entre mensajes, como lo negocian navegador y servidor).
+
+    python scripts/benchmark_websocket_fanout.py --clientes 1 100 1000 --eventos 200
+"""
+from datetime import datetime, timedelta
+from typing import Callable, List
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.presentation.dto.atencion_paciente_dto import AtencionDetalleResponseDto, ServicioAtencionDto
+from app.service.implementation import websocket_manager
+from app.service.implementation.websocket_manager import WebSocketManager, dumps, json_serializer
+
+
+class SocketSimulado:
+    """WebSocket que descarta lo enviado y cuenta los mensajes."""
+
+    def __init__(self):
+        self.mensajes = 0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, texto: str):
+        self.mensajes += 1
+
+    async def close(self, code: int = 1000):
+        pass
+
+
+def _atencion(n: int) -> AtencionDetalleResponseDto:
+    ahora = datetime.now()
+    return AtencionDetalleResponseDto(
+        id_atencion=f"ADM{1_000_000 + n}",
+        fecha_atencion=ahora - timedelta(minutes=n),
+        observacion="Paciente remitido para control post operatorio",
+        id_paciente=f"{1_000_000_000 + n}",
+        nombre_paciente="MARIA FERNANDA GOMEZ RESTREPO",
+        telefono_uno="3001234567",
+        email="paciente@example.com",
+        id_empresa=3,
+        nombre_empresa="EPS EJEMPLO S.A.S.",
+        tipo_empresa_nombre="EPS",
+        id_estado_atencion=1,
+        nombre_estado_atencion="INGRESADO",
+        id_seguimiento_atencion=8,
+        nombre_seguimiento_atencion="SIN SEGUIMIENTO",
+        servicios=[ServicioAtencionDto(id_servicio=s, nombre_servicio=f"SERVICIO {s}") for s in range(1, 4)],
+        fecha_modificacion=ahora,
+        nombre_usuario_modificacion="admin",
+    )
+
+
+def _mejor_tiempo(funcion: Callable[[], object], repeticiones: int) -> float:
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+# ==================== CODIFICACIÓN ====================
+
+def medir_codificacion(eventos: int, repeticiones: int) -> None:
+    dtos = [_atencion(n) for n in range(eventos)]
+
+    def anterior():
+        for dto in dtos:
+            json.dumps({"event": "update", "resource": "atenciones", "data": dto.model_dump(mode="json")},
+                       default=json_serializer)
+
+    def actual():
+        for dto in dtos:
+            dumps({"event": "update", "resource": "atenciones", "data": dto.model_dump()})
+
+    codificador = "orjson" if websocket_manager.orjson is not None else "json (stdlib)"
+    print(f"\nCodificación de {eventos} eventos (codificador actual: {codificador})")
+    for nombre, funcion in (("model_dump(json)+json.dumps", anterior), ("model_dump()+dumps", actual)):
+        segundos = _mejor_tiempo(funcion, repeticiones)
+        print(f"  {nombre:>28}: {segundos * 1000:>8.2f} ms  ({segundos / eventos * 1e6:>6.1f} µs/evento)")
+
+
+# ==================== FAN-OUT ====================
+
+async def _fanout(clientes: int, eventos: int, por_destinatario: bool) -> dict:
+    manager = WebSocketManager()
+    # Sin ventana de lotes: se mide el costo de cada evento, no la espera de la ventana
+    manager._batch_window = 0
+    manager._queue_max_size = max(manager._queue_max_size, eventos + 1)
+    await manager.start()
+    sockets = [SocketSimulado() for _ in range(clientes)]
+    for socket in sockets:
+        await manager.connect(socket, "atenciones")
+
+    mensajes = [
+        {"event": "update", "resource": "atenciones", "data": _atencion(n).model_dump()}
+        for n in range(eventos)
+    ]
+    inicio = time.perf_counter()
+    for mensaje in mensajes:
+        if por_destinatario:
+            # Camino ingenuo: cada destinatario recibe su propia codificación
+            for socket in sockets:
+                manager._conexiones[socket].encolar(
+                    websocket_manager._Mensaje(None, "update", json.dumps(mensaje, default=json_serializer))
+                )
+        else:
+            manager._entregar(mensaje, dumps(mensaje))
+    publicado = time.perf_counter() - inicio
+    # Cada cliente recibe el hello de la conexión y los eventos
+    esperados = clientes * (eventos + 1)
+    while sum(s.mensajes for s in sockets) < esperados:
+        await asyncio.sleep(0)
+    entregado = time.perf_counter() - inicio
+    await manager.stop()
+    for socket in list(sockets):
+        manager.disconnect(socket, "atenciones")
+    return {
+        "publicar_ms": publicado * 1000,
+        "entregar_ms": entregado * 1000,
+        "mensajes": sum(s.mensajes for s in sockets),
+    }
+
+
+def medir_fanout(clientes: List[int], eventos: int) -> None:
+    print(f"\nFan-out de {eventos} eventos")
+    print(f"  {'clientes':>8} {'estrategia':>22} {'publicar ms':>12} {'entregar ms':>12} {'µs/entrega':>11}")
+    for cantidad in clientes:
+        for nombre, por_destinatario in (("codificar por cliente", True), ("codificar una vez", False)):
+            r = asyncio.run(_fanout(cantidad, eventos, por_destinatario))
+            por_entrega = r["entregar_ms"] * 1000 / max(r["mensajes"], 1)
+            print(f"  {cantidad:>8} {nombre:>22} {r['publicar_ms']:>12.1f} {r['entregar_ms']:>12.1f} {por_entrega:>11.2f}")
+
+
+# ==================== TAMAÑO EN LA RED ====================
+
+def _deflate(textos: List[str]) -> int:
+    """Bytes de los mensajes con permessage-deflate (contexto compartido entre mensajes)."""
+    compresor = zlib.compressobj(wbits=-15)
+    total = 0
+    for texto in textos:
+        datos = compresor.compress(texto.encode()) + compresor.flush(zlib.Z_SYNC_FLUSH)
+        total += len(datos) - 4  # el cierre 00 00 ff ff no viaja
+    return total
+
+
+def medir_tamano(eventos: int) -> None:
+    textos = [
+        dumps({"event": "update", "resource": "atenciones", "data": _atencion(n).model_dump(), "seq": n})
+        for n in range(eventos)
+    ]
+    lote = '{"type":"batch","events":[' + ",".join(textos) + "]}"
+    print("\nBytes en la red")
+    print(f"  {'mensaje':>28} {'sin comprimir':>14} {'deflate':>10} {'ratio':>6}")
+    for nombre, mensajes in (
+        ("1 evento", textos[:1]),
+        (f"{eventos} eventos sueltos", textos),
+        (f"1 lote de {eventos} eventos", [lote]),
+    ):
+        crudo = sum(len(t.encode()) for t in mensajes)
+        comprimido = _deflate(mensajes)
+        print(f"  {nombre:>28} {crudo:>14} {comprimido:>10} {crudo / comprimido:>6.1f}")
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clientes", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--eventos", type=int, default=200)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    medir_codificacion(args.eventos, args.repeticiones)
+    medir_fanout(sorted(args.clientes), args.eventos)
+    medir_tamano(min(args.eventos, 50))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Verificación de índices de las consultas calientes de atenciones (regresión basada en EXPLAIN).
+
+Ejecuta las consultas reales del repositorio, captura el SQL que emiten y corre EXPLAIN sobre
+cada una. Falla (código de salida 1) si alguna consulta deja de poder usar el índice esperado
+sobre su tabla principal, p. ej. porque un cambio envolvió la columna en una función
+(DATE(fecha_ingreso) = ...) o reordenó el filtro.
+
+En tablas con pocas filas el optimizador puede preferir un recorrido completo aunque el índice
+sea utilizable; por eso la verificación exige que el índice figure en `possible_keys` y sólo
+exige que se use (`key`) cuando la tabla supera --min-filas.
+
+    python scripts/verificar_indices_atenciones.py
+"""
+from datetime import date, datetime
+from typing import Callable, List, Optional
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.configuration.app.database import SessionLocal, engine
+from app.persistence.repository import atencion_repository, busqueda_repository
+
+
+class Caso:
+    def __init__(self, nombre: str, tabla: str, indice: str, consulta: Callable[[Session], object]):
+        self.nombre = nombre
+        self.tabla = tabla
+        self.indice = indice
+        self.consulta = consulta
+
+
+CASOS: List[Caso] = [
+    Caso("listado por día", "atenciones", "ix_atenciones_fecha_ingreso_id",
+         lambda db: atencion_repository.get_atencion_ids(db, limit=100, fecha=date.today())),
+    Caso("listado por rango", "atenciones", "ix_atenciones_fecha_ingreso_id",
+         lambda db: atencion_repository.get_atencion_ids(
+             db, limit=100, fecha_inicio=date(date.today().year, 1, 1), fecha_fin=date.today())),
+    Caso("página por cursor", "atenciones", "ix_atenciones_fecha_ingreso_id",
+         lambda db: atencion_repository.get_atencion_ids_keyset(
+             db, limit=100, despues_de=(datetime.now(), "T0"), fecha=date.today())),
+    Caso("atenciones por empresa", "atenciones", "ix_atenciones_empresa_fecha",
+         lambda db: atencion_repository.get_atencion_ids_by_empresa(db, 1)),
+    Caso("atenciones por estado", "atenciones", "ix_atenciones_estado_fecha",
+         lambda db: atencion_repository.get_atencion_ids_by_estado(db, 1)),
+    Caso("búsqueda por ID de atención", "atenciones_busqueda_tokens", "PRIMARY",
+         lambda db: busqueda_repository.buscar_atencion_ids(db, "12345")),
+    Caso("proyección del listado", "atenciones", "PRIMARY",
+         lambda db: atencion_repository.get_listado_por_ids(db, ["T1", "T2"])),
+    Caso("tokens de búsqueda", "pacientes_busqueda_tokens", "PRIMARY",
+         lambda db: busqueda_repository.buscar_paciente_ids(db, "ana")),
+]
+
+
+def _capturar_sql(db: Session, caso: Caso) -> Optional[tuple]:
+    """Ejecuta la consulta del caso y retorna el primer SELECT emitido sobre su tabla."""
+    capturas = []
+
+    def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and f"FROM {caso.tabla}" in statement:
+            capturas.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+    try:
+        caso.consulta(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", _antes_de_ejecutar)
+    return capturas[0] if capturas else None
+
+
+def _filas_tabla(db: Session, tabla: str) -> int:
+    return db.execute(
+        text("SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = :t"),
+        {"t": tabla}
+    ).scalar() or 0
+
+
+def verificar(min_filas: int) -> bool:
+    db = SessionLocal()
+    ok = True
+    try:
+        for caso in CASOS:
+            capturado = _capturar_sql(db, caso)
+            if capturado is None:
+                print(f"[FALLA] {caso.nombre}: no se emitió ningún SELECT sobre {caso.tabla}")
+                ok = False
+                continue
+            statement, parameters = capturado
+            conn = db.connection()
+            plan = [
+                dict(fila._mapping)
+                for fila in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+            ]
+            fila = next((p for p in plan if p.get("table") == caso.tabla), None)
+            if fila is None:
+                print(f"[FALLA] {caso.nombre}: EXPLAIN no incluye la tabla {caso.tabla}")
+                ok = False
+                continue
+
+            posibles = (fila.get("possible_keys") or "").split(",")
+            usado = fila.get("key")
+            exigir_uso = _filas_tabla(db, caso.tabla) >= min_filas
+            if caso.indice not in posibles and usado != caso.indice:
+                print(f"[FALLA] {caso.nombre}: {caso.indice} no es utilizable (possible_keys={fila.get('possible_keys')})")
+                ok = False
+            elif exigir_uso and usado != caso.indice:
+                print(f"[FALLA] {caso.nombre}: se esperaba {caso.indice} y el plan usa {usado} (type={fila.get('type')})")
+                ok = False
+            else:
+                print(f"[OK]    {caso.nombre}: key={usado} type={fila.get('type')} rows={fila.get('rows')}")
+    finally:
+        db.rollback()
+        db.close()
+    return ok
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-filas", type=int, default=10_000,
+                        help="Filas a partir de las cuales se exige que el plan use el índice")
+    args = parser.parse_args(argv)
+    sys.exit(0 if verificar(args.min_filas) else 1)
+
+
+if __name__ == "__main__":
+    main()
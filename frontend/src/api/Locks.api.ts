@@ -0,0 +1,15 @@
+import client from './Users.api';
+
+export type LockResource = 'atenciones' | 'pacientes' | 'usuarios' | 'roles' | 'servicios';
+
+export interface LockInfo {
+  id: string;
+  lockedBy?: any;
+  lockedAt?: number;
+}
+
+// Bloqueos de edición vigentes de un tipo de recurso (estado inicial; los cambios llegan por WebSocket)
+export const getLocks = async (resource: LockResource): Promise<LockInfo[]> => {
+  const resp = await client.get('/locks', { params: { resource } });
+  return Array.isArray(resp.data?.locks) ? resp.data.locks : [];
+};
@@ -26,9 +26,73 @@ export interface SyncClinicaResponse {
   errores: string[];
 }
 
+export interface SyncJobProgreso {
+  filas_leidas: number;
+  filas_procesadas: number;
+  lotes: number;
+  pacientes_creados: number;
+  pacientes_omitidos: number;
+  atenciones_creadas: number;
+  atenciones_omitidas: number;
+  duracion_segundos?: number;
+  filas_por_segundo?: number;
+}
+
+export interface SyncJob {
+  id: string;
+  tipo: string;
+  // parcial: se interrumpió después de confirmar lotes; resultado trae lo guardado
+  estado: 'pendiente' | 'en_progreso' | 'completado' | 'parcial' | 'fallido';
+  parametros: Record<string, unknown>;
+  creado_en: string;
+  iniciado_en?: string | null;
+  finalizado_en?: string | null;
+  progreso: SyncJobProgreso;
+  resultado?: SyncClinicaResponse | null;
+  error?: string | null;
+}
+
+const SYNC_JOB_POLL_MS = 2000;
+// Límites de la espera: el backend cierra los jobs huérfanos, esto sólo evita consultar sin fin
+const SYNC_JOB_MAX_ESPERA_MS = 6 * 60 * 60 * 1000;
+const SYNC_JOB_MAX_ERRORES_SEGUIDOS = 5;
+
+export const getSyncJob = async (jobId: string): Promise<SyncJob> => {
+  const response = await client.get(`/sync/jobs/${jobId}`);
+  return response.data;
+};
+
+// Encola la sincronización y espera a que el job termine consultando su estado.
+// Un job parcial no lanza error: retorna el resultado con success=false y sus errores
 export const syncPacientesRangoFechas = async (
-  data: SyncRangoFechasRequest
+  data: SyncRangoFechasRequest,
+  onProgress?: (job: SyncJob) => void
 ): Promise<SyncClinicaResponse> => {
   const response = await client.post('/sync/clinica-florida/rango-fechas', data);
-  return response.data;
+  let job: SyncJob = response.data;
+  const limite = Date.now() + SYNC_JOB_MAX_ESPERA_MS;
+  let erroresSeguidos = 0;
+
+  while (job.estado === 'pendiente' || job.estado === 'en_progreso') {
+    onProgress?.(job);
+    if (Date.now() > limite) {
+      throw new Error('La sincronización no terminó en el tiempo esperado; consulte su estado más tarde');
+    }
+    await new Promise((resolve) => setTimeout(resolve, SYNC_JOB_POLL_MS));
+    try {
+      job = await getSyncJob(job.id);
+      erroresSeguidos = 0;
+    } catch (error) {
+      // Fallos transitorios (red, reinicio del backend): reintentar unas pocas veces
+      erroresSeguidos += 1;
+      if (erroresSeguidos >= SYNC_JOB_MAX_ERRORES_SEGUIDOS) {
+        throw error;
+      }
+    }
+  }
+
+  if (job.estado === 'fallido' || !job.resultado) {
+    throw new Error(job.error || 'Error al sincronizar datos');
+  }
+  return job.resultado;
 };
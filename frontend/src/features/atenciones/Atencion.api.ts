@@ -13,25 +13,37 @@ import type {
 
 // ==================== ATENCIONES ====================
 
-export const getAtenciones = async (skip = 0, limit = 100, fecha?: string): Promise<Atencion[]> => {
-  const params = new URLSearchParams();
-  params.append('skip', String(skip));
-  params.append('limit', String(limit));
-  if (fecha) params.append('fecha', fecha);
-  const query = params.toString();
-  const resp = await client.get(`/atenciones?${query}`);
-  return Array.isArray(resp.data) ? resp.data : [resp.data];
+export interface AtencionesPagina {
+  items: Atencion[];
+  next_cursor: string | null;
+}
+
+// Página por cursor: el costo de cada página no crece con su profundidad
+export const getAtencionesPagina = async (params: {
+  cursor?: string | null;
+  limit?: number;
+  fecha?: string;
+  fecha_inicio?: string;
+  fecha_fin?: string;
+}): Promise<AtencionesPagina> => {
+  const queryParams = new URLSearchParams();
+  if (params.cursor) queryParams.append('cursor', params.cursor);
+  if (params.limit !== undefined) queryParams.append('limit', String(params.limit));
+  if (params.fecha) queryParams.append('fecha', params.fecha);
+  if (params.fecha_inicio) queryParams.append('fecha_inicio', params.fecha_inicio);
+  if (params.fecha_fin) queryParams.append('fecha_fin', params.fecha_fin);
+  const resp = await client.get(`/atenciones/pagina?${queryParams.toString()}`);
+  return { items: resp.data?.items ?? [], next_cursor: resp.data?.next_cursor ?? null };
 };
 
 export const getAtencionesByRango = async (fechaInicio: string, fechaFin: string): Promise<Atencion[]> => {
-  const params = new URLSearchParams();
-  params.append('skip', '0');
-  params.append('limit', '100000');
-  params.append('fecha_inicio', fechaInicio);
-  params.append('fecha_fin', fechaFin);
-  const query = params.toString();
-  const resp = await client.get(`/atenciones?${query}`);
-  return Array.isArray(resp.data) ? resp.data : [resp.data];
+  // El export NDJSON se transmite en una sola respuesta (una atención por línea)
+  const queryParams = new URLSearchParams({ formato: 'ndjson', fecha_inicio: fechaInicio, fecha_fin: fechaFin });
+  const resp = await client.get(`/atenciones/export?${queryParams.toString()}`, { responseType: 'text' });
+  return String(resp.data)
+    .split('\n')
+    .filter((linea) => linea.trim() !== '')
+    .map((linea) => JSON.parse(linea) as Atencion);
 };
 
 export const searchAtenciones = async (params: {
@@ -140,6 +152,16 @@ export const releaseAtencionLock = async (id: string): Promise<void> => {
   }
 };
 
+// Heartbeat: renueva el bloqueo propio. Retorna false si se perdió (venció o lo tomó otro usuario)
+export const renewAtencionLock = async (id: string): Promise<boolean> => {
+  try {
+    await client.put(`/atenciones/${id}/lock`);
+    return true;
+  } catch (err: any) {
+    return err?.response?.status !== 409;
+  }
+};
+
 export const checkAtencionLock = async (id: string): Promise<{ locked: boolean; lockedBy?: any }> => {
   try {
     const res = await client.get(`/atenciones/${id}/lock`);
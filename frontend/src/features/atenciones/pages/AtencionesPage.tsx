@@ -6,7 +6,7 @@ import 'react-datepicker/dist/react-datepicker.css';
 import { useAuth } from "../../../hooks/useAuth";
 import { useWebSocket } from "../../../hooks/useWebSocket";
 import type { Atencion, NewAtencionConPaciente, UpdateAtencion, EstadoAtencion, SeguimientoAtencion } from "../types";
-import { getAtenciones, getAtencionesByRango, searchAtenciones, createAtencionConPaciente, updateAtencion, deleteAtencion, acquireAtencionLock, releaseAtencionLock, checkAtencionLock, getEstadosAtencion, getSeguimientosAtencion } from "../Atencion.api";
+import { getAtencionesPagina, getAtencionesByRango, searchAtenciones, createAtencionConPaciente, updateAtencion, deleteAtencion, acquireAtencionLock, releaseAtencionLock, renewAtencionLock, getEstadosAtencion, getSeguimientosAtencion } from "../Atencion.api";
 import { syncPacientesRangoFechas } from "../../../api/Sync.api";
 import Swal from "sweetalert2";
 import AtencionForm from "../components/AtencionForm";
@@ -14,6 +14,8 @@ import SyncModal from "../components/SyncModal";
 import ExportDateRangeModal from "../components/ExportDateRangeModal";
 import AtencionTable from '../components/AtencionTable';
 import { prepareAtencionesPorServicio } from "../utils";
+import { useLockHeartbeat } from "../../../hooks/useLockHeartbeat";
+import { useLocks } from "../../../hooks/useLocks";
 
 // Input personalizado para el DatePicker de fecha de atención
 const DateFilterInput = React.forwardRef<HTMLButtonElement, { value?: string; onClick?: () => void; isActive?: boolean; onClear?: (e: React.MouseEvent) => void }>(
@@ -62,27 +64,45 @@ export default function AtencionesPage() {
   const [selectedSeguimientoId, setSelectedSeguimientoId] = useState<number | null>(null);
   const [selectedFilter, setSelectedFilter] = useState<string | null>(null);
   const [heldLockId, setHeldLockId] = useState<string | null>(null);
+  useLockHeartbeat(heldLockId, renewAtencionLock);
+  const locks = useLocks('atenciones');
   const [showFilterDropdown, setShowFilterDropdown] = useState(false);
   const filterDropdownRef = useRef<HTMLDivElement>(null);
 
   const { auth } = useAuth();
-  const { subscribe } = useWebSocket();
+  const { subscribe, setFilters } = useWebSocket();
+
+  // Identifica la carga vigente para descartar páginas de una fecha anterior
+  const loadIdRef = useRef(0);
 
   const loadAtenciones = useCallback(async () => {
+    const loadId = ++loadIdRef.current;
     setLoading(true);
     try {
       const fecha = selectedDate ? selectedDate.toISOString().split('T')[0] : undefined;
-      // Cuando se filtra por fecha específica, se eliminan restricciones para obtener
-      // TODOS los registros de ese día (el backend soporta hasta 100 000)
-      const limit = fecha ? 100000 : 500;
-      const data = await getAtenciones(0, limit, fecha);
-      console.log("Atenciones recibidas:", data);
-      console.log("Total de atenciones:", data.length);
-      setAtenciones(data);
+      if (!fecha) {
+        // Sin fecha sólo se muestran las más recientes (primera página)
+        const pagina = await getAtencionesPagina({ limit: 500 });
+        if (loadId !== loadIdRef.current) return;
+        setAtenciones(pagina.items);
+        return;
+      }
+      // Con fecha específica se recorren TODAS las atenciones del día página a página:
+      // la primera página se muestra de inmediato y las siguientes se van agregando
+      let pagina = await getAtencionesPagina({ fecha, limit: 500 });
+      if (loadId !== loadIdRef.current) return;
+      setAtenciones(pagina.items);
+      setLoading(false);
+      while (pagina.next_cursor) {
+        pagina = await getAtencionesPagina({ fecha, limit: 500, cursor: pagina.next_cursor });
+        if (loadId !== loadIdRef.current) return;
+        const items = pagina.items;
+        setAtenciones((prev) => [...prev, ...items]);
+      }
     } catch (err) {
       console.error("Error al cargar atenciones:", err);
     } finally {
-      setLoading(false);
+      if (loadId === loadIdRef.current) setLoading(false);
     }
   }, [selectedDate]);
 
@@ -121,12 +141,24 @@ export default function AtencionesPage() {
 
 
 
+  // Con una fecha seleccionada el servidor sólo envía eventos de atenciones de ese día
+  useEffect(() => {
+    const fecha = selectedDate ? selectedDate.toISOString().split('T')[0] : undefined;
+    setFilters('atenciones', fecha ? { fecha } : null);
+    return () => setFilters('atenciones', null);
+  }, [selectedDate, setFilters]);
+
   // Suscribirse a eventos WebSocket para atenciones
   useEffect(() => {
+    const fecha = selectedDate ? selectedDate.toISOString().split('T')[0] : undefined;
     const unsubscribe = subscribe('atenciones', (message) => {
       console.log('[Atenciones] Evento WebSocket:', message);
       
-      if (message.event === 'create') {
+      if (message.event === 'resync' || message.event === 'bulk_created') {
+        // Eventos perdidos durante la desconexión o altas masivas de la sincronización
+        // (sólo llegan los IDs): recargar el listado completo
+        loadAtenciones();
+      } else if (message.event === 'create') {
         // Añadir nueva atención al inicio
         setAtenciones((prev) => {
           const exists = prev.some(a => a.id_atencion === message.data.id_atencion);
@@ -134,10 +166,15 @@ export default function AtencionesPage() {
           return [message.data, ...prev];
         });
       } else if (message.event === 'update') {
-        // Actualizar atención existente
-        setAtenciones((prev) =>
-          prev.map((a) => (a.id_atencion === message.data.id_atencion ? message.data : a))
-        );
+        // El update también llega si la atención salió del día filtrado (por su fecha anterior):
+        // en ese caso se quita; si entró al día, se agrega
+        const enFiltro = !fecha || String(message.data.fecha_atencion ?? '').slice(0, 10) === fecha;
+        setAtenciones((prev) => {
+          if (!enFiltro) return prev.filter((a) => a.id_atencion !== message.data.id_atencion);
+          const exists = prev.some((a) => a.id_atencion === message.data.id_atencion);
+          if (!exists) return fecha ? [message.data, ...prev] : prev;
+          return prev.map((a) => (a.id_atencion === message.data.id_atencion ? message.data : a));
+        });
       } else if (message.event === 'delete') {
         // Eliminar atención
         setAtenciones((prev) =>
@@ -147,7 +184,7 @@ export default function AtencionesPage() {
     });
 
     return () => unsubscribe();
-  }, [subscribe]);
+  }, [subscribe, loadAtenciones, selectedDate]);
 
   const handleSync = async (fechaInicio: string, fechaFin: string) => {
     try {
@@ -159,10 +196,11 @@ export default function AtencionesPage() {
       await loadAtenciones();
       
       Swal.fire({
-        icon: 'success',
-        title: 'Sincronización exitosa',
+        icon: result.success ? 'success' : 'warning',
+        title: result.success ? 'Sincronización exitosa' : 'Sincronización parcial',
         html: `
           <div class="text-left space-y-2">
+            ${result.success ? '' : `<p class="text-red-600 mb-2">${result.errores[0] ?? 'La sincronización se interrumpió'}. Se guardó lo siguiente:</p>`}
             <p class="font-bold text-lg mb-2">Pacientes:</p>
             <p><strong>Creados:</strong> ${result.pacientes.creados}</p>
             <p><strong>Actualizados:</strong> ${result.pacientes.actualizados}</p>
@@ -180,7 +218,9 @@ export default function AtencionesPage() {
       });
     } catch (error) {
       const axiosErr = error as { response?: { data?: { detail?: string } } };
-      const errorMsg = axiosErr.response?.data?.detail || 'Error al sincronizar datos';
+      const errorMsg = axiosErr.response?.data?.detail
+        || (error instanceof Error ? error.message : '')
+        || 'Error al sincronizar datos';
       Swal.fire('Error', errorMsg, 'error');
     }
   };
@@ -272,7 +312,8 @@ export default function AtencionesPage() {
       return;
     }
     try {
-      const status = await checkAtencionLock(atencion.id_atencion);
+      const lock = locks.get(String(atencion.id_atencion));
+      const status = { locked: !!lock, lockedBy: lock?.lockedBy };
       if (status.locked) {
         const by = status.lockedBy;
         const who = by?.username || by?.name || 'otro usuario';
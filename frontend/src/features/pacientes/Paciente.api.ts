@@ -47,6 +47,16 @@ export const releasePacienteLock = async (id: string): Promise<void> => {
   }
 };
 
+// Heartbeat: renueva el bloqueo propio. Retorna false si se perdió (venció o lo tomó otro usuario)
+export const renewPacienteLock = async (id: string): Promise<boolean> => {
+  try {
+    await client.put(`/pacientes/${id}/lock`);
+    return true;
+  } catch (err: any) {
+    return err?.response?.status !== 409;
+  }
+};
+
 export const checkPacienteLock = async (id: string): Promise<{ locked: boolean; lockedBy?: any }> => {
   try {
     const res = await client.get(`/pacientes/${id}/lock`);
@@ -1,9 +1,11 @@
 ﻿import { useState, useEffect, useRef, useMemo, type ChangeEvent } from 'react';
 import Swal from 'sweetalert2';
 import { useAuth } from '../../../hooks/useAuth';
+import { useLockHeartbeat } from '../../../hooks/useLockHeartbeat';
+import { useLocks } from '../../../hooks/useLocks';
 import { useWebSocket } from '../../../hooks/useWebSocket';
 import type { Paciente } from '../types';
-import { getPacientes, deletePaciente, updatePaciente, acquirePacienteLock, releasePacienteLock, checkPacienteLock } from '../Paciente.api';
+import { getPacientes, deletePaciente, updatePaciente, acquirePacienteLock, releasePacienteLock, renewPacienteLock } from '../Paciente.api';
 import PacienteForm from '../components/PacienteForm';
 import PacienteTable from '../components/PacienteTable';
 import { exportToExcel } from '../../../utils/exportToExcel';
@@ -20,6 +22,8 @@ export default function PacientesPage() {
   const [showEditPaciente, setShowEditPaciente] = useState(false);
   const [editPaciente, setEditPaciente] = useState<Paciente | null>(null);
   const [heldLockId, setHeldLockId] = useState<string | null>(null);
+  useLockHeartbeat(heldLockId, renewPacienteLock);
+  const locks = useLocks('pacientes');
 
   useEffect(() => {
     loadPacientes();
@@ -30,7 +34,11 @@ export default function PacientesPage() {
     const unsubscribe = subscribe('pacientes', (message) => {
       console.log('[Pacientes] Evento WebSocket:', message);
       
-      if (message.event === 'create') {
+      if (message.event === 'resync' || message.event === 'bulk_created') {
+        // Eventos perdidos durante la desconexión o altas masivas de la sincronización
+        // (sólo llegan los IDs): recargar el listado completo
+        loadPacientes();
+      } else if (message.event === 'create') {
         // Añadir nuevo paciente al inicio
         setPacientes((prev) => {
           const exists = prev.some(p => p.id === message.data.id);
@@ -101,7 +109,8 @@ export default function PacientesPage() {
       return;
     }
     try {
-      const status = await checkPacienteLock(paciente.id);
+      const lock = locks.get(String(paciente.id));
+      const status = { locked: !!lock, lockedBy: lock?.lockedBy };
       if (status.locked) {
         const by = status.lockedBy;
         const who = by?.username || by?.name || 'otro usuario';
@@ -68,6 +68,16 @@ export const releaseRoleLock = async (id: number): Promise<void> => {
   }
 };
 
+// Heartbeat: renueva el bloqueo propio. Retorna false si se perdió (venció o lo tomó otro usuario)
+export const renewRoleLock = async (id: number): Promise<boolean> => {
+  try {
+    await client.put(`/roles/${id}/lock`);
+    return true;
+  } catch (err: any) {
+    return err?.response?.status !== 409;
+  }
+};
+
 export const checkRoleLock = async (id: number): Promise<{ locked: boolean; lockedBy?: any }> => {
   try {
     const res = await client.get(`/roles/${id}/lock`);
@@ -1,6 +1,8 @@
 ﻿import { useState, useEffect } from "react";
 import { useAuth } from '../../../hooks/useAuth';
-import { getRoles, updateRol, acquireRoleLock, releaseRoleLock, checkRoleLock } from "../Role.api";
+import { useLockHeartbeat } from "../../../hooks/useLockHeartbeat";
+import { useLocks } from "../../../hooks/useLocks";
+import { getRoles, updateRol, acquireRoleLock, releaseRoleLock, renewRoleLock } from "../Role.api";
 import RoleForm from "../components/RoleForm";
 import RoleTable from "../components/RoleTable";
 import Swal from 'sweetalert2';
@@ -18,6 +20,8 @@ export default function RolesPage() {
   const [showEdit, setShowEdit] = useState(false);
   const [editRole, setEditRole] = useState<Role | null>(null);
   const [heldLockId, setHeldLockId] = useState<number | null>(null);
+  useLockHeartbeat(heldLockId, renewRoleLock);
+  const locks = useLocks('roles');
   const { auth } = useAuth();
 
   // CARGAR ROLES
@@ -36,7 +40,8 @@ export default function RolesPage() {
       return;
     }
     try {
-      const status = await checkRoleLock(r.id);
+      const lock = locks.get(String(r.id));
+      const status = { locked: !!lock, lockedBy: lock?.lockedBy };
       if (status.locked) {
         const by = status.lockedBy;
         const who = by?.username || by?.name || 'otro usuario';
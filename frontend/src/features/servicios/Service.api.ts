@@ -57,6 +57,16 @@ export const releaseServiceLock = async (id: number): Promise<any> => {
   }
 };
 
+// Heartbeat: renueva el bloqueo propio. Retorna false si se perdió (venció o lo tomó otro usuario)
+export const renewServiceLock = async (id: number): Promise<boolean> => {
+  try {
+    await client.put(`/servicios/${id}/lock`);
+    return true;
+  } catch (err: any) {
+    return err?.response?.status !== 409;
+  }
+};
+
 export const checkServiceLock = async (id: number): Promise<any> => {
   try {
     const resp = await client.get(`/servicios/${id}/lock`);
@@ -1,6 +1,8 @@
 ﻿import { useState, useEffect, lazy, Suspense } from "react";
 import type { ChangeEvent } from "react";
 import { useAuth } from "../../../hooks/useAuth";
+import { useLockHeartbeat } from "../../../hooks/useLockHeartbeat";
+import { useLocks } from "../../../hooks/useLocks";
 import type { Service } from "../types";
 import ServiceTable from "../components/ServiceTable";
 import Swal from "sweetalert2";
@@ -11,7 +13,7 @@ import {
   deleteService,
   acquireServiceLock,
   releaseServiceLock,
-  checkServiceLock,
+  renewServiceLock,
 } from "../Service.api";
 
 
@@ -28,6 +30,8 @@ export default function ServiciosPage() {
 
   const { auth } = useAuth();
   const [heldLockId, setHeldLockId] = useState<number | null>(null);
+  useLockHeartbeat(heldLockId, renewServiceLock);
+  const locks = useLocks('servicios');
 
   useEffect(() => {
     load();
@@ -74,7 +78,8 @@ export default function ServiciosPage() {
   const attemptEdit = async (s: Service) => {
     try {
       // 1. Verificar si está bloqueado
-      const status = await checkServiceLock(s.id!);
+      const lock = locks.get(String(s.id));
+      const status = { locked: !!lock, lockedBy: lock?.lockedBy };
 
       if (status.locked) {
         const by = status.lockedBy;
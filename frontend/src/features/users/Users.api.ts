@@ -66,6 +66,16 @@ export const releaseUserLock = async (id: number): Promise<void> => {
   }
 };
 
+// Heartbeat: renueva el bloqueo propio. Retorna false si se perdió (venció o lo tomó otro usuario)
+export const renewUserLock = async (id: number): Promise<boolean> => {
+  try {
+    await client.put(`/users/${id}/lock`);
+    return true;
+  } catch (err: any) {
+    return err?.response?.status !== 409;
+  }
+};
+
 export const checkUserLock = async (id: number): Promise<{ locked: boolean; lockedBy?: any }> => {
   try {
     const res = await client.get(`/users/${id}/lock`);
@@ -1,8 +1,10 @@
 ﻿import { useState, useEffect, useMemo } from "react";
 import type { ChangeEvent } from "react";
 import { useAuth } from '../../../hooks/useAuth';
+import { useLockHeartbeat } from "../../../hooks/useLockHeartbeat";
+import { useLocks } from "../../../hooks/useLocks";
 import type { Usuario } from "../types";
-import { getUsuarios, createUsuario, updateUsuario, deleteUsuario, acquireUserLock, releaseUserLock, checkUserLock } from "../Users.api";
+import { getUsuarios, createUsuario, updateUsuario, deleteUsuario, acquireUserLock, releaseUserLock, renewUserLock } from "../Users.api";
 import Swal from "sweetalert2";
 import UserForm from "../components/UserForm";
 import UserTable from "../components/UserTable";
@@ -18,6 +20,8 @@ export default function UsersPage() {
 
   const { auth } = useAuth();
   const [heldLockId, setHeldLockId] = useState<number | null>(null);
+  useLockHeartbeat(heldLockId, renewUserLock);
+  const locks = useLocks('usuarios');
 
   useEffect(() => {
     getUsuarios()
@@ -59,7 +63,8 @@ export default function UsersPage() {
     }
     try {
       // primero comprueba si alguien más tiene el bloqueo
-      const status = await checkUserLock(u.id);
+      const lock = locks.get(String(u.id));
+      const status = { locked: !!lock, lockedBy: lock?.lockedBy };
       if (status.locked) {
         const by = status.lockedBy;
         const who = by?.username || by?.name || 'otro usuario';
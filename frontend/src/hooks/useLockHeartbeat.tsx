@@ -0,0 +1,19 @@
+import { useEffect } from 'react';
+
+// Intervalo de renovación: bastante menor que el TTL del backend (LOCK_TTL_SECONDS, 300 s)
+const HEARTBEAT_INTERVAL = 60 * 1000;
+
+/**
+ * Renueva periódicamente el bloqueo de edición mientras `lockId` no sea null,
+ * para que una edición larga no pierda el bloqueo al vencer el TTL.
+ */
+export function useLockHeartbeat<T>(lockId: T | null, renew: (id: T) => Promise<boolean>) {
+  useEffect(() => {
+    if (lockId === null) return;
+    const timer = window.setInterval(async () => {
+      const ok = await renew(lockId);
+      if (!ok) console.warn('El bloqueo de edición se perdió', lockId);
+    }, HEARTBEAT_INTERVAL);
+    return () => window.clearInterval(timer);
+  }, [lockId, renew]);
+}
@@ -0,0 +1,44 @@
+import { useEffect, useState } from 'react';
+import { useWebSocket } from './useWebSocket';
+import { getLocks } from '../api/Locks.api';
+import type { LockInfo, LockResource } from '../api/Locks.api';
+
+/**
+ * Bloqueos de edición vigentes de un tipo de recurso, indexados por ID.
+ * Carga el estado con GET /locks (y de nuevo en cada reconexión) y lo mantiene
+ * con los eventos 'acquired' / 'released' / 'expired' del canal WebSocket 'locks'.
+ */
+export function useLocks(resource: LockResource): Map<string, LockInfo> {
+  const { isConnected, subscribe } = useWebSocket();
+  const [locks, setLocks] = useState<Map<string, LockInfo>>(new Map());
+
+  useEffect(() => {
+    const unsubscribe = subscribe('locks', (message) => {
+      if (message.data?.namespace !== resource) return;
+      const id = String(message.data.id);
+      setLocks(prev => {
+        const next = new Map(prev);
+        if (message.event === 'acquired') {
+          next.set(id, { id, lockedBy: message.data.lockedBy, lockedAt: Date.now() / 1000 });
+        } else {
+          next.delete(id);
+        }
+        return next;
+      });
+    });
+    return unsubscribe;
+  }, [resource, subscribe]);
+
+  useEffect(() => {
+    if (!isConnected) return;
+    let cancelled = false;
+    getLocks(resource)
+      .then(list => {
+        if (!cancelled) setLocks(new Map(list.map(lock => [String(lock.id), lock])));
+      })
+      .catch(err => console.warn('No se pudo cargar el estado de bloqueos', err));
+    return () => { cancelled = true; };
+  }, [resource, isConnected]);
+
+  return locks;
+}
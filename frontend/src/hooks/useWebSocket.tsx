@@ -3,19 +3,42 @@ import type { ReactNode } from 'react';
 import { BACKEND_URL, API_PREFIX } from '../utils/env';
 
 interface WebSocketMessage {
-  event: 'create' | 'update' | 'delete';
-  resource: 'atenciones' | 'pacientes' | string;
+  event: 'create' | 'update' | 'delete' | 'bulk_created' | 'acquired' | 'released' | 'expired' | 'resync';
+  resource: 'atenciones' | 'pacientes' | 'locks' | string;
   data: any;
+  // Sólo en update: fecha, empresa y estado antes del cambio
+  previous?: { fecha_atencion?: string; id_empresa?: number; id_estado_atencion?: number };
+  seq?: number;
+}
+
+// Primer mensaje de cada conexión: posición actual y resultado del reenvío pedido con ?since=
+interface HelloMessage {
+  type: 'hello';
+  stream: string;
+  last_seq: number;
+  resync: null | 'ok' | 'required';
+  replayed: number;
 }
 
 type WebSocketListener = (message: WebSocketMessage) => void;
 
+// Filtros que el servidor aplica antes de enviar los eventos de un recurso
+interface SubscriptionFilters {
+  fecha?: string;
+  id_empresa?: number | number[];
+  id_estado_atencion?: number | number[];
+}
+
 interface WebSocketContextType {
   isConnected: boolean;
   subscribe: (resource: string, listener: WebSocketListener) => () => void;
+  setFilters: (resource: string, filters: SubscriptionFilters | null) => void;
   lastMessage: WebSocketMessage | null;
 }
 
+// Cantidad de seq recientes recordados para descartar duplicados que llegan fuera de orden
+const SEEN_SEQ_WINDOW = 1000;
+
 const WebSocketContext = createContext<WebSocketContextType | undefined>(undefined);
 
 export function WebSocketProvider({ children }: { children: ReactNode }) {
@@ -25,24 +48,116 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
   const listenersRef = useRef<Map<string, Set<WebSocketListener>>>(new Map());
   const reconnectTimeoutRef = useRef<number | undefined>(undefined);
   const reconnectAttemptsRef = useRef(0);
+  // Mayor seq recibido: al reconectar se piden sólo los eventos posteriores
+  const lastSeqRef = useRef<number | null>(null);
+  // seq ya recibidos dentro de la ventana SEEN_SEQ_WINDOW: un evento puede llegar después de
+  // otro de seq mayor (p. ej. reemplazos en la cola del servidor) y no debe descartarse
+  const seenSeqsRef = useRef<Set<number>>(new Set());
+  const streamRef = useRef<string | null>(null);
+  // Último mensaje recibido del servidor (incluye sus pings de heartbeat)
+  const lastReceivedRef = useRef(Date.now());
+  const filtersRef = useRef<Map<string, SubscriptionFilters>>(new Map());
+
+  // Pide al servidor sólo los eventos del recurso (con sus filtros, si hay)
+  const sendSubscription = useCallback((resource: string, type: 'subscribe' | 'unsubscribe') => {
+    const ws = wsRef.current;
+    // Con listeners globales (*) se reciben todos los eventos sin filtrar
+    if (resource === '*' || listenersRef.current.has('*') || !ws || ws.readyState !== WebSocket.OPEN) return;
+    const filters = type === 'subscribe' ? filtersRef.current.get(resource) : undefined;
+    ws.send(JSON.stringify({ type, resource, ...filters }));
+  }, []);
+
+  const notify = useCallback((message: WebSocketMessage) => {
+    // Notificar a listeners específicos del recurso
+    const resourceListeners = listenersRef.current.get(message.resource);
+    if (resourceListeners) {
+      resourceListeners.forEach(listener => listener(message));
+    }
+    
+    // Notificar a listeners globales (*)
+    const globalListeners = listenersRef.current.get('*');
+    if (globalListeners) {
+      globalListeners.forEach(listener => listener(message));
+    }
+  }, []);
+
+  const handleEvent = useCallback((message: WebSocketMessage) => {
+    console.log('[WebSocket] Mensaje recibido:', message);
+    
+    if (typeof message.seq === 'number') {
+      // Un evento reenviado que ya se había recibido se ignora; lo anterior a la ventana se da por recibido
+      const last = lastSeqRef.current;
+      const seen = seenSeqsRef.current;
+      if (seen.has(message.seq) || (last !== null && message.seq <= last - SEEN_SEQ_WINDOW)) return;
+      seen.add(message.seq);
+      if (last === null || message.seq > last) lastSeqRef.current = message.seq;
+      if (seen.size > 2 * SEEN_SEQ_WINDOW) {
+        const floor = (lastSeqRef.current ?? 0) - SEEN_SEQ_WINDOW;
+        seen.forEach((seq) => { if (seq <= floor) seen.delete(seq); });
+      }
+    }
+    
+    setLastMessage(message);
+    notify(message);
+  }, [notify]);
+
+  // Se perdieron eventos: cada vista debe recargar sus datos
+  const notifyResync = useCallback(() => {
+    listenersRef.current.forEach((_, resource) => {
+      if (resource !== '*') notify({ event: 'resync', resource, data: null });
+    });
+  }, [notify]);
+
+  const handleHello = useCallback((hello: HelloMessage) => {
+    console.log('[WebSocket] Hello:', hello);
+    streamRef.current = hello.stream;
+    if (hello.resync === 'required') {
+      // El servidor ya no tiene los eventos pedidos con ?since=
+      lastSeqRef.current = hello.last_seq;
+      seenSeqsRef.current.clear();
+      notifyResync();
+    } else if (lastSeqRef.current === null) {
+      lastSeqRef.current = hello.last_seq;
+    }
+  }, [notifyResync]);
 
   const connect = useCallback(() => {
     // Convertir http/https a ws/wss
-    const wsUrl = BACKEND_URL.replace(/^http/, 'ws') + API_PREFIX + '/ws/updates';
-    
-    console.log('[WebSocket] Conectando a:', wsUrl);
+    const baseUrl = BACKEND_URL.replace(/^http/, 'ws') + API_PREFIX + '/ws/updates';
+    const params = new URLSearchParams();
+    if (lastSeqRef.current !== null && streamRef.current) {
+      params.set('since', String(lastSeqRef.current));
+      params.set('stream', streamRef.current);
+    }
+    console.log('[WebSocket] Conectando a:', params.toString() ? `${baseUrl}?${params}` : baseUrl);
     
-    const ws = new WebSocket(wsUrl);
+    // El token sólo habilita los eventos restringidos a administradores (p. ej. sync_jobs)
+    const token = localStorage.getItem('access_token');
+    if (token) {
+      params.set('token', token);
+    }
+    const query = params.toString();
+    const ws = new WebSocket(query ? `${baseUrl}?${query}` : baseUrl);
     wsRef.current = ws;
 
     ws.onopen = () => {
       console.log('[WebSocket] Conectado');
       setIsConnected(true);
       reconnectAttemptsRef.current = 0;
+      lastReceivedRef.current = Date.now();
       
-      // Enviar ping cada 30 segundos para mantener conexión
+      // Se piden sólo los recursos que alguna vista escucha
+      listenersRef.current.forEach((_, resource) => sendSubscription(resource, 'subscribe'));
+      
+      // Enviar ping cada 30 segundos para mantener conexión. Si el servidor lleva más de
+      // 90 s sin enviar nada (ni su propio ping) la conexión está muerta: se cierra y reconecta
       const pingInterval = setInterval(() => {
         if (ws.readyState === WebSocket.OPEN) {
+          if (Date.now() - lastReceivedRef.current > 90000) {
+            console.warn('[WebSocket] Sin mensajes del servidor: reconectando');
+            ws.close();
+            return;
+          }
           ws.send('ping');
         } else {
           clearInterval(pingInterval);
@@ -51,25 +166,37 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
     };
 
     ws.onmessage = (event) => {
+      lastReceivedRef.current = Date.now();
       if (event.data === 'pong') return; // Ignorar respuestas de ping
       
       try {
-        const message: WebSocketMessage = JSON.parse(event.data);
-        console.log('[WebSocket] Mensaje recibido:', message);
-        
-        setLastMessage(message);
-        
-        // Notificar a listeners específicos del recurso
-        const resourceListeners = listenersRef.current.get(message.resource);
-        if (resourceListeners) {
-          resourceListeners.forEach(listener => listener(message));
+        const parsed = JSON.parse(event.data);
+        if (parsed.type === 'ping') {
+          // Heartbeat del servidor: sin respuesta desaloja la conexión
+          ws.send('pong');
+          return;
         }
-        
-        // Notificar a listeners globales (*)
-        const globalListeners = listenersRef.current.get('*');
-        if (globalListeners) {
-          globalListeners.forEach(listener => listener(message));
+        if (parsed.type === 'hello') {
+          handleHello(parsed as HelloMessage);
+          return;
         }
+        if (parsed.type === 'resync') {
+          // El servidor descartó eventos porque este cliente no los recibía a tiempo
+          console.warn('[WebSocket] Eventos descartados por el servidor:', parsed.reason);
+          notifyResync();
+          return;
+        }
+        if (parsed.type === 'batch') {
+          // Eventos agrupados por el servidor: React agrupa los setState en un solo render
+          (parsed.events as WebSocketMessage[]).forEach(handleEvent);
+          return;
+        }
+        if (parsed.type) {
+          // Confirmaciones o errores de suscripción
+          if (parsed.type === 'error') console.warn('[WebSocket]', parsed.detail);
+          return;
+        }
+        handleEvent(parsed as WebSocketMessage);
       } catch (error) {
         console.error('[WebSocket] Error parseando mensaje:', error);
       }
@@ -96,7 +223,7 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
         }, delay);
       }
     };
-  }, []);
+  }, [handleEvent, handleHello, notifyResync, sendSubscription]);
 
   useEffect(() => {
     connect();
@@ -114,6 +241,7 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
   const subscribe = useCallback((resource: string, listener: WebSocketListener) => {
     if (!listenersRef.current.has(resource)) {
       listenersRef.current.set(resource, new Set());
+      sendSubscription(resource, 'subscribe');
     }
     listenersRef.current.get(resource)!.add(listener);
     
@@ -127,13 +255,25 @@ export function WebSocketProvider({ children }: { children: ReactNode }) {
         console.log(`[WebSocket] Desuscrito de "${resource}". Total listeners:`, listeners.size);
         if (listeners.size === 0) {
           listenersRef.current.delete(resource);
+          sendSubscription(resource, 'unsubscribe');
         }
       }
     };
-  }, []);
+  }, [sendSubscription]);
+
+  const setFilters = useCallback((resource: string, filters: SubscriptionFilters | null) => {
+    if (filters) {
+      filtersRef.current.set(resource, filters);
+    } else {
+      filtersRef.current.delete(resource);
+    }
+    if (listenersRef.current.has(resource)) {
+      sendSubscription(resource, 'subscribe');
+    }
+  }, [sendSubscription]);
 
   return (
-    <WebSocketContext.Provider value={{ isConnected, subscribe, lastMessage }}>
+    <WebSocketContext.Provider value={{ isConnected, subscribe, setFilters, lastMessage }}>
       {children}
     </WebSocketContext.Provider>
   );
@@ -147,4 +287,4 @@ export function useWebSocket() {
   return context;
 }
 
-export type { WebSocketMessage, WebSocketListener };
+export type { WebSocketMessage, WebSocketListener, SubscriptionFilters };